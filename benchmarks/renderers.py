@@ -0,0 +1,362 @@
+"""
+Renderer Benchmarks for Discord.py Bot
+--------------------------------------
+
+Offline timings for the image renderers: the rank card, the welcome
+card, the quote image, the wanted poster and the chess board. Each one is
+fed the same fake member, a generated avatar and a built-in background,
+so nothing touches Discord, the database or the network.
+
+For every renderer this reports the p50 and p95 render time, how far
+peak RSS rose while it ran (Pillow's pixel buffers are invisible to
+tracemalloc, so RSS is sampled from a background thread) and the size of
+the output. The output of the last run is compared with a golden PNG in
+``benchmarks/golden``: a renderer fails if more than GOLDEN_MAX_CHANGED
+of its pixels differ from the golden by more than GOLDEN_PIXEL_TOLERANCE
+in any channel, if it has no golden, or if it cannot run here (the chess
+board needs the system Cairo library). Goldens are kept at no more than
+GOLDEN_MAX_SIDE pixels a side, and outputs are scaled down the same way
+before they are compared. The exit status is 1 if any renderer fails.
+
+Golden images depend on the installed Pillow, FreeType and Cairo, so
+regenerate them with ``--update-golden`` after upgrading those, and
+check the new images by eye before committing them.
+
+How to Use:
+1. Run every renderer from the repository root:
+   python -m benchmarks.renderers
+
+2. Run some of them, more times:
+   python -m benchmarks.renderers --runs 50 rank_card welcome_card
+
+3. Record new golden images after an intended visual change:
+   python -m benchmarks.renderers --update-golden
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import psutil
+from PIL import Image
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_DIR: str = os.path.join(ROOT, 'benchmarks', 'golden')
+# The cogs open fonts and images relative to the repository root
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+# Some renderers live in modules that import helpers.database, which
+# refuses to import without a URL. Nothing here queries it, and the pool
+# is only created when a cog initializes it, so any URL will do.
+os.environ.setdefault('DATABASE_URL', 'postgresql://benchmark.invalid/none')
+
+from cogs.fun.fun import WANTED_IMAGE_PATH, Fun, draw_wanted_poster
+from cogs.levelling.modules import rankcard
+from cogs.welcomer.utils.wel import get_welcome_card
+
+# Renderer name -> why it cannot run here
+UNAVAILABLE: Dict[str, str] = {}
+try:
+    import chess
+
+    from cogs.games.modules.chessmod import ChessGame, ChessView
+except (ImportError, OSError) as e:
+    # cairosvg raises OSError when the Cairo library is not installed
+    UNAVAILABLE['chess_board'] = str(e).splitlines()[0]
+
+DEFAULT_RUNS: int = 20
+# Largest per-channel difference that still counts as the same pixel
+GOLDEN_PIXEL_TOLERANCE: int = 8
+# Share of pixels allowed to differ by more than that
+GOLDEN_MAX_CHANGED: float = 0.001
+# Longest side of a stored golden; the wanted poster is 11MB at full size
+GOLDEN_MAX_SIDE: int = 512
+RSS_SAMPLE_INTERVAL: float = 0.001
+BACKGROUND_PATH: str = "backgrounds/clouds.jpg"
+QUOTE: str = ("The best way to predict the future is to invent it, and the "
+              "second best way is to benchmark it first.")
+CHESS_MOVES: Tuple[str, ...] = ('e4', 'e5', 'Nf3', 'Nc6', 'Bb5', 'a6')
+
+
+def make_avatar(size: int = 256) -> bytes:
+    """A deterministic avatar: concentric rings over a diagonal gradient,
+    so resizing, masking and colour extraction all have work to do."""
+    y, x = np.mgrid[:size, :size] / size
+    rings = (np.sin(np.hypot(x - 0.5, y - 0.5) * 40) + 1) / 2
+    pixels = np.stack([x * 255, rings * 200, (1 - y) * 255],
+                      axis=-1).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels, 'RGB').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class FakeAsset:
+    """Enough of ``discord.Asset`` for the renderers: fixed bytes, no CDN."""
+
+    def __init__(self, data: bytes, key: str = 'benchmark') -> None:
+        self.data = data
+        self.key = key
+        self.url = f"https://cdn.invalid/avatars/{key}.png"
+
+    def replace(self, **kwargs) -> 'FakeAsset':
+        return self
+
+    async def read(self) -> bytes:
+        return self.data
+
+
+class FakeGuild:
+
+    def __init__(self) -> None:
+        self.id = 1
+        self.name = "Benchmark Server"
+
+
+class FakeMember:
+
+    def __init__(self, member_id: int, name: str, avatar: bytes) -> None:
+        self.id = member_id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{member_id}>"
+        self.display_avatar = FakeAsset(avatar, key=f"avatar{member_id}")
+        self.guild = FakeGuild()
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class FakeResponse:
+
+    def __init__(self, data: bytes) -> None:
+        self.status = 200
+        self.data = data
+
+    async def __aenter__(self) -> 'FakeResponse':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def read(self) -> bytes:
+        return self.data
+
+
+class FakeSession:
+    """Answers every GET with the same avatar, like a warm CDN."""
+
+    def __init__(self, avatar: bytes) -> None:
+        self.avatar = avatar
+
+    def get(self, url: str) -> FakeResponse:
+        return FakeResponse(self.avatar)
+
+
+class PeakRSS:
+    """Samples this process's RSS in a thread; ``peak`` is the most it
+    rose above the RSS at entry."""
+
+    def __init__(self) -> None:
+        self.process = psutil.Process()
+        self.baseline: int = 0
+        self.peak: int = 0
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        while not self._done.wait(RSS_SAMPLE_INTERVAL):
+            rss = self.process.memory_info().rss
+            self.peak = max(self.peak, rss - self.baseline)
+
+    def __enter__(self) -> 'PeakRSS':
+        self.baseline = self.process.memory_info().rss
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._done.set()
+        self._thread.join()
+        rss = self.process.memory_info().rss
+        self.peak = max(self.peak, rss - self.baseline)
+
+
+@dataclass
+class Result:
+    name: str
+    times: List[float]
+    peak_rss: int
+    output: bytes
+    golden: str
+
+    def percentile(self, percent: float) -> float:
+        ordered = sorted(self.times)
+        index = min(int(round(percent / 100 * (len(ordered) - 1))),
+                    len(ordered) - 1)
+        return ordered[index]
+
+
+def compare_golden(name: str, output: bytes, update: bool) -> str:
+    path = os.path.join(GOLDEN_DIR, f"{name}.png")
+    image = Image.open(io.BytesIO(output)).convert('RGBA')
+    image.thumbnail((GOLDEN_MAX_SIDE, GOLDEN_MAX_SIDE), Image.LANCZOS)
+    if update:
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        image.save(path, 'PNG')
+        return "updated"
+    if not os.path.exists(path):
+        return "FAIL missing (record it with --update-golden)"
+
+    golden = Image.open(path).convert('RGBA')
+    if golden.size != image.size:
+        return f"FAIL size {image.size} != {golden.size}"
+    difference = np.abs(
+        np.asarray(image, dtype=np.int16) - np.asarray(golden, dtype=np.int16))
+    changed = float(
+        (difference.max(axis=-1) > GOLDEN_PIXEL_TOLERANCE).mean())
+    if changed > GOLDEN_MAX_CHANGED:
+        return f"FAIL {changed:.2%} of pixels changed"
+    return f"ok ({changed:.3%} changed)"
+
+
+def build_cases(avatar: bytes,
+                background: bytes) -> Dict[str, Callable[[], Awaitable[bytes]]]:
+    member = FakeMember(1001, "benchmark_user", avatar)
+    opponent = FakeMember(1002, "benchmark_rival", avatar)
+    session = FakeSession(avatar)
+    with open(WANTED_IMAGE_PATH, 'rb') as wanted_file:
+        wanted_template = wanted_file.read()
+    avatar_key = (member.display_avatar.key, rankcard.AVATAR_DOWNLOAD_SIZE)
+    background_key = 'benchmark-background'
+
+    async def rank_card_cold() -> bytes:
+        # Avatar and background decoded and scaled on every card
+        return rankcard.render_rank_card(member.display_name, 12345, 11, 7,
+                                         avatar_key, avatar, background_key,
+                                         background)
+
+    async def rank_card() -> bytes:
+        # The usual case: both already in the renderer's caches
+        prepared = (rankcard.avatar_cache.get(avatar_key)
+                    or rankcard.prepare_avatar(avatar_key, avatar))
+        scaled = (rankcard.background_cache.get(background_key)
+                  or rankcard.scale_background(background_key, background))
+        return rankcard.render_rank_card(member.display_name, 12345, 11, 7,
+                                         avatar_key, prepared, background_key,
+                                         scaled)
+
+    async def welcome_card() -> bytes:
+        return (await get_welcome_card(member, session)).getvalue()
+
+    async def quote_image() -> bytes:
+        # generate_quote_image doesn't use the cog's state
+        file = await Fun.generate_quote_image(None, member, QUOTE,
+                                              "Benchmark", False)
+        return file.fp.read()
+
+    async def quote_image_sepia() -> bytes:
+        file = await Fun.generate_quote_image(None, member, QUOTE,
+                                              "Benchmark", True)
+        return file.fp.read()
+
+    async def wanted_poster() -> bytes:
+        wanted = draw_wanted_poster(Image.open(io.BytesIO(wanted_template)),
+                                    avatar)
+        buffer = io.BytesIO()
+        wanted.save(buffer, format='JPEG')
+        return buffer.getvalue()
+
+    async def chess_board() -> bytes:
+        game = ChessGame(member, opponent)
+        for move in CHESS_MOVES:
+            game.move_piece(move)
+        view = ChessView(game)
+        view.selected_square = 'f1'
+        view.possible_moves = [
+            chess.square_name(move.to_square)
+            for move in game.board.legal_moves
+            if move.from_square == chess.F1
+        ]
+        return view.render_board()
+
+    cases = {
+        'rank_card_cold': rank_card_cold,
+        'rank_card': rank_card,
+        'welcome_card': welcome_card,
+        'quote_image': quote_image,
+        'quote_image_sepia': quote_image_sepia,
+        'wanted_poster': wanted_poster,
+        'chess_board': chess_board,
+    }
+    return {
+        name: render
+        for name, render in cases.items() if name not in UNAVAILABLE
+    }
+
+
+async def run_case(name: str, render: Callable[[], Awaitable[bytes]],
+                   runs: int, update: bool) -> Result:
+    # One untimed run to load fonts and fill caches
+    await render()
+    times = []
+    with PeakRSS() as rss:
+        for _ in range(runs):
+            start = time.perf_counter()
+            output = await render()
+            times.append(time.perf_counter() - start)
+    return Result(name, times, rss.peak, output,
+                  compare_golden(name, output, update))
+
+
+async def main(names: List[str], runs: int, update: bool) -> int:
+    with open(BACKGROUND_PATH, 'rb') as background_file:
+        background = background_file.read()
+    cases = build_cases(make_avatar(), background)
+    unknown = [
+        name for name in names if name not in cases and name not in UNAVAILABLE
+    ]
+    if unknown:
+        print(f"Unknown renderers: {', '.join(unknown)}. "
+              f"Choose from: {', '.join(list(cases) + list(UNAVAILABLE))}")
+        return 2
+
+    print(f"{'renderer':<18} {'p50 ms':>8} {'p95 ms':>8} {'peak RSS':>10} "
+          f"{'output':>10}  golden")
+    failed = False
+    for name in names or list(cases) + list(UNAVAILABLE):
+        if name in UNAVAILABLE:
+            failed = True
+            print(f"{name:<18} {'-':>8} {'-':>8} {'-':>10} {'-':>10}  "
+                  f"FAIL unavailable: {UNAVAILABLE[name]}")
+            continue
+        result = await run_case(name, cases[name], runs, update)
+        failed = failed or result.golden.startswith("FAIL")
+        print(f"{name:<18} {result.percentile(50) * 1000:>8.1f} "
+              f"{result.percentile(95) * 1000:>8.1f} "
+              f"{result.peak_rss / 2**20:>8.1f}MB "
+              f"{len(result.output) / 1024:>8.1f}KB  {result.golden}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description="Benchmark the bot's image renderers offline.")
+    parser.add_argument('names',
+                        nargs='*',
+                        help="renderers to run (default: all)")
+    parser.add_argument('--runs',
+                        type=int,
+                        default=DEFAULT_RUNS,
+                        help="timed runs per renderer")
+    parser.add_argument('--update-golden',
+                        action='store_true',
+                        help="overwrite the golden images with this output")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.names, args.runs, args.update_golden)))
@@ -1,44 +1,207 @@
-from importlib.util import spec_from_file_location, module_from_spec
+import ast
 import os
-import sys
 from glob import glob
-from typing import List, Optional
-from types import ModuleType
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Extensions listed here are not imported at startup. Stubs for their
+# commands are registered instead, and the real module is loaded on the
+# first invocation. Every other extension is loaded eagerly. The
+# LAZY_EXTENSIONS environment variable (comma separated, may be empty)
+# overrides this list.
+LAZY_EXTENSIONS: List[str] = [
+    'cogs.animanga.animanga',
+    'cogs.games.games',
+    'cogs.imagery.imagery',
+    'cogs.pokemon.poke',
+]
+
+# Decorators (``module.attr``) that register a top-level command, mapped to
+# the kind of command they create.
+_COMMAND_DECORATORS: Dict[str, str] = {
+    'commands.command': 'prefix',
+    'commands.group': 'prefix',
+    'commands.hybrid_command': 'hybrid',
+    'commands.hybrid_group': 'hybrid',
+    'app_commands.command': 'app',
+}
+
+
+def _module_file(extension: str) -> str:
+    root_dir: str = os.path.dirname(os.path.dirname(__file__))
+    return os.path.join(root_dir, *extension.split('.')) + '.py'
+
+
+def _defines_setup(file: str) -> bool:
+    """
+    Check whether a module defines a top-level ``setup`` function
+    without executing it.
+    """
+    try:
+        with open(file, encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=file)
+    except (OSError, SyntaxError, UnicodeDecodeError):
+        return False
+
+    return any(
+        isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+        and node.name == 'setup' for node in tree.body)
 
 
 def get_extensions() -> List[str]:
     """
     Get all extension modules that have a setup function.
 
+    Modules are inspected statically, so discovering extensions never
+    imports them; they are imported exactly once, by ``load_extension``.
+
     Returns:
         List[str]: A list of qualified module names for valid extensions
     """
     current_dir: str = os.path.dirname(__file__)
-    extension_files: List[str] = glob(os.path.join(current_dir, '[!_]*.py'))
+    root_dir: str = os.path.dirname(current_dir)
+    extension_files: List[str] = glob(os.path.join(current_dir, '**',
+                                                   '[!_]*.py'),
+                                      recursive=True)
     extensions: List[str] = []
 
-    for file in extension_files:
-        module_name: str = os.path.splitext(os.path.basename(file))[0]
-        full_module_name: str = f"{__package__}.{module_name}"
-
-        # Import the module to check for setup function
-        spec = spec_from_file_location(full_module_name, file)
-        if spec is None or spec.loader is None:
+    for file in sorted(extension_files):
+        if not _defines_setup(file):
             continue
 
-        module: Optional[ModuleType] = module_from_spec(spec)
-        if module is None:
+        module_path: str = os.path.relpath(file, root_dir)
+        extensions.append(
+            os.path.splitext(module_path)[0].replace(os.path.sep, '.'))
+
+    return extensions
+
+
+def get_lazy_extensions() -> List[str]:
+    """
+    Get the extensions that should be loaded on first use.
+
+    Returns:
+        List[str]: Qualified module names of the lazy extensions
+    """
+    override: Optional[str] = os.getenv('LAZY_EXTENSIONS')
+    if override is None:
+        return list(LAZY_EXTENSIONS)
+    return [name.strip() for name in override.split(',') if name.strip()]
+
+
+def _decorator_name(node: ast.expr) -> Optional[str]:
+    if isinstance(node, ast.Call):
+        node = node.func
+    if isinstance(node, ast.Attribute) and isinstance(node.value, ast.Name):
+        return f"{node.value.id}.{node.attr}"
+    return None
+
+
+def _keyword(node: Union[ast.expr, ast.ClassDef],
+             name: str) -> Optional[ast.expr]:
+    if isinstance(node, (ast.Call, ast.ClassDef)):
+        for keyword in node.keywords:
+            if keyword.arg == name:
+                return keyword.value
+    return None
+
+
+def _constant(node: Optional[ast.expr]) -> Optional[str]:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _parameters(node: ast.AST) -> List[Tuple[str, bool]]:
+    """Names of a command callback's arguments, after ``self`` and the
+    context or interaction, each with whether it is required."""
+    if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return []
+
+    args = node.args
+    positional = args.posonlyargs + args.args
+    first_default = len(positional) - len(args.defaults)
+    parameters = [(arg.arg, index < first_default)
+                  for index, arg in enumerate(positional)]
+    parameters += [(arg.arg, default is None)
+                   for arg, default in zip(args.kwonlyargs, args.kw_defaults)]
+    return parameters[2:]
+
+
+def get_command_names(extension: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Statically collect the top-level commands an extension registers.
+
+    Only commands declared directly on a cog (decorated methods and
+    ``app_commands.Group`` attributes) are found; subcommands are reached
+    through their parent.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Command name mapped to its ``kind``
+        ('prefix', 'hybrid' or 'app'), prefix ``aliases``, the ``cog``
+        class and ``cog_name`` declaring it, its ``brief``,
+        ``description`` and ``help`` texts (None when not given), and
+        its ``parameters`` as (name, required) pairs
+    """
+    with open(_module_file(extension), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+
+    found: Dict[str, Dict[str, Any]] = {}
+    for cls in tree.body:
+        if not isinstance(cls, ast.ClassDef):
             continue
 
-        sys.modules[full_module_name] = module
-        spec.loader.exec_module(module)
+        cog_name = _constant(_keyword(cls, 'name')) or cls.name
+        for node in cls.body:
+            if isinstance(node, ast.Assign) and isinstance(
+                    node.value, ast.Call) and _decorator_name(
+                        node.value) == 'app_commands.Group':
+                name = _constant(_keyword(node.value, 'name'))
+                if name is not None:
+                    found[name] = {
+                        'kind': 'app',
+                        'aliases': [],
+                        'cog': cls.name,
+                        'cog_name': cog_name,
+                        'brief': None,
+                        'description': _constant(
+                            _keyword(node.value, 'description')),
+                        'help': None,
+                        'parameters': [],
+                    }
+                continue
 
-        # Only include if setup function exists
-        if hasattr(module, 'setup'):
-            extensions.append(full_module_name)
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
 
-    return extensions
+            for decorator in node.decorator_list:
+                kind = _COMMAND_DECORATORS.get(
+                    _decorator_name(decorator) or '')
+                if kind is None:
+                    continue
+
+                command_name: str = _constant(_keyword(decorator,
+                                                       'name')) or node.name
+
+                aliases = _keyword(decorator, 'aliases')
+                alias_names: List[str] = []
+                if isinstance(aliases, (ast.List, ast.Tuple)):
+                    alias_names = [
+                        alias.value for alias in aliases.elts
+                        if isinstance(alias, ast.Constant)
+                    ]
 
+                found[command_name] = {
+                    'kind': kind,
+                    'aliases': alias_names,
+                    'cog': cls.name,
+                    'cog_name': cog_name,
+                    'brief': _constant(_keyword(decorator, 'brief')),
+                    'description': _constant(_keyword(decorator,
+                                                      'description')),
+                    'help': _constant(_keyword(decorator, 'help'))
+                    or ast.get_docstring(node),
+                    'parameters': _parameters(node),
+                }
+                break
 
-# Initialize the list of valid extensions
-EXTENSIONS: List[str] = get_extensions()
+    return found
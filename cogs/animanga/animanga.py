@@ -5,18 +5,29 @@ from typing import List
 
 from .modules.animemod import AniListModule, AniListView, LogoutView, ListTypeSelect, CompareButton, SearchView
 from .modules.mangamod import MangaMod
+from helpers.database import db
 
 
 class AniManga(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot: commands.Bot = bot
-        self.anilist_module: AniListModule = AniListModule()
-        self.manga_mod = MangaMod()
-        self.bot.loop.create_task(self.anilist_module.load_tokens())
+        self.anilist_module: AniListModule = AniListModule(bot.session)
+        self.manga_mod = MangaMod(bot.session)
+
+    async def cog_load(self) -> None:
+        # Taken here, not in a background task, so cog_unload only ever
+        # releases a reference this cog holds
+        await db.initialize()
+        try:
+            await self.anilist_module.load_tokens()
+        except Exception:
+            # A cog that fails to load is never unloaded
+            await db.close()
+            raise
 
     async def cog_unload(self) -> None:
-        await self.manga_mod.close_session()
+        await db.close()
 
     async def autocomplete_media(
             self, interaction: discord.Interaction,
@@ -18,7 +18,8 @@ ITEMS_PER_PAGE = 6
 
 class AniListModule:
 
-    def __init__(self) -> None:
+    def __init__(self, session: ClientSession) -> None:
+        self.session: ClientSession = session
         self.anilist_client_id: str = os.environ['ANILIST_CLIENT_ID']
         self.anilist_client_secret: str = os.environ['ANILIST_CLIENT_SECRET']
         self.anilist_redirect_uri: str = 'https://anilist.co/api/v2/oauth/pin'
@@ -28,7 +29,6 @@ class AniListModule:
         self.user_tokens: Dict[int, str] = {}
 
     async def load_tokens(self) -> None:
-        await db.initialize()
         query = "SELECT user_id, access_token FROM anilist_tokens"
         results = await db.fetch(query)
         self.user_tokens = {
@@ -58,12 +58,11 @@ class AniListModule:
             'code': auth_code
         }
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_token_url,
-                                    data=data) as response:
-                if response.status == 200:
-                    token_data: Dict[str, Any] = await response.json()
-                    return token_data.get('access_token')
+        async with self.session.post(self.anilist_token_url,
+                                     data=data) as response:
+            if response.status == 200:
+                token_data: Dict[str, Any] = await response.json()
+                return token_data.get('access_token')
         return None
 
     def blend_colors(self, color1: str, color2: str) -> int:
@@ -117,15 +116,14 @@ class AniListModule:
             'Accept': 'application/json',
         }
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={'query': user_query},
-                                    headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(
-                        f"Failed to fetch user ID. Status: {response.status}")
-                user_data = await response.json()
-                user_id = user_data['data']['Viewer']['id']
+        async with self.session.post(self.anilist_api_url,
+                                     json={'query': user_query},
+                                     headers=headers) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"Failed to fetch user ID. Status: {response.status}")
+            user_data = await response.json()
+            user_id = user_data['data']['Viewer']['id']
 
         # Now fetch the activities using the user's ID
         query = '''
@@ -169,24 +167,22 @@ class AniListModule:
 
         variables = {"userId": user_id, "page": 1, "perPage": 50}
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={
-                                        'query': query,
-                                        'variables': variables
-                                    },
-                                    headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    activities = data['data']['Page']['activities']
-                    logging.info(
-                        f"Fetched {len(activities)} activities for user {user_id}"
-                    )
-                    return activities
-                else:
-                    error_message = f"AniList API returned status code {response.status}"
-                    logging.error(error_message)
-                    raise Exception(error_message)
+        async with self.session.post(self.anilist_api_url,
+                                     json={
+                                         'query': query,
+                                         'variables': variables
+                                     },
+                                     headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                activities = data['data']['Page']['activities']
+                logging.info(
+                    f"Fetched {len(activities)} activities for user {user_id}")
+                return activities
+            else:
+                error_message = f"AniList API returned status code {response.status}"
+                logging.error(error_message)
+                raise Exception(error_message)
 
     def create_recent_activities_embed(self, activities: List[Dict[str, Any]],
                                        page: int,
@@ -297,25 +293,24 @@ class AniListModule:
 
         variables = {"username": username}
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={
-                                        'query': query,
-                                        'variables': variables
-                                    }) as response:
-                if response.status == 404:
+        async with self.session.post(self.anilist_api_url,
+                                     json={
+                                         'query': query,
+                                         'variables': variables
+                                     }) as response:
+            if response.status == 404:
+                return None  # User not found
+            elif response.status != 200:
+                raise Exception(
+                    f"AniList API returned status code {response.status}")
+
+            data: Dict[str, Any] = await response.json()
+            if 'errors' in data:
+                error_message = data['errors'][0]['message']
+                if "User not found" in error_message:
                     return None  # User not found
-                elif response.status != 200:
-                    raise Exception(
-                        f"AniList API returned status code {response.status}")
-
-                data: Dict[str, Any] = await response.json()
-                if 'errors' in data:
-                    error_message = data['errors'][0]['message']
-                    if "User not found" in error_message:
-                        return None  # User not found
-                    raise Exception(f"AniList API Error: {error_message}")
-                return data.get('data', {}).get('User')
+                raise Exception(f"AniList API Error: {error_message}")
+            return data.get('data', {}).get('User')
 
     async def fetch_user_list(self, access_token: str, list_type: str,
                               status: str) -> List[Dict[str, Any]]:
@@ -356,40 +351,38 @@ class AniListModule:
             'Accept': 'application/json',
         }
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={'query': user_query},
-                                    headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(
-                        f"Failed to fetch user ID. Status: {response.status}")
-                user_data = await response.json()
-                user_id = user_data['data']['Viewer']['id']
-
-            variables = {
-                "userId": user_id,
-                "type": list_type.upper(),
-                "status": status
-            }
-            async with session.post(self.anilist_api_url,
-                                    json={
-                                        'query': query,
-                                        'variables': variables
-                                    },
-                                    headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if 'errors' in data:
-                        raise Exception(
-                            f"AniList API Error: {data['errors'][0]['message']}"
-                        )
-                    lists = data['data']['MediaListCollection']['lists']
-                    if not lists:
-                        return []
-                    return lists[0]['entries']
-                else:
+        async with self.session.post(self.anilist_api_url,
+                                     json={'query': user_query},
+                                     headers=headers) as response:
+            if response.status != 200:
+                raise Exception(
+                    f"Failed to fetch user ID. Status: {response.status}")
+            user_data = await response.json()
+            user_id = user_data['data']['Viewer']['id']
+
+        variables = {
+            "userId": user_id,
+            "type": list_type.upper(),
+            "status": status
+        }
+        async with self.session.post(self.anilist_api_url,
+                                     json={
+                                         'query': query,
+                                         'variables': variables
+                                     },
+                                     headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                if 'errors' in data:
                     raise Exception(
-                        f"AniList API returned status code {response.status}")
+                        f"AniList API Error: {data['errors'][0]['message']}")
+                lists = data['data']['MediaListCollection']['lists']
+                if not lists:
+                    return []
+                return lists[0]['entries']
+            else:
+                raise Exception(
+                    f"AniList API returned status code {response.status}")
 
     async def autocomplete_search(self, media_type: str, query: str):
         graphql_query = '''
@@ -417,23 +410,22 @@ class AniListModule:
             'Accept': 'application/json',
         }
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={
-                                        'query': graphql_query,
-                                        'variables': variables
-                                    },
-                                    headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if 'errors' in data:
-                        return []
-                    media_list = data['data']['Page']['media']
-                    return [(
-                        f"{m['title']['romaji']} ({m['format']}) - {m['startDate']['year']}",
-                        str(m['id'])) for m in media_list]
-                else:
+        async with self.session.post(self.anilist_api_url,
+                                     json={
+                                         'query': graphql_query,
+                                         'variables': variables
+                                     },
+                                     headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                if 'errors' in data:
                     return []
+                media_list = data['data']['Page']['media']
+                return [(
+                    f"{m['title']['romaji']} ({m['format']}) - {m['startDate']['year']}",
+                    str(m['id'])) for m in media_list]
+            else:
+                return []
 
     async def search_media(self,
                            media_type: str,
@@ -585,33 +577,29 @@ class AniListModule:
             headers['Authorization'] = f'Bearer {user_token}'
 
         try:
-            async with ClientSession() as session:
-                async with session.post(self.anilist_api_url,
-                                        json={
-                                            'query': current_query,
-                                            'variables': variables
-                                        },
-                                        headers=headers) as response:
-                    data = await response.json()
+            async with self.session.post(self.anilist_api_url,
+                                         json={
+                                             'query': current_query,
+                                             'variables': variables
+                                         },
+                                         headers=headers) as response:
+                data = await response.json()
 
-                    if 'errors' in data:
+                if 'errors' in data:
 
-                        raise Exception(
-                            f"AniList API Error: {data['errors'][0]['message']}"
-                        )
+                    raise Exception(
+                        f"AniList API Error: {data['errors'][0]['message']}")
 
-                    if response.status != 200:
+                if response.status != 200:
 
-                        raise Exception(
-                            f"AniList API returned status code {response.status}"
-                        )
+                    raise Exception(
+                        f"AniList API returned status code {response.status}")
 
-                    if not data.get('data', {}).get('Media'):
-                        raise Exception(
-                            f"No {media_type.lower()} found matching '{query}'"
-                        )
+                if not data.get('data', {}).get('Media'):
+                    raise Exception(
+                        f"No {media_type.lower()} found matching '{query}'")
 
-                    return data['data']['Media']
+                return data['data']['Media']
 
         except Exception:
 
@@ -653,17 +641,16 @@ class AniListModule:
             'Content-Type': 'application/json',
             'Accept': 'application/json',
         }
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={'query': query},
-                                    headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data['data']['Viewer']['favourites']['characters'][
-                        'nodes']
-                else:
-                    raise Exception(
-                        f"AniList API returned status code {response.status}")
+        async with self.session.post(self.anilist_api_url,
+                                     json={'query': query},
+                                     headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                return data['data']['Viewer']['favourites']['characters'][
+                    'nodes']
+            else:
+                raise Exception(
+                    f"AniList API returned status code {response.status}")
 
     async def autocomplete_staff_search(self, query: str):
         graphql_query = '''
@@ -686,22 +673,21 @@ class AniListModule:
             'Accept': 'application/json',
         }
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={
-                                        'query': graphql_query,
-                                        'variables': variables
-                                    },
-                                    headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if 'errors' in data:
-                        return []
-                    staff_list = data['data']['Page']['staff']
-                    return [(f"{s['name']['full']}", str(s['id']))
-                            for s in staff_list]
-                else:
+        async with self.session.post(self.anilist_api_url,
+                                     json={
+                                         'query': graphql_query,
+                                         'variables': variables
+                                     },
+                                     headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                if 'errors' in data:
                     return []
+                staff_list = data['data']['Page']['staff']
+                return [(f"{s['name']['full']}", str(s['id']))
+                        for s in staff_list]
+            else:
+                return []
 
     async def search_staff(self, query: str, user_token: Optional[str] = None):
         graphql_query = '''
@@ -760,32 +746,29 @@ class AniListModule:
             headers['Authorization'] = f'Bearer {user_token}'
 
         try:
-            async with ClientSession() as session:
-                async with session.post(self.anilist_api_url,
-                                        json={
-                                            'query': current_query,
-                                            'variables': variables
-                                        },
-                                        headers=headers) as response:
-                    data = await response.json()
+            async with self.session.post(self.anilist_api_url,
+                                         json={
+                                             'query': current_query,
+                                             'variables': variables
+                                         },
+                                         headers=headers) as response:
+                data = await response.json()
 
-                    if 'errors' in data:
+                if 'errors' in data:
 
-                        raise Exception(
-                            f"AniList API Error: {data['errors'][0]['message']}"
-                        )
+                    raise Exception(
+                        f"AniList API Error: {data['errors'][0]['message']}")
 
-                    if response.status != 200:
+                if response.status != 200:
 
-                        raise Exception(
-                            f"AniList API returned status code {response.status}"
-                        )
+                    raise Exception(
+                        f"AniList API returned status code {response.status}")
 
-                    if not data.get('data', {}).get('Staff'):
-                        raise Exception(
-                            f"No staff member found matching '{query}'")
+                if not data.get('data', {}).get('Staff'):
+                    raise Exception(
+                        f"No staff member found matching '{query}'")
 
-                    return data['data']['Staff']
+                return data['data']['Staff']
 
         except Exception:
 
@@ -817,17 +800,15 @@ class AniListModule:
             'Content-Type': 'application/json',
             'Accept': 'application/json',
         }
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={'query': query},
-                                    headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    return data['data']['Viewer']['favourites']['staff'][
-                        'nodes']
-                else:
-                    raise Exception(
-                        f"AniList API returned status code {response.status}")
+        async with self.session.post(self.anilist_api_url,
+                                     json={'query': query},
+                                     headers=headers) as response:
+            if response.status == 200:
+                data = await response.json()
+                return data['data']['Viewer']['favourites']['staff']['nodes']
+            else:
+                raise Exception(
+                    f"AniList API returned status code {response.status}")
 
     async def fetch_anilist_data(
             self, access_token: str) -> Optional[Dict[str, Any]]:
@@ -888,19 +869,18 @@ class AniListModule:
             'Accept': 'application/json',
         }
 
-        async with ClientSession() as session:
-            async with session.post(self.anilist_api_url,
-                                    json={'query': query},
-                                    headers=headers) as response:
-                if response.status == 200:
-                    data: Dict[str, Any] = await response.json()
-                    if 'errors' in data:
-                        error_message = data['errors'][0]['message']
-                        raise Exception(f"AniList API Error: {error_message}")
-                    return data.get('data', {}).get('Viewer')
-                else:
-                    raise Exception(
-                        f"AniList API returned status code {response.status}")
+        async with self.session.post(self.anilist_api_url,
+                                     json={'query': query},
+                                     headers=headers) as response:
+            if response.status == 200:
+                data: Dict[str, Any] = await response.json()
+                if 'errors' in data:
+                    error_message = data['errors'][0]['message']
+                    raise Exception(f"AniList API Error: {error_message}")
+                return data.get('data', {}).get('Viewer')
+            else:
+                raise Exception(
+                    f"AniList API returned status code {response.status}")
 
     def create_favorite_staff_embed(self, staff: List[Dict[str,
                                                            Any]], page: int,
@@ -8,11 +8,8 @@ import re
 
 class MangaMod:
 
-    def __init__(self):
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
-
-    async def close_session(self) -> None:
-        await self.session.close()
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session: aiohttp.ClientSession = session
 
     async def handle_manga_command(self, ctx: commands.Context,
                                    query: str) -> None:
@@ -33,23 +30,21 @@ class MangaMod:
 
     async def search_manga(self, ctx: commands.Context, manga_name: str,
                            specified_volume: Optional[int]) -> None:
-        async with aiohttp.ClientSession() as session:
-            async with session.get('https://api.mangadex.org/manga',
-                                   params={
-                                       'title': manga_name,
-                                       'limit': 5,
-                                       'order[relevance]': 'desc',
-                                       'includes[]': ['author', 'artist']
-                                   }) as response:
-                if response.status != 200:
-                    await ctx.send(
-                        f'Failed to search for manga. Please try again later.\nYou can try searching manually at: [ManaDex](https://mangadex.org/search?q={manga_name})',
-                        ephemeral=True)
-                    return None
-
-                manga_data: Dict[str, Any] = await response.json()
-                manga_results: List[Dict[str,
-                                         Any]] = manga_data.get('data', [])
+        async with self.session.get('https://api.mangadex.org/manga',
+                                    params={
+                                        'title': manga_name,
+                                        'limit': 5,
+                                        'order[relevance]': 'desc',
+                                        'includes[]': ['author', 'artist']
+                                    }) as response:
+            if response.status != 200:
+                await ctx.send(
+                    f'Failed to search for manga. Please try again later.\nYou can try searching manually at: [ManaDex](https://mangadex.org/search?q={manga_name})',
+                    ephemeral=True)
+                return None
+
+            manga_data: Dict[str, Any] = await response.json()
+            manga_results: List[Dict[str, Any]] = manga_data.get('data', [])
 
         if not manga_results:
             await ctx.send(
@@ -104,40 +99,39 @@ class MangaMod:
                             ctx: commands.Context,
                             manga_id: str,
                             specified_volume: Optional[int] = None) -> bool:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    f'https://api.mangadex.org/manga/{manga_id}') as response:
-                if response.status != 200:
-                    await ctx.send(
-                        f'Failed to fetch manga data. Please try again later.\nYou can try accessing the manga directly at: [MangaDex](https://mangadex.org/title/{manga_id})\nManga ID: {manga_id}',
-                        ephemeral=True)
-                    return False
-
-                manga_data: Dict[str, Any] = await response.json()
-                manga_result: Dict[str, Any] = manga_data.get('data')
-
-            if not manga_result:
+        async with self.session.get(
+                f'https://api.mangadex.org/manga/{manga_id}') as response:
+            if response.status != 200:
+                await ctx.send(
+                    f'Failed to fetch manga data. Please try again later.\nYou can try accessing the manga directly at: [MangaDex](https://mangadex.org/title/{manga_id})\nManga ID: {manga_id}',
+                    ephemeral=True)
+                return False
+
+            manga_data: Dict[str, Any] = await response.json()
+            manga_result: Dict[str, Any] = manga_data.get('data')
+
+        if not manga_result:
+            await ctx.send(
+                f'No manga found with the provided ID.\nYou can try accessing the manga directly at: [MangaDex](https://mangadex.org/title/{manga_id})\nManga ID: {manga_id}',
+                ephemeral=True)
+            return False
+
+        async with self.session.get(
+                f'https://api.mangadex.org/manga/{manga_id}/feed',
+                params={
+                    'translatedLanguage[]': ['en'],
+                    'limit': 500,
+                    'order[volume]': 'asc',
+                    'order[chapter]': 'asc'
+                }) as chapter_response:
+            if chapter_response.status != 200:
                 await ctx.send(
-                    f'No manga found with the provided ID.\nYou can try accessing the manga directly at: [MangaDex](https://mangadex.org/title/{manga_id})\nManga ID: {manga_id}',
+                    f'Failed to fetch chapters. Please try again later.\nYou can try accessing the manga directly at: [MangaDex](https://mangadex.org/title/{manga_id})\nManga ID: {manga_id}',
                     ephemeral=True)
                 return False
 
-            async with session.get(
-                    f'https://api.mangadex.org/manga/{manga_id}/feed',
-                    params={
-                        'translatedLanguage[]': ['en'],
-                        'limit': 500,
-                        'order[volume]': 'asc',
-                        'order[chapter]': 'asc'
-                    }) as chapter_response:
-                if chapter_response.status != 200:
-                    await ctx.send(
-                        f'Failed to fetch chapters. Please try again later.\nYou can try accessing the manga directly at: [MangaDex](https://mangadex.org/title/{manga_id})\nManga ID: {manga_id}',
-                        ephemeral=True)
-                    return False
-
-                chapter_data: Dict[str, Any] = await chapter_response.json()
-                chapters: List[Dict[str, Any]] = chapter_data.get('data', [])
+            chapter_data: Dict[str, Any] = await chapter_response.json()
+            chapters: List[Dict[str, Any]] = chapter_data.get('data', [])
 
         if not chapters:
             await ctx.send(
@@ -206,27 +200,25 @@ class MangaMod:
                 ephemeral=True)
             return
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    f'https://api.mangadex.org/at-home/server/{chapter_id}'
-            ) as pages_response:
-                if pages_response.status != 200:
-                    await ctx.send(
-                        'Failed to fetch pages. Please try again later.',
-                        ephemeral=True)
-                    return
-
-                pages_data: Dict[str, Any] = await pages_response.json()
-                base_url: str = pages_data.get('baseUrl')
-                chapter_info: Optional[Dict[str,
-                                            Any]] = pages_data.get('chapter')
-                if chapter_info is None:
-                    await ctx.send(
-                        'Chapter information is missing. Please try again later.',
-                        ephemeral=True)
-                    return
-                chapter_hash: str = chapter_info.get('hash')
-                page_files: List[str] = chapter_info.get('data')
+        async with self.session.get(
+                f'https://api.mangadex.org/at-home/server/{chapter_id}'
+        ) as pages_response:
+            if pages_response.status != 200:
+                await ctx.send(
+                    'Failed to fetch pages. Please try again later.',
+                    ephemeral=True)
+                return
+
+            pages_data: Dict[str, Any] = await pages_response.json()
+            base_url: str = pages_data.get('baseUrl')
+            chapter_info: Optional[Dict[str, Any]] = pages_data.get('chapter')
+            if chapter_info is None:
+                await ctx.send(
+                    'Chapter information is missing. Please try again later.',
+                    ephemeral=True)
+                return
+            chapter_hash: str = chapter_info.get('hash')
+            page_files: List[str] = chapter_info.get('data')
 
         if not page_files or not base_url or not chapter_hash:
             await ctx.send('No pages available to display.', ephemeral=True)
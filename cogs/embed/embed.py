@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import aiohttp
 import random
 from urllib.parse import urlparse
 import webcolors
@@ -17,13 +16,8 @@ class EmbedCreator(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
         self.embed_object = None
 
-    async def cog_unload(self):
-        """Cleanup resources when the cog is unloaded."""
-        await self.session.close()
-
     @app_commands.command(
         name="embed",
         description="Create a custom embed message interactively.")
@@ -8,9 +8,11 @@ from discord.utils import format_dt
 from datetime import timedelta
 from math import ceil
 from typing import Optional
-import json
 import io
 
+from helpers.codec import JSONDecodeError, dumps, loads
+from helpers.cooldowns import CooldownStore
+
 from ..utils.helpembed import get_help_embed
 
 
@@ -550,10 +552,10 @@ class ImportEmbedModal(BaseModal):
             else:
 
                 try:
-                    embed_dict = json.loads(input_text)
+                    embed_dict = loads(input_text)
                     embed = discord.Embed.from_dict(embed_dict)
                     success_message = "✅ Embed imported successfully!"
-                except json.JSONDecodeError:
+                except JSONDecodeError:
                     await interaction.response.send_message(embed=discord.Embed(
                         title="Invalid Input",
                         description=
@@ -628,7 +630,7 @@ class ImportEmbedModal(BaseModal):
                                  embed: discord.Embed, message_link: str):
         try:
             embed_dict = embed.to_dict()
-            json_str = json.dumps(embed_dict, indent=4, ensure_ascii=False)
+            json_str = dumps(embed_dict, pretty=True)
 
             file = discord.File(io.StringIO(json_str),
                                 filename="embed_code.json")
@@ -764,7 +766,7 @@ class BackButton(BaseButton):
 
 class SendButton(BaseButton):
     # Class variable to track cooldowns for all users
-    user_cooldowns = {}
+    user_cooldowns = CooldownStore('embed_send')
 
     def __init__(self, embed: discord.Embed):
         super().__init__(label="Send", style=ButtonStyle.green, emoji="🚀")
@@ -772,23 +774,19 @@ class SendButton(BaseButton):
         self.cooldown_duration = 20  # Cooldown duration in seconds
 
     async def handle_callback(self, interaction: Interaction) -> None:
-        current_time = discord.utils.utcnow().timestamp()
         user_id = interaction.user.id
 
         # Check if user is on cooldown
-        if user_id in self.user_cooldowns:
-            last_use = self.user_cooldowns[user_id]
-            time_elapsed = current_time - last_use
-
-            if time_elapsed < self.cooldown_duration:
-                time_remaining = round(self.cooldown_duration - time_elapsed)
-                await interaction.response.send_message(embed=discord.Embed(
-                    title="Cooldown Active",
-                    description=
-                    f"Please wait {time_remaining} seconds before sending another embed.",
-                    color=discord.Color.yellow()),
-                                                        ephemeral=True)
-                return
+        time_remaining = self.user_cooldowns.retry_after(
+            user_id, self.cooldown_duration)
+        if time_remaining:
+            await interaction.response.send_message(embed=discord.Embed(
+                title="Cooldown Active",
+                description=
+                f"Please wait {round(time_remaining)} seconds before sending another embed.",
+                color=discord.Color.yellow()),
+                                                    ephemeral=True)
+            return
 
         # Check if embed is configured
         if not is_embed_configured(self.embed):
@@ -805,7 +803,7 @@ class SendButton(BaseButton):
             sent_message = await interaction.channel.send(embed=self.embed)
 
             # Update cooldown
-            self.user_cooldowns[user_id] = current_time
+            self.user_cooldowns.set(user_id, self.cooldown_duration)
 
             # Create message link
             message_link = f"https://discord.com/channels/{interaction.guild.id}/{interaction.channel.id}/{sent_message.id}"
@@ -2,7 +2,6 @@ import discord
 from discord.ext import commands
 import traceback
 from typing import List, Tuple
-import aiohttp
 import asyncio
 from loguru import logger
 from helpers import fuzzy
@@ -48,11 +47,6 @@ class Errors(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot: commands.Bot = bot
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
-
-    async def cog_unload(self):
-        """Cleanup resources when the cog is unloaded."""
-        await self.session.close()
 
     async def send_error_embed(self, ctx: commands.Context, title: str,
                                description: str) -> None:
@@ -1,46 +1,42 @@
 from discord.ext import commands
-from collections import defaultdict
-import time
 import random
 
+from helpers.cooldowns import CooldownStore
+
 
 class CheeseCog(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.cooldowns = defaultdict(dict)
+        self.cooldowns = CooldownStore('cheese')
         self.cooldown_time = 5
         self.trigger_words = [
             "cheese", "cheddar", "gouda", "brie", "parmesan", "mozzarella",
             "paneer", "cream cheese", "ricotta", "feta"
         ]
         self.cheese_emojis = ["🧀", "🍕"]
-        self.enabled_guilds = {}
-
-    @commands.Cog.listener()
-    async def on_message(self, message):
-        if message.author == self.bot.user or not message.guild:
-            return
 
-        guild_id = message.guild.id
+    async def cog_load(self):
+        # Enabled everywhere until a guild toggles it off
+        self.bot.message_dispatcher.register('cheese', self.handle_message)
 
-        if not self.enabled_guilds.get(guild_id, True):
-            return
+    async def cog_unload(self):
+        self.bot.message_dispatcher.unregister('cheese')
 
+    async def handle_message(self, message):
+        guild_id = message.guild.id
         message_lower = message.content.lower()
         if any(word in message_lower for word in self.trigger_words):
             channel_id = message.channel.id
 
-            current_time = time.time()
-            last_time = self.cooldowns[guild_id].get(channel_id, 0)
-
-            if current_time - last_time < self.cooldown_time:
+            if self.cooldowns.retry_after((guild_id, channel_id),
+                                          self.cooldown_time):
                 return
 
             try:
                 chosen_emoji = random.choice(self.cheese_emojis)
                 await message.add_reaction(chosen_emoji)
-                self.cooldowns[guild_id][channel_id] = current_time
+                self.cooldowns.set((guild_id, channel_id), self.cooldown_time)
             except:
                 pass
 
@@ -49,9 +45,10 @@ class CheeseCog(commands.Cog):
     @commands.has_permissions(manage_guild=True)
     async def togglecheese(self, ctx):
         guild_id = ctx.guild.id
-        self.enabled_guilds[guild_id] = not self.enabled_guilds.get(
-            guild_id, True)
-        status = "enabled" if self.enabled_guilds[guild_id] else "disabled"
+        dispatcher = self.bot.message_dispatcher
+        enabled = not dispatcher.is_enabled(guild_id, 'cheese')
+        dispatcher.set_enabled(guild_id, 'cheese', enabled)
+        status = "enabled" if enabled else "disabled"
         await ctx.send(f"Cheese reactions {status} for this server!")
 
     @togglecheese.error
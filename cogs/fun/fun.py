@@ -24,6 +24,14 @@ QUOTE_IMAGE_SIZE: Tuple[int, int] = (1250, 500)
 FONT_PATH: str = "fonts/ndot47.ttf"
 
 
+def draw_wanted_poster(wanted: Image.Image,
+                       avatar_bytes: bytes) -> Image.Image:
+    pfp: Image.Image = Image.open(BytesIO(avatar_bytes))
+    pfp = pfp.resize((2691, 2510))
+    wanted.paste(pfp, (750, 1867))
+    return wanted
+
+
 class Fun(commands.Cog):
     bot: commands.Bot
     session: aiohttp.ClientSession
@@ -31,14 +39,9 @@ class Fun(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.session = aiohttp.ClientSession()
-        self.meme_module = MemeModule()
-        self.horoscope_module = HoroscopeModule()
-
-    async def cog_unload(self) -> None:
-        await self.session.close()
-        await self.meme_module.close()
-        await self.horoscope_module.close()
+        self.session = bot.session
+        self.meme_module = MemeModule(self.session)
+        self.horoscope_module = HoroscopeModule(self.session)
 
     @app_commands.command(name="meme", description="Get a random meme")
     @app_commands.allowed_installs(guilds=True, users=True)
@@ -251,10 +254,8 @@ class Fun(commands.Cog):
             return
 
         try:
-            avatar_bytes: BytesIO = BytesIO(await user.display_avatar.read())
-            pfp: Image.Image = Image.open(avatar_bytes)
-            pfp = pfp.resize((2691, 2510))
-            wanted.paste(pfp, (750, 1867))
+            avatar_bytes: bytes = await user.display_avatar.read()
+            wanted = draw_wanted_poster(wanted, avatar_bytes)
         except IOError:
             await ctx.send(
                 "Failed to process the avatar image. Please try again.")
@@ -411,13 +412,12 @@ class Fun(commands.Cog):
         else:
             url = f"https://v2.jokeapi.dev/joke/{category}"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status == 200:
-                    return await response.json()
-                else:
-                    raise Exception(
-                        f"Failed to fetch joke: HTTP {response.status}")
+        async with self.session.get(url, params=params) as response:
+            if response.status == 200:
+                return await response.json()
+            else:
+                raise Exception(
+                    f"Failed to fetch joke: HTTP {response.status}")
 
     def format_joke(self, joke: Dict[str, Union[str, Dict[str, str]]]) -> str:
         if joke["type"] == "single":
@@ -496,16 +496,15 @@ class Fun(commands.Cog):
         """Send a neko image or gif based on the user's choice."""
         url = "https://nekos.life/api/v2/img/neko" if choice == "image" else "https://nekos.life/api/v2/img/ngif"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as r:
-                if r.status == 200:
-                    js = await r.json()
-                    embed = discord.Embed(color=0x2f3131)
-                    embed.set_image(url=js['url'])
-                    await ctx.send(embed=embed)
-                else:
-                    await ctx.send(
-                        "Couldn't retrieve the image or gif. Try again later.")
+        async with self.session.get(url) as r:
+            if r.status == 200:
+                js = await r.json()
+                embed = discord.Embed(color=0x2f3131)
+                embed.set_image(url=js['url'])
+                await ctx.send(embed=embed)
+            else:
+                await ctx.send(
+                    "Couldn't retrieve the image or gif. Try again later.")
 
     # Add the slash command choice
     @neko.autocomplete('choice')
@@ -1,11 +1,15 @@
 from enum import IntEnum
 from aiohttp import ClientSession
 from bs4 import BeautifulSoup, Tag
-from typing import Optional, Tuple, List
+from typing import Tuple, List
 
 HOROSCOPE_BASE_URL = "https://www.horoscope.com/us/horoscopes/general/horoscope-general-daily-today.aspx"
 STAR_RATING_BASE_URL = "https://www.horoscope.com/star-ratings/today/"
 PARSER = "html.parser"
+HEADERS = {
+    'User-Agent':
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
 
 
 class ZodiacSign(IntEnum):
@@ -30,8 +34,8 @@ class HoroscopeError(Exception):
 
 class HoroscopeModule:
 
-    def __init__(self):
-        self.session: Optional[ClientSession] = None
+    def __init__(self, session: ClientSession):
+        self.session: ClientSession = session
         # Move ZODIAC_EMOJIS inside the class
         self.ZODIAC_EMOJIS = {
             zodiac_sign:
@@ -39,22 +43,12 @@ class HoroscopeModule:
             for zodiac_sign in ZodiacSign
         }
 
-    async def ensure_session(self) -> ClientSession:
-        """Ensure we have a valid aiohttp session."""
-        if self.session is None:
-            self.session = ClientSession(
-                headers={
-                    'User-Agent':
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                })
-        return self.session
-
     async def get_today_horoscope(self, zodiac_sign: ZodiacSign) -> str:
         """Get today's horoscope text from horoscope.com for the given zodiac sign."""
-        session = await self.ensure_session()
         try:
-            async with session.get(HOROSCOPE_BASE_URL,
-                                   params={"sign": zodiac_sign.value}) as resp:
+            async with self.session.get(HOROSCOPE_BASE_URL,
+                                        params={"sign": zodiac_sign.value},
+                                        headers=HEADERS) as resp:
                 if resp.status != 200:
                     raise HoroscopeError(
                         f"Failed to fetch horoscope: HTTP {resp.status}")
@@ -76,11 +70,10 @@ class HoroscopeModule:
     async def get_today_star_rating(
             self, zodiac_sign: ZodiacSign) -> List[Tuple[str, str]]:
         """Get today's star rating from horoscope.com for the given zodiac sign."""
-        session = await self.ensure_session()
         try:
-            async with session.get(
-                    f"{STAR_RATING_BASE_URL}{zodiac_sign.name.lower()}"
-            ) as resp:
+            async with self.session.get(
+                    f"{STAR_RATING_BASE_URL}{zodiac_sign.name.lower()}",
+                    headers=HEADERS) as resp:
                 if resp.status != 200:
                     raise HoroscopeError(
                         f"Failed to fetch star ratings: HTTP {resp.status}")
@@ -107,8 +100,3 @@ class HoroscopeModule:
                 return star_ratings
         except Exception as e:
             raise HoroscopeError(f"Error getting star ratings: {str(e)}")
-
-    async def close(self):
-        """Clean up the session."""
-        if self.session:
-            await self.session.close()
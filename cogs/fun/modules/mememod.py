@@ -8,7 +8,7 @@ import asyncio
 
 class MemeModule:
 
-    def __init__(self) -> None:
+    def __init__(self, session: aiohttp.ClientSession) -> None:
         self.meme_topics: Dict[str, List[str]] = {
             "general": [
                 "memes", "dankmemes", "funny", "me_irl", "wholesomememes",
@@ -33,14 +33,10 @@ class MemeModule:
                 "DeepFriedMemes", "bonehurtingjuice", "comedyheaven"
             ]
         }
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
+        self.session: aiohttp.ClientSession = session
         self.last_request_time: float = 0
         self.request_cooldown: int = 1
 
-    async def close(self) -> None:
-        """Close the aiohttp session."""
-        await self.session.close()
-
     async def fetch_single_meme(self, topic: str) -> Optional[Dict]:
         """Fetch a single meme from a randomly selected subreddit within the given topic."""
         current_time = asyncio.get_event_loop().time()
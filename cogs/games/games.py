@@ -11,7 +11,6 @@ import discord
 
 from discord_games import button_games
 
-import aiohttp
 import time
 
 from typing import Optional, Dict
@@ -32,7 +31,6 @@ class Games(commands.Cog):
         self.ttt_games: Dict[frozenset[int], TicTacToeGame] = {}
         self.memory_games: Dict[int, MemoryGameView] = {}
         self.active_chess_games: Dict[int, ChessGame] = {}
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
         self.twenty_48_emojis = {
             "0": "<:0_:1301058145988378635>",
             "2": "<:2_:1301058155048075336>",
@@ -50,10 +48,6 @@ class Games(commands.Cog):
             "8192": "<:8192:1301058262543630389>",
         }
 
-    async def cog_unload(self) -> None:
-        """Clean up resources when the cog is unloaded."""
-        await self.session.close()
-
     # Tetris Game Command
     @commands.hybrid_command(name="tetris", brief="Play a game of Tetris")
     @app_commands.allowed_installs(guilds=True, users=False)
@@ -135,8 +129,8 @@ class Games(commands.Cog):
 
     async def _send_trivia(self, ctx: Context, user_id: int,
                            score: int) -> None:
-        question_data: Dict[str,
-                            str] = await TriviaView.fetch_trivia_question()
+        question_data: Dict[str, str] = await TriviaView.fetch_trivia_question(
+            self.bot.session)
 
         category: str = question_data['category']
         difficulty: str = question_data['difficulty']
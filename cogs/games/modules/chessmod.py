@@ -368,7 +368,7 @@ class ChessView(discord.ui.View):
         for child in self.children:
             child.disabled = True
 
-    async def update_board(self, interaction, game_over=False):
+    def render_board(self):
         flip_board = self.game.current_player == self.game.player2 and self.game.board.turn == chess.BLACK
 
         arrows = []
@@ -392,7 +392,10 @@ class ChessView(discord.ui.View):
                                     squares=squares,
                                     size=800)
 
-        png_image = self.convert_svg_to_png(svg_board)
+        return self.convert_svg_to_png(svg_board)
+
+    async def update_board(self, interaction, game_over=False):
+        png_image = self.render_board()
         file = discord.File(io.BytesIO(png_image), filename="chessboard.png")
 
         white_captured, black_captured = self.game.get_captured_pieces_display(
@@ -130,12 +130,11 @@ class TriviaView(discord.ui.View):
             play_again_view.message = await interaction.original_response()
 
     @staticmethod
-    async def fetch_trivia_question():
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    'https://opentdb.com/api.php?amount=1&type=multiple'
-            ) as response:
-                data = await response.json()
+    async def fetch_trivia_question(session: aiohttp.ClientSession):
+        async with session.get(
+                'https://opentdb.com/api.php?amount=1&type=multiple'
+        ) as response:
+            data = await response.json()
 
         question_data = data['results'][0]
         category = question_data['category']
@@ -15,8 +15,29 @@ class MentionableTree(app_commands.CommandTree):
         self.application_commands: dict[Optional[int], List[app_commands.AppCommand]] = {}
         self.cache: dict[Optional[int], dict[app_commands.Command | commands.HybridCommand | str, str]] = {}
 
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """Method overwritten to time commands and load lazy extensions before the command lookup."""
+        metrics = getattr(self.client, 'metrics', None)
+        if metrics is not None:
+            metrics.start_interaction(interaction)
+        loader = getattr(self.client, 'extension_loader', None)
+        if loader is None:
+            return True
+        return await loader.activate_for_interaction(interaction)
+
+    async def on_error(self, interaction: discord.Interaction, error: app_commands.AppCommandError, /) -> None:
+        """Method overwritten to count failed commands."""
+        metrics = getattr(self.client, 'metrics', None)
+        if metrics is not None:
+            metrics.finish_interaction(interaction, failed=True)
+        await super().on_error(interaction, error)
+
     async def sync(self, *, guild: Optional[discord.abc.Snowflake] = None):
         """Method overwritten to store the commands."""
+        # Lazy commands must be in the tree, or syncing would remove them.
+        loader = getattr(self.client, 'extension_loader', None)
+        if loader is not None:
+            await loader.activate_all()
         ret = await super().sync(guild=guild)
         guild_id = guild.id if guild else None
         self.application_commands[guild_id] = ret
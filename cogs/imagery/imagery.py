@@ -9,11 +9,10 @@ from io import BytesIO
 from PIL import Image
 from discord.app_commands import Choice
 from typing import Optional, List, Dict
-from collections import defaultdict
-import time
-import requests
 from typing import Union
 
+from helpers.cooldowns import CooldownStore
+
 from .modules.asciify import asciify
 from .modules.emojify import emojify_image
 from .modules.image_search_engine import ImageSearchEngine
@@ -22,8 +21,9 @@ from .modules.image_search_engine import ImageSearchEngine
 # OCR Service for text recognition
 class OCRService:
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, session: aiohttp.ClientSession):
         self.api_key = api_key
+        self.session = session
         self.url = "https://api.ocr.space/parse/image"
 
     async def extract_text(self, image_data: bytes) -> Dict:
@@ -39,10 +39,9 @@ class OCRService:
         data.add_field('isTable', 'false')
         data.add_field('OCREngine', '2')
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.url, data=data,
-                                    ssl=False) as response:
-                return await response.json()
+        async with self.session.post(self.url, data=data,
+                                     ssl=False) as response:
+            return await response.json()
 
 
 # UI Modal for page navigation in the Paginator
@@ -192,24 +191,16 @@ class Imagery(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.ocr_service = OCRService(os.environ["ITT_KEY"])
+        self.session: aiohttp.ClientSession = bot.session
+        self.ocr_service = OCRService(os.environ["ITT_KEY"], self.session)
         self.api_key = os.environ["PLANTNET_API_KEY"]
         self.api_url = "https://my-api.plantnet.org/v2/identify/all"
-        self.cooldowns = defaultdict(lambda: 0)
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
-        self.search_engine = ImageSearchEngine()
-
-    async def cog_unload(self):
-        await self.session.close()
+        self.cooldowns = CooldownStore('imagery')
+        self.search_engine = ImageSearchEngine(self.session)
 
     async def cooldown_check(self, interaction: discord.Interaction) -> bool:
-        current_time = time.time()
-        if current_time - self.cooldowns[(interaction.guild_id,
-                                          interaction.user.id)] < 5:
-            return False
-        self.cooldowns[(interaction.guild_id,
-                        interaction.user.id)] = current_time
-        return True
+        return not self.cooldowns.hit(
+            (interaction.guild_id, interaction.user.id), 5)
 
     @app_commands.command(
         name="identify",
@@ -443,9 +434,11 @@ class Imagery(commands.Cog):
         if isinstance(url, discord.Member):
             url = url.display_avatar.url
 
+        async with self.session.get(url) as response:
+            image_data = await response.read()
+
         def get_emojified_image():
-            r = requests.get(url, stream=True)
-            image = Image.open(r.raw).convert("RGB")
+            image = Image.open(BytesIO(image_data)).convert("RGB")
             res = emojify_image(image, size)
             if size > size:
                 res = f"```{res}```"
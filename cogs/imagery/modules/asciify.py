@@ -6,12 +6,12 @@ from io import BytesIO
 import aiohttp
 import re
 
-async def fetch_image(url: str) -> bytes:
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                raise Exception(f"Failed to fetch image: {response.status}")
-            return await response.read()
+
+async def fetch_image(session: aiohttp.ClientSession, url: str) -> bytes:
+    async with session.get(url) as response:
+        if response.status != 200:
+            raise Exception(f"Failed to fetch image: {response.status}")
+        return await response.read()
 
 
 def process_image(image_data: bytes, new_width: int) -> Image.Image:
@@ -48,7 +48,7 @@ async def asciify(ctx: commands.Context,
         return
 
     try:
-        image_data = await fetch_image(url)
+        image_data = await fetch_image(ctx.bot.session, url)
         image = process_image(image_data, new_width)
         ascii_art = create_ascii_art(image)
 
@@ -58,4 +58,4 @@ async def asciify(ctx: commands.Context,
             file = File(buffer, filename="ascii_art.txt")
             await ctx.send(file=file)
     except Exception as e:
-        await ctx.send(f"Error: {str(e)}")
\ No newline at end of file
+        await ctx.send(f"Error: {str(e)}")
@@ -6,7 +6,8 @@ import logging
 
 class ImageSearchEngine:
 
-    def __init__(self):
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
         self.logger = logging.getLogger('image_search_engine')
 
     def _encode_image_url(self, url: str) -> str:
@@ -35,12 +36,11 @@ class ImageSearchEngine:
     async def validate_image(self, url: str) -> bool:
         """Validate if URL points to a valid image"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.head(url) as response:
-                    if response.status != 200:
-                        return False
-                    content_type = response.headers.get('content-type', '')
-                    return content_type.startswith('image/')
+            async with self.session.head(url) as response:
+                if response.status != 200:
+                    return False
+                content_type = response.headers.get('content-type', '')
+                return content_type.startswith('image/')
         except Exception as e:
             self.logger.error(f"Error validating image URL: {str(e)}")
             return False
@@ -2,15 +2,18 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 import random
-from PIL import Image, ImageDraw, ImageFont, ImageEnhance
 import io
-import time
 from typing import Optional, Dict, Union
-import os
-import base64
 
+from helpers.cooldowns import CooldownStore
 from helpers.database import db
+from helpers.metrics import track_phase
+from .modules.backgrounds import backgrounds
 from .modules.levelmod import *
+from .modules.rankcard import render_rank_card_async
+from .modules.rankindex import RankIndex
+from .modules.rolesync import RoleRewardSync, apply_rewards
+from .modules.xpbuffer import XPAccumulator
 
 
 class Leveling(commands.Cog):
@@ -20,18 +23,33 @@ class Leveling(commands.Cog):
         self.leveling_settings: Dict[int,
                                      Dict[str,
                                           int | bool | Optional[int]]] = {}
-        self.cooldowns: Dict[int, Dict[int, float]] = {}
+        self.cooldowns = CooldownStore('leveling')
         self.default_level_up_message: str = "Congratulations {user_mention}! You've reached level {new_level}! {role_rewards}"
         self.role_rewards: Dict[int, Dict[int, int]] = {}
+        self.xp_buffer = XPAccumulator(self.calculate_level)
+        self.ranks = RankIndex(self.xp_buffer)
+        self.role_sync = RoleRewardSync(self)
 
     async def cog_load(self):
         await db.initialize()
         await self.create_tables()
         await self.load_settings()
         await self.load_role_rewards()
+        await backgrounds.preload_builtin()
         self.db = db
+        self.xp_buffer.start()
+        await self.role_sync.resume()
+        self.bot.message_dispatcher.register('leveling',
+                                             self.handle_message,
+                                             default_enabled=False)
+        for guild_id, settings in self.leveling_settings.items():
+            self.bot.message_dispatcher.set_enabled(guild_id, 'leveling',
+                                                    settings['enabled'])
 
     async def cog_unload(self):
+        self.bot.message_dispatcher.unregister('leveling')
+        self.role_sync.stop()
+        await self.xp_buffer.close()
         await self.db.close()
 
     async def is_premium(self, user_id: int) -> bool:
@@ -54,18 +72,12 @@ class Leveling(commands.Cog):
         user_id = user.id
 
         # Get updated XP and rank
-        query = """
-        SELECT xp, 
-               (SELECT COUNT(*) FROM user_levels ul2 
-                WHERE ul2.guild_id = $2 AND ul2.xp > ul1.xp) + 1 AS rank
-        FROM user_levels ul1
-        WHERE user_id = $1 AND guild_id = $2;
-        """
-        result = await db.fetch(query, user_id, guild_id)
-        if not result:
+        index = await self.ranks.get(guild_id)
+        rank = index.rank(user_id)
+        if rank is None:
             return  # User not found in database
 
-        xp, rank = result[0]['xp'], result[0]['rank']
+        xp = index.members[user_id][0]
 
         # Create rank card
         rank_card = await self.create_rank_card(user, xp, new_level, rank)
@@ -119,12 +131,25 @@ class Leveling(commands.Cog):
                 PRIMARY KEY (guild_id, level)
             );
             """, """
+            CREATE TABLE IF NOT EXISTS background_images (
+                hash TEXT PRIMARY KEY,
+                data BYTEA NOT NULL
+            );
+            """, """
             CREATE TABLE IF NOT EXISTS user_backgrounds (
                 user_id BIGINT,
                 guild_id BIGINT,
-                background TEXT,
+                background_hash TEXT REFERENCES background_images(hash),
                 PRIMARY KEY (user_id, guild_id)
             );
+            """, """
+            CREATE TABLE IF NOT EXISTS role_sync_jobs (
+                guild_id BIGINT PRIMARY KEY,
+                total INT DEFAULT 0,
+                done INT DEFAULT 0,
+                last_user_id BIGINT DEFAULT 0,
+                updated_at TIMESTAMPTZ DEFAULT NOW()
+            );
             """
         ]
 
@@ -167,6 +192,39 @@ class Leveling(commands.Cog):
         except Exception as e:
             print(f"Error checking/adding columns: {e}")
 
+        # Backgrounds used to be stored base64-encoded in every
+        # user_backgrounds row; move them to background_images, one row
+        # per distinct image.
+        migrate_backgrounds_query = """
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name='user_backgrounds' AND column_name='background_hash') THEN
+                ALTER TABLE user_backgrounds ADD COLUMN background_hash TEXT REFERENCES background_images(hash);
+            END IF;
+            IF EXISTS (SELECT 1 FROM information_schema.columns
+                       WHERE table_name='user_backgrounds' AND column_name='background') THEN
+                INSERT INTO background_images (hash, data)
+                SELECT DISTINCT ON (hash) hash, data
+                FROM (SELECT encode(sha256(decode(background, 'base64')), 'hex') AS hash,
+                             decode(background, 'base64') AS data
+                      FROM user_backgrounds
+                      WHERE background IS NOT NULL) AS images
+                ON CONFLICT (hash) DO NOTHING;
+                UPDATE user_backgrounds
+                SET background_hash = encode(sha256(decode(background, 'base64')), 'hex')
+                WHERE background IS NOT NULL;
+                ALTER TABLE user_backgrounds DROP COLUMN background;
+                RAISE NOTICE 'Backgrounds deduplicated';
+            END IF;
+        END $$;
+        """
+
+        try:
+            await db.execute(migrate_backgrounds_query)
+        except Exception as e:
+            print(f"Error migrating rank card backgrounds: {e}")
+
         if changes_made:
             print("Database tables and columns checked/created successfully.")
 
@@ -205,11 +263,7 @@ class Leveling(commands.Cog):
         except Exception as e:
             print(f"Error loading role rewards: {e}")
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot or not message.guild:
-            return
-
+    async def handle_message(self, message: discord.Message):
         guild_settings = self.leveling_settings.get(message.guild.id)
         if not guild_settings or not guild_settings['enabled']:
             return
@@ -217,17 +271,14 @@ class Leveling(commands.Cog):
         user_id = message.author.id
         guild_id = message.guild.id
 
-        current_time = time.time()
-        if guild_id not in self.cooldowns:
-            self.cooldowns[guild_id] = {}
-        last_message_time = self.cooldowns[guild_id].get(user_id, 0)
-        if current_time - last_message_time < guild_settings['xp_cooldown']:
+        # Started before awaiting so a burst of messages only counts once
+        if self.cooldowns.hit((guild_id, user_id),
+                              guild_settings['xp_cooldown']):
             return
 
         xp_gained = random.randint(guild_settings['xp_min'],
                                    guild_settings['xp_max'])
         leveled_up, new_level = await self.add_xp(user_id, guild_id, xp_gained)
-        self.cooldowns[guild_id][user_id] = current_time
 
         if leveled_up:
             awarded_roles = await self.check_and_award_role(
@@ -237,34 +288,18 @@ class Leveling(commands.Cog):
 
     async def add_xp(self, user_id: int, guild_id: int,
                      xp: int) -> tuple[bool, int]:
-        query = """
-        INSERT INTO user_levels (user_id, guild_id, xp, level)
-        VALUES ($1, $2, $3, 0)
-        ON CONFLICT (user_id, guild_id)
-        DO UPDATE SET xp = user_levels.xp + $3
-        RETURNING xp, level;
-        """
-        result = await db.fetch(query, user_id, guild_id, xp)
-        new_xp, current_level = result[0]['xp'], result[0]['level']
-
-        new_level = self.calculate_level(new_xp)
-        if new_level > current_level:
-            await self.update_level(user_id, guild_id, new_level)
-            return True, new_level
-        return False, current_level
+        # Buffered; written to user_levels by the accumulator's next flush
+        leveled_up, level = await self.xp_buffer.add(guild_id, user_id, xp)
+        entry = self.xp_buffer.entries.get((guild_id, user_id))
+        if entry is not None:
+            self.ranks.update(guild_id, user_id, entry.xp, entry.level)
+        return leveled_up, level
 
     def calculate_level(self, xp: int) -> int:
         return int((xp // 100)**0.5)
 
-    async def update_level(self, user_id: int, guild_id: int, new_level: int):
-        query = """
-        UPDATE user_levels
-        SET level = $3
-        WHERE user_id = $1 AND guild_id = $2;
-        """
-        await db.execute(query, user_id, guild_id, new_level)
-
     async def get_level(self, user_id: int, guild_id: int) -> int:
+        await self.xp_buffer.flush(guild_id)
         query = "SELECT level FROM user_levels WHERE user_id = $1 AND guild_id = $2;"
         result = await db.fetch(query, user_id, guild_id)
         return result[0]['level'] if result else 0
@@ -274,165 +309,17 @@ class Leveling(commands.Cog):
 
     async def create_rank_card(self, member: discord.Member, xp: int,
                                level: int, rank: int) -> io.BytesIO:
-        card_width, card_height = 800, 200
-
-        query = "SELECT background FROM user_backgrounds WHERE user_id = $1 AND guild_id = $2;"
-        result = await db.fetch(query, member.id, member.guild.id)
-        background_data = result[0]['background'] if result else None
-
-        if background_data:
-            try:
-                image_data = base64.b64decode(background_data)
-                background = Image.open(io.BytesIO(image_data)).convert('RGBA')
-
-                # Calculate scaling factor to cover the card while maintaining aspect ratio
-                bg_ratio = background.width / background.height
-                card_ratio = card_width / card_height
-
-                if bg_ratio > card_ratio:
-                    new_height = card_height
-                    new_width = int(new_height * bg_ratio)
-                else:
-                    new_width = card_width
-                    new_height = int(new_width / bg_ratio)
-
-                background = background.resize((new_width, new_height),
-                                               Image.Resampling.LANCZOS)
-
-                # Crop to fit
-                left = (background.width - card_width) // 2
-                top = (background.height - card_height) // 2
-                background = background.crop(
-                    (left, top, left + card_width, top + card_height))
-
-                card = Image.new('RGBA', (card_width, card_height),
-                                 (0, 0, 0, 0))
-                card.paste(background, (0, 0), background)
-            except:
-                # If there's an error with the custom background, fall back to default
-                card = Image.new('RGBA', (card_width, card_height),
-                                 (0, 0, 0, 0))
-        else:
-            card = Image.new('RGBA', (card_width, card_height), (0, 0, 0, 0))
-
-            gradient = Image.new('RGBA', (card_width, card_height),
-                                 (0, 0, 0, 0))
-            gradient_draw = ImageDraw.Draw(gradient)
-
-            avatar_size = 150
-            avatar_url = member.display_avatar.replace(format='png', size=256)
-            avatar_data = io.BytesIO(await avatar_url.read())
-            avatar_image = Image.open(avatar_data).convert('RGBA')
-            avatar_image = avatar_image.resize((avatar_size, avatar_size),
-                                               Image.Resampling.LANCZOS)
-
-            try:
-                avatar_colors = avatar_image.getcolors(avatar_image.size[0] *
-                                                       avatar_image.size[1])
-                dominant_color = max(avatar_colors, key=lambda x: x[0])[1][:3]
-            except:
-                dominant_color = (100, 100, 100)
-
-            for y in range(card_height):
-                alpha = int(255 * (1 - y / card_height))
-                gradient_draw.line([(0, y), (card_width, y)],
-                                   fill=dominant_color + (alpha, ))
-
-            card = Image.alpha_composite(card, gradient)
-
-        # Avatar
-        avatar_size = 150
-        avatar_url = member.display_avatar.replace(format='png', size=256)
-        avatar_data = io.BytesIO(await avatar_url.read())
-        avatar_image = Image.open(avatar_data).convert('RGBA')
-        avatar_image = avatar_image.resize((avatar_size, avatar_size),
-                                           Image.Resampling.LANCZOS)
-
-        mask = Image.new('L', (avatar_size, avatar_size), 0)
-        mask_draw = ImageDraw.Draw(mask)
-        mask_draw.ellipse((0, 0, avatar_size, avatar_size), fill=255)
-
-        card.paste(avatar_image, (25, 25), mask)
-
-        # Text
-        draw = ImageDraw.Draw(card)
-
-        try:
-            title_font = ImageFont.truetype("fonts/ndot47.ttf", 40)
-            text_font = ImageFont.truetype("fonts/InterVariable.ttf", 28)
-            xp_font = ImageFont.truetype("fonts/InterVariable.ttf", 20)
-        except IOError:
-            title_font = ImageFont.load_default()
-            text_font = ImageFont.load_default()
-            xp_font = ImageFont.load_default()
-
-        draw.text((200, 13),
-                  member.display_name,
-                  font=title_font,
-                  fill=(255, 255, 255, 255))
-        draw.text((200, 71),
-                  f"Rank: #{rank}",
-                  font=text_font,
-                  fill=(255, 255, 255, 255))
-        draw.text((200, 107),
-                  f"Level: {level}",
-                  font=text_font,
-                  fill=(255, 255, 255, 255))
-
-        # XP Bar
-        xp_to_next_level = (level + 1)**2 * 100
-        progress = xp / xp_to_next_level
-        bar_width, bar_height = 500, 30
-        bar_x, bar_y = 200, 151
-
-        def rounded_rectangle(size, radius):
-            rect = Image.new('RGBA', size, (0, 0, 0, 0))
-            draw = ImageDraw.Draw(rect)
-            draw.rounded_rectangle([(0, 0), size],
-                                   radius,
-                                   fill=(255, 255, 255, 255))
-            return rect
-
-        bar_bg = rounded_rectangle((bar_width, bar_height), bar_height // 2)
-        bar_bg = ImageEnhance.Brightness(bar_bg).enhance(0.2)
-        card.paste(bar_bg, (bar_x, bar_y), bar_bg)
-
-        start_color = (138, 43, 226)
-        end_color = (75, 0, 130)
-
-        progress_width = int(bar_width * progress)
-        progress_bar = Image.new('RGBA', (progress_width, bar_height),
-                                 (0, 0, 0, 0))
-        progress_draw = ImageDraw.Draw(progress_bar)
-        for x in range(progress_width):
-            r = int(start_color[0] + (end_color[0] - start_color[0]) *
-                    (x / progress_width))
-            g = int(start_color[1] + (end_color[1] - start_color[1]) *
-                    (x / progress_width))
-            b = int(start_color[2] + (end_color[2] - start_color[2]) *
-                    (x / progress_width))
-            progress_draw.line([(x, 0), (x, bar_height)], fill=(r, g, b, 255))
-
-        progress_mask = rounded_rectangle((progress_width, bar_height),
-                                          bar_height // 2)
-        card.paste(progress_bar, (bar_x, bar_y), progress_mask)
-
-        xp_text = f"{xp}/{xp_to_next_level} XP"
-        bbox = draw.textbbox((0, 0), xp_text, font=xp_font)
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
-        text_x = bar_x + (bar_width - text_width) // 2
-        text_y = bar_y + (bar_height - text_height) // 2 - 1
-
-        draw.text((text_x, text_y),
-                  xp_text,
-                  font=xp_font,
-                  fill=(255, 255, 255, 255))
-
-        buffer = io.BytesIO()
-        card.save(buffer, 'PNG')
-        buffer.seek(0)
-        return buffer
+        with track_phase('render'):
+            return await self._draw_rank_card(member, xp, level, rank)
+
+    async def _draw_rank_card(self, member: discord.Member, xp: int,
+                              level: int, rank: int) -> io.BytesIO:
+        background_hash = await backgrounds.user_background(
+            member.id, member.guild.id)
+        card = await render_rank_card_async(member.display_name, xp, level,
+                                            rank, member.display_avatar,
+                                            background_hash)
+        return io.BytesIO(card)
 
     @level_group.command(name="rank")
     async def rank(self,
@@ -450,30 +337,25 @@ class Leveling(commands.Cog):
             member = member or interaction.user
             user_id, guild_id = member.id, interaction.guild_id
 
-            # First, get all users' XP and calculate ranks
-            query = """
-            SELECT user_id, xp, level,
-                   ROW_NUMBER() OVER (ORDER BY xp DESC) as rank
-            FROM user_levels
-            WHERE guild_id = $1
-            ORDER BY xp DESC;
-            """
-            all_results = await db.fetch(query, guild_id)
-
-            user_data = next(
-                (r for r in all_results if r['user_id'] == user_id), None)
+            index = await self.ranks.get(guild_id)
+            rank = index.rank(user_id)
 
-            if not user_data:
+            if rank is None:
                 return await interaction.followup.send(
                     f"{member.display_name} has not gained any XP yet.",
                     ephemeral=True)
 
-            xp, level, rank = user_data['xp'], user_data['level'], user_data[
-                'rank']
+            xp, level = index.members[user_id]
             card = await self.create_rank_card(member, xp, level, rank)
 
+            next_above = index.next_above(user_id)
+            content = (
+                f"{next_above[1] - xp} XP to overtake <@{next_above[0]}>"
+                if next_above else None)
             await interaction.followup.send(
-                file=discord.File(card, filename="rank_card.png"))
+                content=content,
+                file=discord.File(card, filename="rank_card.png"),
+                allowed_mentions=discord.AllowedMentions.none())
         except Exception as e:
             await interaction.followup.send(f"An error occurred: {str(e)}",
                                             ephemeral=True)
@@ -566,6 +448,9 @@ class Leveling(commands.Cog):
                 'level_up_message': view.level_up_message
             }
             self.leveling_settings[interaction.guild_id] = new_settings
+            self.bot.message_dispatcher.set_enabled(interaction.guild_id,
+                                                    'leveling',
+                                                    view.is_enabled)
 
             query = """
             INSERT INTO guild_leveling_settings (guild_id, enabled, xp_min, xp_max, xp_cooldown, announcement_channel, level_up_message)
@@ -621,15 +506,8 @@ class Leveling(commands.Cog):
                     "Leveling system is not enabled in this server.",
                     ephemeral=True)
 
-            query = """
-            SELECT user_id, xp, level,
-                   ROW_NUMBER() OVER (ORDER BY xp DESC) as rank
-            FROM user_levels
-            WHERE guild_id = $1
-            ORDER BY xp DESC
-            LIMIT $2;
-            """
-            results = await db.fetch(query, interaction.guild_id, top)
+            index = await self.ranks.get(interaction.guild_id)
+            results = index.top(top)
 
             if not results:
                 return await interaction.followup.send(
@@ -637,13 +515,12 @@ class Leveling(commands.Cog):
 
             embed = discord.Embed(title="🏆 XP Leaderboard",
                                   color=discord.Color.gold())
-            for row in results:
-                user = interaction.guild.get_member(row['user_id'])
+            for rank, (user_id, xp, level) in enumerate(results, start=1):
+                user = interaction.guild.get_member(user_id)
                 if user:
-                    embed.add_field(
-                        name=f"{row['rank']}. {user.display_name}",
-                        value=f"Level: {row['level']} (XP: {row['xp']})",
-                        inline=False)
+                    embed.add_field(name=f"{rank}. {user.display_name}",
+                                    value=f"Level: {level} (XP: {xp})",
+                                    inline=False)
 
             await interaction.followup.send(embed=embed)
         except Exception as e:
@@ -664,46 +541,36 @@ class Leveling(commands.Cog):
 
             user_id, guild_id = member.id, interaction.guild_id
 
-            # Get current XP and level
-            query = "SELECT xp, level FROM user_levels WHERE user_id = $1 AND guild_id = $2;"
-            result = await db.fetch(query, user_id, guild_id)
-
-            if not result:
-                current_xp, current_level = 0, 0
-            else:
-                current_xp, current_level = result[0]['xp'], result[0]['level']
+            # No flush may land between the read and the write
+            async with self.xp_buffer.writing(guild_id, user_id):
+                # Get current XP and level
+                query = "SELECT xp, level FROM user_levels WHERE user_id = $1 AND guild_id = $2;"
+                result = await db.fetch(query, user_id, guild_id)
 
-            # Calculate new level and XP
-            new_level = max(0, current_level +
-                            levels)  # Ensure level doesn't go below 0
-            new_xp = new_level**2 * 100  # Ensure XP is at least the minimum for the new level
+                if not result:
+                    current_xp, current_level = 0, 0
+                else:
+                    current_xp, current_level = result[0]['xp'], result[0][
+                        'level']
 
-            # Update database
-            query = """
-            INSERT INTO user_levels (user_id, guild_id, xp, level)
-            VALUES ($1, $2, $3, $4)
-            ON CONFLICT (user_id, guild_id)
-            DO UPDATE SET xp = $3, level = $4;
-            """
-            await db.execute(query, user_id, guild_id, new_xp, new_level)
+                # Calculate new level and XP
+                new_level = max(0, current_level +
+                                levels)  # Ensure level doesn't go below 0
+                new_xp = new_level**2 * 100  # Ensure XP is at least the minimum for the new level
 
-            awarded_roles = []
-            removed_roles = []
+                # Update database
+                query = """
+                INSERT INTO user_levels (user_id, guild_id, xp, level)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (user_id, guild_id)
+                DO UPDATE SET xp = $3, level = $4;
+                """
+                await db.execute(query, user_id, guild_id, new_xp, new_level)
+            self.ranks.update(guild_id, user_id, new_xp, new_level)
 
-            if levels > 0:
-                # Check and award roles for all levels up to and including the new level
-                for level in range(current_level + 1, new_level + 1):
-                    awarded_roles.extend(await self.check_and_award_role(
-                        member, level))
-            elif levels < 0:
-                # Remove roles that the user no longer qualifies for
-                for level in range(current_level, new_level, -1):
-                    removed_roles.extend(await self.check_and_remove_role(
-                        member, level))
-
-            # Remove duplicates while preserving order
-            unique_awarded_roles = list(dict.fromkeys(awarded_roles))
-            unique_removed_roles = list(dict.fromkeys(removed_roles))
+            # Award and remove reward roles in one call each
+            unique_awarded_roles, unique_removed_roles = await apply_rewards(
+                member, new_level, self.role_rewards.get(guild_id, {}))
 
             if levels > 0:
                 # Announce level up and role rewards
@@ -760,8 +627,12 @@ class Leveling(commands.Cog):
                 self.role_rewards[interaction.guild_id] = {}
             self.role_rewards[interaction.guild_id][level] = role.id
 
+            # Bring existing members' roles in line in the background
+            progress = await self.role_sync.schedule(interaction.guild_id)
+
             await interaction.followup.send(
-                f"Successfully set `@{role.name}` as the reward for reaching level {level}."
+                f"Successfully set `@{role.name}` as the reward for reaching level {level}. "
+                f"Roles of {progress.total} ranked members are being updated in the background."
             )
 
             # Update the setup wizard if it's open
@@ -788,6 +659,27 @@ class Leveling(commands.Cog):
             await interaction.response.send_message(
                 f"An error occurred: {str(error)}", ephemeral=True)
 
+    @level_group.command(name="sync_roles")
+    @app_commands.checks.has_permissions(manage_roles=True)
+    async def sync_roles(self, interaction: discord.Interaction):
+        """Bring every ranked member's reward roles in line with their level"""
+        progress = self.role_sync.running(interaction.guild_id)
+        if progress is None:
+            if not self.role_rewards.get(interaction.guild_id):
+                return await interaction.response.send_message(
+                    "This server has no role rewards to sync.", ephemeral=True)
+            await interaction.response.defer(ephemeral=True)
+            progress = await self.role_sync.schedule(interaction.guild_id)
+            return await interaction.followup.send(
+                f"Started updating the reward roles of {progress.total} ranked members.",
+                ephemeral=True)
+
+        await interaction.response.send_message(
+            f"Role sync in progress: {progress.done}/{progress.total} members checked, "
+            f"{progress.added} roles added, {progress.removed} removed, "
+            f"{progress.failed} members failed.",
+            ephemeral=True)
+
     async def check_and_award_role(self, member: discord.Member,
                                    new_level: int):
         guild_id = member.guild.id
@@ -821,33 +713,31 @@ class Leveling(commands.Cog):
 
             user_id, guild_id = member.id, interaction.guild_id
 
-            # Get current level
-            query = "SELECT level FROM user_levels WHERE user_id = $1 AND guild_id = $2;"
-            result = await db.fetch(query, user_id, guild_id)
+            # No flush may land between the read and the write
+            async with self.xp_buffer.writing(guild_id, user_id):
+                # Get current level
+                query = "SELECT level FROM user_levels WHERE user_id = $1 AND guild_id = $2;"
+                result = await db.fetch(query, user_id, guild_id)
+
+                if result:
+                    # Reset user's XP and level
+                    query = """
+                    UPDATE user_levels
+                    SET xp = 0, level = 0
+                    WHERE user_id = $1 AND guild_id = $2;
+                    """
+                    await db.execute(query, user_id, guild_id)
 
             if not result:
                 return await interaction.followup.send(
                     f"{member.mention} has no levels to reset.",
                     ephemeral=True)
 
-            current_level = result[0]['level']
-
-            # Reset user's XP and level
-            query = """
-            UPDATE user_levels
-            SET xp = 0, level = 0
-            WHERE user_id = $1 AND guild_id = $2;
-            """
-            await db.execute(query, user_id, guild_id)
+            self.ranks.update(guild_id, user_id, 0, 0)
 
             # Remove all level-based roles
-            removed_roles = []
-            for level in range(1, current_level + 1):
-                removed_roles.extend(await
-                                     self.check_and_remove_role(member, level))
-
-            # Remove duplicates while preserving order
-            unique_removed_roles = list(dict.fromkeys(removed_roles))
+            _, unique_removed_roles = await apply_rewards(
+                member, 0, self.role_rewards.get(guild_id, {}))
 
             removed_text = f"They lost the following roles: `{', '.join([role.name for role in unique_removed_roles])}`." if unique_removed_roles else ""
 
@@ -870,24 +760,6 @@ class Leveling(commands.Cog):
             await interaction.response.send_message(
                 f"An error occurred: {str(error)}", ephemeral=True)
 
-    async def check_and_remove_role(self, member: discord.Member, level: int):
-        guild_id = member.guild.id
-        removed_roles = []
-        if guild_id in self.role_rewards:
-            for reward_level, role_id in sorted(
-                    self.role_rewards[guild_id].items(), reverse=True):
-                if level <= reward_level:
-                    role = member.guild.get_role(role_id)
-                    if role and role in member.roles:
-                        try:
-                            await member.remove_roles(role)
-                            removed_roles.append(role)
-                        except discord.Forbidden:
-                            print(
-                                f"Failed to remove role {role.name} from {member.name} due to insufficient permissions."
-                            )
-        return removed_roles
-
     @level_group.command(name="card")
     async def card(self,
                    interaction: discord.Interaction,
@@ -908,27 +780,16 @@ class Leveling(commands.Cog):
                         "Please upload a valid image file.", ephemeral=True)
                     return
 
-                image_data = await image.read()
-                image_base64 = base64.b64encode(image_data).decode('utf-8')
-
-                query = """
-                INSERT INTO user_backgrounds (user_id, guild_id, background)
-                VALUES ($1, $2, $3)
-                ON CONFLICT (user_id, guild_id)
-                DO UPDATE SET background = $3;
-                """
-                await db.execute(query, interaction.user.id,
-                                 interaction.guild_id, image_base64)
+                image_hash = await backgrounds.put(await image.read())
+                await backgrounds.set_user_background(interaction.user.id,
+                                                      interaction.guild_id,
+                                                      image_hash)
 
                 await interaction.followup.send(
                     "Your rank card background has been updated with your custom image.",
                     ephemeral=True)
             else:
-                backgrounds_dir = "backgrounds"
-                background_files = [
-                    f for f in os.listdir(backgrounds_dir)
-                    if f.lower().endswith(('.png', '.jpg', '.jpeg', '.webp'))
-                ]
+                background_files = list(backgrounds.builtin)
 
                 if not background_files:
                     await interaction.followup.send(
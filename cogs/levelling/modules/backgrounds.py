@@ -0,0 +1,91 @@
+"""
+Content-addressed storage for rank card backgrounds.
+
+Each distinct image is stored once in ``background_images``, keyed by the
+hex SHA-256 of its bytes, and ``user_backgrounds`` only holds that hash.
+Built-in backgrounds from the ``backgrounds/`` directory are inserted at
+startup, so choosing one is a single small upsert.
+"""
+
+import asyncio
+import hashlib
+import os
+from typing import Dict, Optional
+
+from helpers.database import db
+
+BUILTIN_DIR: str = "backgrounds"
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+
+def content_hash(data: bytes) -> str:
+    # Matches encode(sha256(data), 'hex') used by the table migration
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_builtin(directory: str) -> Dict[str, bytes]:
+    images = {}
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(directory, name), 'rb') as image_file:
+                images[name] = image_file.read()
+    return images
+
+
+class BackgroundStore:
+
+    def __init__(self) -> None:
+        # Built-in file name -> content hash
+        self.builtin: Dict[str, str] = {}
+
+    async def preload_builtin(self, directory: str = BUILTIN_DIR) -> None:
+        try:
+            images = await asyncio.to_thread(_read_builtin, directory)
+        except FileNotFoundError:
+            return
+        hashes = {name: content_hash(data) for name, data in images.items()}
+
+        # Only upload the images that are not stored yet
+        query = "SELECT hash FROM background_images WHERE hash = ANY($1::TEXT[]);"
+        stored = {
+            row['hash']
+            for row in await db.fetch(query, list(hashes.values()))
+        }
+        for name, data in images.items():
+            if hashes[name] not in stored:
+                await self.put(data)
+        self.builtin = hashes
+
+    async def put(self, data: bytes) -> str:
+        image_hash = content_hash(data)
+        query = """
+        INSERT INTO background_images (hash, data)
+        VALUES ($1, $2)
+        ON CONFLICT (hash) DO NOTHING;
+        """
+        await db.execute(query, image_hash, data)
+        return image_hash
+
+    async def get(self, image_hash: str) -> Optional[bytes]:
+        query = "SELECT data FROM background_images WHERE hash = $1;"
+        result = await db.fetch(query, image_hash)
+        return result[0]['data'] if result else None
+
+    async def user_background(self, user_id: int,
+                              guild_id: int) -> Optional[str]:
+        query = "SELECT background_hash FROM user_backgrounds WHERE user_id = $1 AND guild_id = $2;"
+        result = await db.fetch(query, user_id, guild_id)
+        return result[0]['background_hash'] if result else None
+
+    async def set_user_background(self, user_id: int, guild_id: int,
+                                  image_hash: str) -> None:
+        query = """
+        INSERT INTO user_backgrounds (user_id, guild_id, background_hash)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (user_id, guild_id)
+        DO UPDATE SET background_hash = $3;
+        """
+        await db.execute(query, user_id, guild_id, image_hash)
+
+
+backgrounds = BackgroundStore()
@@ -11,11 +11,11 @@ __all__ = [
 ]
 import discord
 from typing import Optional, Dict, List
-import os
-import base64
 
 from helpers.database import db
 
+from .backgrounds import backgrounds
+
 
 
 class SetupView(discord.ui.View):
@@ -67,7 +67,13 @@ class SetupView(discord.ui.View):
     await confirm_view.wait()
     if confirm_view.value:
       query = "DELETE FROM user_levels WHERE guild_id = $1;"
-      await db.execute(query, interaction.guild_id)
+      leveling = interaction.client.get_cog('Leveling')
+      if leveling is not None:
+        async with leveling.xp_buffer.writing(interaction.guild_id):
+          await db.execute(query, interaction.guild_id)
+        leveling.ranks.drop(interaction.guild_id)
+      else:
+        await db.execute(query, interaction.guild_id)
       await interaction.followup.send("All levels have been reset.",
                                       ephemeral=True)
     else:
@@ -255,17 +261,8 @@ class BackgroundSelect(discord.ui.Select):
     await interaction.response.defer(ephemeral=True)
     background = self.values[0]
 
-    with open(os.path.join("backgrounds", background), "rb") as image_file:
-      image_data = image_file.read()
-      image_base64 = base64.b64encode(image_data).decode('utf-8')
-
-    query = """
-        INSERT INTO user_backgrounds (user_id, guild_id, background)
-        VALUES ($1, $2, $3)
-        ON CONFLICT (user_id, guild_id)
-        DO UPDATE SET background = $3;
-        """
-    await db.execute(query, self.user_id, self.guild_id, image_base64)
+    await backgrounds.set_user_background(self.user_id, self.guild_id,
+                                          backgrounds.builtin[background])
 
     await interaction.followup.send(
         f"Your rank card background has been updated to {background}.",
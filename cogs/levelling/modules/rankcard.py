@@ -0,0 +1,317 @@
+"""
+Rank card renderer for the leveling cog.
+
+Everything CPU-bound about a rank card (decoding, resizing, gradients,
+text and PNG encoding) happens in ``render_rank_card``, a plain function
+over bytes that runs in a small thread pool. Pillow and NumPy release the
+GIL for the heavy parts, so the event loop only waits for the finished
+PNG.
+
+Gradients and masks are built as NumPy arrays instead of drawing one line
+per row or column, and the rounded XP bar mask is computed once per
+width.
+
+Most cards are for the same active members, so the expensive inputs are
+cached between cards: avatars already resized (with their dominant
+colour) by avatar hash and size, and backgrounds already scaled to the
+card by their content hash from the background store, each in an LRU
+bounded by bytes. Fonts are loaded
+once per render thread.
+"""
+
+import asyncio
+import functools
+import io
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Hashable, Optional, Tuple, Union
+
+import discord
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from .backgrounds import backgrounds
+
+CARD_SIZE: Tuple[int, int] = (800, 200)
+AVATAR_SIZE: int = 150
+AVATAR_DOWNLOAD_SIZE: int = 256
+AVATAR_POS: Tuple[int, int] = (25, 25)
+BAR_SIZE: Tuple[int, int] = (500, 30)
+BAR_POS: Tuple[int, int] = (200, 151)
+BAR_BACKGROUND: Tuple[int, int, int] = (51, 51, 51)
+BAR_START_COLOR: Tuple[int, int, int] = (138, 43, 226)
+BAR_END_COLOR: Tuple[int, int, int] = (75, 0, 130)
+WHITE: Tuple[int, int, int, int] = (255, 255, 255, 255)
+
+# Threads rendering cards at once
+RENDER_WORKERS: int = int(os.getenv('RANK_CARD_WORKERS', '2'))
+# Memory for prepared avatars (90 KiB each) and backgrounds (625 KiB each)
+AVATAR_CACHE_BYTES: int = int(os.getenv('RANK_CARD_AVATAR_CACHE_MB',
+                                        '16')) * 2**20
+BACKGROUND_CACHE_BYTES: int = int(
+    os.getenv('RANK_CARD_BACKGROUND_CACHE_MB', '48')) * 2**20
+
+_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS,
+                               thread_name_prefix='rank-card')
+
+
+class ByteLRU:
+    """LRU cache bounded by the total size of its values. Shared between
+    the event loop and the render threads, so access is locked."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self._items: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._items[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._items.popitem(last=False)
+                self.size -= evicted_size
+
+
+@dataclass(frozen=True)
+class PreparedAvatar:
+    image: Image.Image
+    color: Tuple[int, int, int]
+
+
+avatar_cache = ByteLRU(AVATAR_CACHE_BYTES)
+background_cache = ByteLRU(BACKGROUND_CACHE_BYTES)
+_thread_fonts = threading.local()
+
+
+def image_bytes(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
+
+
+@functools.lru_cache(maxsize=None)
+def circle_mask(size: int) -> Image.Image:
+    centre = (size - 1) / 2
+    y, x = np.ogrid[:size, :size]
+    inside = (x - centre)**2 + (y - centre)**2 <= (size / 2)**2
+    return Image.fromarray(inside.astype(np.uint8) * 255, 'L')
+
+
+@functools.lru_cache(maxsize=BAR_SIZE[0] + 1)
+def rounded_bar_mask(width: int, height: int) -> Image.Image:
+    """Mask of a bar with fully rounded ends; one per progress width."""
+    radius = min(width, height) / 2
+    y, x = np.ogrid[:height, :width]
+    # Distance from each pixel centre to the bar's centre line segment
+    nearest_x = np.clip(x + 0.5, radius, width - radius)
+    inside = (x + 0.5 - nearest_x)**2 + (y + 0.5 - height / 2)**2 <= radius**2
+    return Image.fromarray(inside.astype(np.uint8) * 255, 'L')
+
+
+def vertical_fade(size: Tuple[int, int], color: Tuple[int, int,
+                                                      int]) -> Image.Image:
+    """``color`` fading from opaque at the top to transparent at the bottom."""
+    width, height = size
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    pixels[..., :3] = color
+    alpha = 255 * (1 - np.arange(height) / height)
+    pixels[..., 3] = alpha.astype(np.uint8)[:, None]
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def horizontal_gradient(size: Tuple[int, int], start: Tuple[int, int, int],
+                        end: Tuple[int, int, int]) -> Image.Image:
+    width, height = size
+    t = np.arange(width) / width
+    row = (np.array(start) + (np.array(end) - np.array(start)) *
+           t[:, None]).astype(np.uint8)
+    pixels = np.empty((height, width, 4), dtype=np.uint8)
+    pixels[..., :3] = row[None, :, :]
+    pixels[..., 3] = 255
+    return Image.fromarray(pixels, 'RGBA')
+
+
+def dominant_color(image: Image.Image) -> Tuple[int, int, int]:
+    """Most common RGBA pixel's colour."""
+    pixels = np.asarray(image.convert('RGBA')).reshape(-1, 4)
+    colors, counts = np.unique(pixels.view(np.uint32),
+                               return_counts=True)
+    r, g, b, _ = np.array([colors[counts.argmax()]],
+                          dtype=np.uint32).view(np.uint8)
+    return int(r), int(g), int(b)
+
+
+def cover(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Scale ``image`` to cover ``size`` keeping its aspect ratio, then crop
+    the centre."""
+    card_width, card_height = size
+    image_ratio = image.width / image.height
+    if image_ratio > card_width / card_height:
+        new_height = card_height
+        new_width = int(new_height * image_ratio)
+    else:
+        new_width = card_width
+        new_height = int(new_width / image_ratio)
+    image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    left = (image.width - card_width) // 2
+    top = (image.height - card_height) // 2
+    return image.crop((left, top, left + card_width, top + card_height))
+
+
+def load_fonts() -> Tuple[ImageFont.ImageFont, ImageFont.ImageFont,
+                          ImageFont.ImageFont]:
+    # FreeType faces must not be used from two threads at once, so each
+    # render thread keeps its own
+    fonts: Optional[Tuple[ImageFont.ImageFont, ...]] = getattr(
+        _thread_fonts, 'fonts', None)
+    if fonts is None:
+        try:
+            fonts = (ImageFont.truetype("fonts/ndot47.ttf", 40),
+                     ImageFont.truetype("fonts/InterVariable.ttf", 28),
+                     ImageFont.truetype("fonts/InterVariable.ttf", 20))
+        except IOError:
+            default = ImageFont.load_default()
+            fonts = (default, default, default)
+        _thread_fonts.fonts = fonts
+    return fonts
+
+
+def prepare_avatar(key: Hashable, data: bytes) -> PreparedAvatar:
+    image = Image.open(io.BytesIO(data)).convert('RGBA').resize(
+        (AVATAR_SIZE, AVATAR_SIZE), Image.Resampling.LANCZOS)
+    try:
+        color = dominant_color(image)
+    except Exception:
+        color = (100, 100, 100)
+    avatar = PreparedAvatar(image, color)
+    avatar_cache.put(key, avatar, image_bytes(image))
+    return avatar
+
+
+def scale_background(key: Hashable,
+                     data: Optional[bytes]) -> Optional[Image.Image]:
+    """``data`` decoded, scaled to the card and cached under ``key``, or
+    None if it is missing or not an image."""
+    if not data:
+        return None
+    try:
+        background = cover(
+            Image.open(io.BytesIO(data)).convert('RGBA'), CARD_SIZE)
+    except Exception:
+        return None
+    background_cache.put(key, background, image_bytes(background))
+    return background
+
+
+def render_rank_card(display_name: str, xp: int, level: int, rank: int,
+                     avatar_key: Hashable, avatar: Union[PreparedAvatar,
+                                                         bytes],
+                     background_key: Optional[Hashable],
+                     background: Union[Image.Image, bytes, None]) -> bytes:
+    """Draw a rank card and return it as PNG bytes. Blocking.
+
+    ``avatar`` is a cached PreparedAvatar, or downloaded image bytes that
+    are prepared and cached under ``avatar_key``. Likewise ``background``
+    is a cached scaled image or the stored bytes; without a
+    ``background_key`` the card gets a gradient in the avatar's colour."""
+    if not isinstance(avatar, PreparedAvatar):
+        avatar = prepare_avatar(avatar_key, avatar)
+
+    if background_key is None:
+        card = vertical_fade(CARD_SIZE, avatar.color)
+    else:
+        if not isinstance(background, Image.Image):
+            background = scale_background(background_key, background)
+        if background is None:
+            # If there's an error with the custom background, fall back to
+            # a transparent card
+            card = Image.new('RGBA', CARD_SIZE, (0, 0, 0, 0))
+        else:
+            card = background.copy()
+
+    card.paste(avatar.image, AVATAR_POS, circle_mask(AVATAR_SIZE))
+
+    # Text
+    draw = ImageDraw.Draw(card)
+    title_font, text_font, xp_font = load_fonts()
+    draw.text((200, 13), display_name, font=title_font, fill=WHITE)
+    draw.text((200, 71), f"Rank: #{rank}", font=text_font, fill=WHITE)
+    draw.text((200, 107), f"Level: {level}", font=text_font, fill=WHITE)
+
+    # XP Bar
+    xp_to_next_level = (level + 1)**2 * 100
+    progress = min(max(xp / xp_to_next_level, 0.0), 1.0)
+    bar_width, bar_height = BAR_SIZE
+
+    bar_box = BAR_POS + (BAR_POS[0] + bar_width, BAR_POS[1] + bar_height)
+    card.paste(BAR_BACKGROUND + (255, ), bar_box,
+               rounded_bar_mask(bar_width, bar_height))
+
+    progress_width = int(bar_width * progress)
+    if progress_width > 0:
+        card.paste(
+            horizontal_gradient((progress_width, bar_height), BAR_START_COLOR,
+                                BAR_END_COLOR), BAR_POS,
+            rounded_bar_mask(progress_width, bar_height))
+
+    xp_text = f"{xp}/{xp_to_next_level} XP"
+    bbox = draw.textbbox((0, 0), xp_text, font=xp_font)
+    text_width = bbox[2] - bbox[0]
+    text_height = bbox[3] - bbox[1]
+    draw.text((BAR_POS[0] + (bar_width - text_width) // 2,
+               BAR_POS[1] + (bar_height - text_height) // 2 - 1),
+              xp_text,
+              font=xp_font,
+              fill=WHITE)
+
+    buffer = io.BytesIO()
+    card.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+async def render_rank_card_async(display_name: str, xp: int, level: int,
+                                 rank: int, avatar: discord.Asset,
+                                 background_hash: Optional[str]) -> bytes:
+    """Render off the event loop, downloading the avatar and fetching the
+    background only if they are not cached yet."""
+    avatar_key = (avatar.key, AVATAR_DOWNLOAD_SIZE)
+    prepared = avatar_cache.get(avatar_key)
+    if prepared is None:
+        prepared = await avatar.replace(format='png',
+                                        size=AVATAR_DOWNLOAD_SIZE).read()
+
+    background = None
+    if background_hash is not None:
+        background = background_cache.get(background_hash)
+        if background is None:
+            background = await backgrounds.get(background_hash)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor,
+        functools.partial(render_rank_card, display_name, xp, level, rank,
+                          avatar_key, prepared, background_hash, background))
@@ -0,0 +1,113 @@
+"""
+In-memory XP ranking for the leveling cog.
+
+Each guild's members are kept in a list sorted by XP, so a member's
+rank, the member just above them and the top N are bisect lookups
+instead of sorting user_levels in Postgres. Ranks are unique, as with
+the ROW_NUMBER() query this replaced: members with the same XP are
+ranked by user ID, lowest first.
+
+A guild's index is loaded from user_levels the first time it is needed,
+with the XP accumulator's unwritten rows laid over it, and is then kept
+current by the cog on every XP change.
+"""
+
+import asyncio
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from helpers.database import db
+
+from .xpbuffer import XPAccumulator
+
+
+class GuildRankIndex:
+
+    def __init__(self, rows: Iterable[Tuple[int, int, int]] = ()) -> None:
+        # user_id -> (xp, level)
+        self.members: Dict[int, Tuple[int, int]] = {
+            user_id: (xp, level)
+            for user_id, xp, level in rows
+        }
+        # (xp, -user_id) ascending, so the best rank is last and a lower
+        # user ID comes after (ranks above) a higher one with the same XP
+        self._order: List[Tuple[int, int]] = sorted(
+            (xp, -user_id) for user_id, (xp, _) in self.members.items())
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def set(self, user_id: int, xp: int, level: int) -> None:
+        old = self.members.get(user_id)
+        self.members[user_id] = (xp, level)
+        if old is not None:
+            if old[0] == xp:
+                return
+            del self._order[bisect.bisect_left(self._order,
+                                               (old[0], -user_id))]
+        bisect.insort(self._order, (xp, -user_id))
+
+    def _above(self, xp: int) -> int:
+        """Index of the first entry with more XP than ``xp``."""
+        return bisect.bisect_left(self._order, (xp + 1, ))
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1 + the number of members ranked above, or None if unranked."""
+        member = self.members.get(user_id)
+        if member is None:
+            return None
+        return len(self._order) - bisect.bisect_left(self._order,
+                                                     (member[0], -user_id))
+
+    def next_above(self, user_id: int) -> Optional[Tuple[int, int]]:
+        """(user_id, xp) of the member with the least XP above this one."""
+        member = self.members.get(user_id)
+        if member is None:
+            return None
+        index = self._above(member[0])
+        if index == len(self._order):
+            return None
+        xp, other_id = self._order[index]
+        return -other_id, xp
+
+    def top(self, count: int) -> List[Tuple[int, int, int]]:
+        """(user_id, xp, level) of the ``count`` members with the most XP."""
+        start = max(len(self._order) - count, 0)
+        return [(-user_id, xp, self.members[-user_id][1])
+                for xp, user_id in reversed(self._order[start:])]
+
+
+class RankIndex:
+
+    def __init__(self, xp_buffer: XPAccumulator) -> None:
+        self.xp_buffer = xp_buffer
+        self.guilds: Dict[int, GuildRankIndex] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def get(self, guild_id: int) -> GuildRankIndex:
+        index = self.guilds.get(guild_id)
+        if index is not None:
+            return index
+
+        async with self._locks.setdefault(guild_id, asyncio.Lock()):
+            if guild_id not in self.guilds:
+                query = "SELECT user_id, xp, level FROM user_levels WHERE guild_id = $1;"
+                rows = await db.fetch(query, guild_id)
+                index = GuildRankIndex(
+                    (row['user_id'], row['xp'], row['level']) for row in rows)
+                # Buffered rows are newer than the table, and anything that
+                # changed while the query ran is already in the buffer.
+                for (entry_guild, user_id), entry in self.xp_buffer.entries.items():
+                    if entry_guild == guild_id:
+                        index.set(user_id, entry.xp, entry.level)
+                self.guilds[guild_id] = index
+        return self.guilds[guild_id]
+
+    def update(self, guild_id: int, user_id: int, xp: int, level: int) -> None:
+        """Record an XP change; guilds not loaded yet pick it up on load."""
+        index = self.guilds.get(guild_id)
+        if index is not None:
+            index.set(user_id, xp, level)
+
+    def drop(self, guild_id: int) -> None:
+        self.guilds.pop(guild_id, None)
@@ -0,0 +1,201 @@
+"""
+Role reward reconciliation for the leveling cog.
+
+When a guild's role rewards change, members who are already past a
+reward's level should get its role, and members below it should lose it.
+A reconciliation job walks the guild's user_levels rows in user ID order,
+works out which reward roles each member should hold from their level,
+diffs that against the roles they have and applies the difference in one
+add and one remove call per member.
+
+Role edits run a few at a time with a pause after each, to stay well
+inside Discord's per-guild member rate limits. Progress is checkpointed
+to role_sync_jobs after every page, so a job interrupted by a restart
+carries on from the last checkpoint when the cog loads again.
+
+Only members with a user_levels row are touched; a reward role that was
+also handed out by hand to someone who never chatted is left alone.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import discord
+from loguru import logger
+
+from helpers.database import db
+from helpers.member_cache import ensure_chunked, get_or_fetch_member
+
+if TYPE_CHECKING:
+    from ..level import Leveling
+
+# Members whose roles are being edited at once, per job
+ROLE_SYNC_CONCURRENCY: int = 3
+# Pause after each member edit, per worker
+ROLE_EDIT_INTERVAL: float = 0.5
+# user_levels rows read per page (and per checkpoint)
+PAGE_SIZE: int = 500
+
+
+def reward_changes(
+    member: discord.Member, level: int, rewards: Dict[int, int]
+) -> Tuple[List[discord.Role], List[discord.Role]]:
+    """Reward roles ``member`` is missing at ``level``, and reward roles
+    they hold for levels above it."""
+    add: List[discord.Role] = []
+    remove: List[discord.Role] = []
+    for reward_level, role_id in sorted(rewards.items()):
+        role = member.guild.get_role(role_id)
+        if role is None or not role.is_assignable():
+            continue
+        if reward_level <= level and role not in member.roles:
+            add.append(role)
+        elif reward_level > level and role in member.roles:
+            remove.append(role)
+    return add, remove
+
+
+async def apply_rewards(
+    member: discord.Member, level: int, rewards: Dict[int, int]
+) -> Tuple[List[discord.Role], List[discord.Role]]:
+    """Bring ``member``'s reward roles in line with ``level``; returns the
+    roles added and removed."""
+    add, remove = reward_changes(member, level, rewards)
+    if add:
+        await member.add_roles(*add, reason=f"Level {level} role rewards")
+    if remove:
+        await member.remove_roles(*remove,
+                                  reason=f"Level {level} role rewards")
+    return add, remove
+
+
+@dataclass
+class RoleSyncProgress:
+    guild_id: int
+    total: int = 0
+    done: int = 0
+    last_user_id: int = 0
+    added: int = 0
+    removed: int = 0
+    failed: int = 0
+
+
+class RoleRewardSync:
+
+    def __init__(self, cog: 'Leveling') -> None:
+        self.cog = cog
+        self.bot = cog.bot
+        self.progress: Dict[int, RoleSyncProgress] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def running(self, guild_id: int) -> Optional[RoleSyncProgress]:
+        task = self._tasks.get(guild_id)
+        if task is None or task.done():
+            return None
+        return self.progress.get(guild_id)
+
+    async def resume(self) -> None:
+        """Restart jobs that were interrupted, from their checkpoints."""
+        rows = await db.fetch("SELECT * FROM role_sync_jobs;")
+        for row in rows:
+            self._start(
+                RoleSyncProgress(row['guild_id'], row['total'], row['done'],
+                                 row['last_user_id']))
+
+    async def schedule(self, guild_id: int) -> RoleSyncProgress:
+        """Start reconciling a guild from the beginning, replacing any job
+        already running for it."""
+        task = self._tasks.pop(guild_id, None)
+        if task is not None:
+            task.cancel()
+
+        query = "SELECT COUNT(*) AS total FROM user_levels WHERE guild_id = $1;"
+        result = await db.fetch(query, guild_id)
+        progress = RoleSyncProgress(guild_id, total=result[0]['total'])
+        await self._save(progress)
+        self._start(progress)
+        return progress
+
+    def stop(self) -> None:
+        """Cancel running jobs; they resume from their last checkpoint."""
+        for task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
+
+    def _start(self, progress: RoleSyncProgress) -> None:
+        self.progress[progress.guild_id] = progress
+        self._tasks[progress.guild_id] = asyncio.create_task(
+            self._run(progress), name=f"role-sync-{progress.guild_id}")
+
+    async def _save(self, progress: RoleSyncProgress) -> None:
+        query = """
+        INSERT INTO role_sync_jobs (guild_id, total, done, last_user_id, updated_at)
+        VALUES ($1, $2, $3, $4, NOW())
+        ON CONFLICT (guild_id)
+        DO UPDATE SET total = $2, done = $3, last_user_id = $4, updated_at = NOW();
+        """
+        await db.execute(query, progress.guild_id, progress.total,
+                         progress.done, progress.last_user_id)
+
+    async def _run(self, progress: RoleSyncProgress) -> None:
+        await self.bot.wait_until_ready()
+        guild = self.bot.get_guild(progress.guild_id)
+        if guild is None:
+            # Left the guild, or it belongs to another cluster; the row
+            # stays for the cluster that has it.
+            return
+
+        try:
+            await ensure_chunked(self.bot, guild)
+            await self.cog.xp_buffer.flush(guild.id)
+            semaphore = asyncio.Semaphore(ROLE_SYNC_CONCURRENCY)
+            query = """
+            SELECT user_id, level FROM user_levels
+            WHERE guild_id = $1 AND user_id > $2
+            ORDER BY user_id
+            LIMIT $3;
+            """
+            while rows := await db.fetch(query, guild.id,
+                                         progress.last_user_id, PAGE_SIZE):
+                await asyncio.gather(*(self._reconcile(
+                    guild, row['user_id'], row['level'], semaphore, progress)
+                                       for row in rows))
+                progress.done += len(rows)
+                progress.last_user_id = rows[-1]['user_id']
+                await self._save(progress)
+
+            await db.execute("DELETE FROM role_sync_jobs WHERE guild_id = $1;",
+                             guild.id)
+            logger.info(
+                f"Role rewards reconciled in {guild.name}: {progress.added} added, "
+                f"{progress.removed} removed, {progress.failed} failed")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception(
+                f"Role reward reconciliation failed in guild {guild.id}; "
+                f"it resumes from member {progress.last_user_id} on the next load"
+            )
+
+    async def _reconcile(self, guild: discord.Guild, user_id: int, level: int,
+                         semaphore: asyncio.Semaphore,
+                         progress: RoleSyncProgress) -> None:
+        async with semaphore:
+            # A chunked guild's cache is complete: anyone missing has left
+            member = (guild.get_member(user_id) if guild.chunked else
+                      await get_or_fetch_member(guild, user_id))
+            if member is None:
+                return
+            rewards = self.cog.role_rewards.get(guild.id, {})
+            add, remove = reward_changes(member, level, rewards)
+            if not add and not remove:
+                return
+            try:
+                await apply_rewards(member, level, rewards)
+            except discord.HTTPException:
+                progress.failed += 1
+            else:
+                progress.added += len(add)
+                progress.removed += len(remove)
+            await asyncio.sleep(ROLE_EDIT_INTERVAL)
@@ -0,0 +1,208 @@
+"""
+Write-behind XP storage for the leveling cog.
+
+Message XP is applied to an in-memory copy of each member's user_levels
+row, and level-ups are decided there. Changed rows are written back in a
+single batched upsert every FLUSH_INTERVAL seconds, or as soon as
+FLUSH_THRESHOLD rows are waiting, instead of one or two queries per
+message.
+
+A row is read from the database the first time a member gains XP and is
+kept while they stay active. Code that writes user_levels directly
+(give, reset) must do so inside ``writing()`` for that member, or a
+flush could overwrite the change with the older row held here.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from helpers.database import db
+
+# Seconds between background flushes
+FLUSH_INTERVAL: float = 5.0
+# Waiting rows that trigger an early flush
+FLUSH_THRESHOLD: int = 500
+# Clean rows not touched for this long are dropped from memory
+IDLE_TTL: float = 3600.0
+
+_SELECT = "SELECT xp, level FROM user_levels WHERE user_id = $1 AND guild_id = $2;"
+
+_UPSERT = """
+INSERT INTO user_levels (user_id, guild_id, xp, level)
+SELECT * FROM UNNEST($1::BIGINT[], $2::BIGINT[], $3::INT[], $4::INT[])
+ON CONFLICT (user_id, guild_id)
+DO UPDATE SET xp = EXCLUDED.xp, level = EXCLUDED.level;
+"""
+
+
+@dataclass
+class XPEntry:
+    xp: int
+    level: int
+    touched: float = field(default_factory=time.monotonic)
+
+
+class XPAccumulator:
+
+    def __init__(self,
+                 level_for: Callable[[int], int],
+                 interval: float = FLUSH_INTERVAL,
+                 threshold: int = FLUSH_THRESHOLD) -> None:
+        self.level_for = level_for
+        self.interval = interval
+        self.threshold = threshold
+        # (guild_id, user_id) -> row as it should be in the database
+        self.entries: Dict[Tuple[int, int], XPEntry] = {}
+        self.flushes: int = 0
+        self.rows_written: int = 0
+        self._dirty: Set[Tuple[int, int]] = set()
+        # Bumped by every evict, so a row read across one is read again
+        self._evictions: int = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background task and write everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(
+                f"Failed to write {self.pending} pending XP rows on shutdown")
+
+    async def add(self, guild_id: int, user_id: int,
+                  xp: int) -> Tuple[bool, int]:
+        """Add XP; returns (leveled_up, level) like the old per-message query."""
+        key = (guild_id, user_id)
+        entry = self.entries.get(key)
+        while entry is None:
+            evictions = self._evictions
+            result = await db.fetch(_SELECT, user_id, guild_id)
+            if self._evictions != evictions:
+                # The row may have been rewritten while we read it
+                entry = self.entries.get(key)
+                continue
+            # Another message may have loaded the row while we waited
+            entry = self.entries.setdefault(
+                key,
+                XPEntry(result[0]['xp'], result[0]['level'])
+                if result else XPEntry(0, 0))
+
+        entry.xp += xp
+        entry.touched = time.monotonic()
+        self._dirty.add(key)
+        if len(self._dirty) >= self.threshold:
+            self._wake.set()
+
+        new_level = self.level_for(entry.xp)
+        if new_level > entry.level:
+            entry.level = new_level
+            return True, new_level
+        return False, entry.level
+
+    def evict(self, guild_id: int, user_id: Optional[int] = None) -> None:
+        """Forget a member (or a whole guild) without writing it back."""
+        if user_id is not None:
+            keys = [(guild_id, user_id)]
+        else:
+            keys = [key for key in self.entries if key[0] == guild_id]
+        for key in keys:
+            self.entries.pop(key, None)
+            self._dirty.discard(key)
+        self._evictions += 1
+
+    @asynccontextmanager
+    async def writing(self,
+                      guild_id: int,
+                      user_id: Optional[int] = None) -> AsyncIterator[None]:
+        """Hold off flushes while a member's (or a whole guild's) rows are
+        written directly.
+
+        Their pending XP is written first and their rows are forgotten on
+        entry and on exit, so nothing older is written over the change and
+        the next message reads it back. XP gained inside is dropped."""
+        async with self._lock:
+            await self._write([
+                key for key in self._dirty if key[0] == guild_id and
+                (user_id is None or key[1] == user_id)
+            ])
+            self.evict(guild_id, user_id)
+            try:
+                yield
+            finally:
+                self.evict(guild_id, user_id)
+
+    async def flush(self, guild_id: Optional[int] = None) -> int:
+        """Write pending rows (only one guild's if given); returns the count."""
+        async with self._lock:
+            keys = [
+                key for key in self._dirty
+                if guild_id is None or key[0] == guild_id
+            ]
+            if guild_id is None:
+                self._drop_idle()
+            return await self._write(keys)
+
+    async def _write(self, keys: List[Tuple[int, int]]) -> int:
+        if not keys:
+            return 0
+
+        self._dirty.difference_update(keys)
+        rows = [(key, self.entries[key]) for key in keys
+                if key in self.entries]
+        try:
+            # Values are copied into the argument lists before the await,
+            # so gains made during the write stay pending.
+            await db.execute(_UPSERT, [key[1] for key, _ in rows],
+                             [key[0] for key, _ in rows],
+                             [entry.xp for _, entry in rows],
+                             [entry.level for _, entry in rows])
+        except BaseException:
+            self._dirty.update(key for key, _ in rows)
+            raise
+
+        self.flushes += 1
+        self.rows_written += len(rows)
+        return len(rows)
+
+    def _drop_idle(self) -> None:
+        cutoff = time.monotonic() - IDLE_TTL
+        for key in [
+                key for key, entry in self.entries.items()
+                if entry.touched < cutoff and key not in self._dirty
+        ]:
+            del self.entries[key]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    f"Failed to write {self.pending} XP rows; retrying in {self.interval:.0f}s"
+                )
@@ -12,6 +12,8 @@ import psutil
 import time
 import io
 
+from helpers.member_cache import role_members
+
 
 async def _get_channel_properties(channel: discord.TextChannel) -> dict:
     """Retrieve a channel's properties."""
@@ -141,10 +143,12 @@ class RoleInfoView(discord.ui.View):
     @discord.ui.button(label="Show Members", style=discord.ButtonStyle.primary)
     async def show_members(self, interaction: discord.Interaction,
                            button: discord.ui.Button):
-        members = self.role.members
+        # The member cache may be partial, so this can take a while
+        await interaction.response.defer(ephemeral=True)
+        members = await role_members(interaction.client, self.role)
         if not members:
-            await interaction.response.send_message(
-                "No members have this role.", ephemeral=True)
+            await interaction.followup.send("No members have this role.",
+                                            ephemeral=True)
             return
 
         embed = discord.Embed(title=f"Members with {self.role.name} role",
@@ -157,7 +161,7 @@ class RoleInfoView(discord.ui.View):
             embed.add_field(name=f"Members {i}",
                             value="\n".join(chunk),
                             inline=False)
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=embed, ephemeral=True)
 
     @discord.ui.button(label="Show Permissions",
                        style=discord.ButtonStyle.primary)
@@ -348,16 +352,12 @@ class Moderation(commands.Cog):
             'User-Agent': 'Nira-Bot',
             'Accept': 'application/vnd.github.v3+json'
         }
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
+        self.session: aiohttp.ClientSession = bot.session
         self.nuke_cooldowns = commands.CooldownMapping.from_cooldown(
             1, 300, commands.BucketType.member)
 
         self.start_time = time.time()
 
-    async def cog_unload(self):
-
-        await self.session.close()
-
     def format_commit(self, commit_data: dict) -> str:
         try:
             sha = commit_data['sha'][:7]
@@ -417,17 +417,28 @@ class Moderation(commands.Cog):
             str(datetime.timedelta(seconds=int(time.time() - self.start_time)))
         }
 
-    def get_bot_stats(self) -> dict:
-        total_members = sum(guild.member_count or 0
-                            for guild in self.bot.guilds)
-        total_channels = sum(len(guild.channels) for guild in self.bot.guilds)
+    async def get_bot_stats(self) -> dict:
+        # Totals across every cluster when the bot runs as several processes
+        cluster_stats = getattr(self.bot, 'cluster_stats', None)
+        if cluster_stats is not None:
+            clusters = await cluster_stats()
+        else:
+            clusters = [{
+                'servers': len(self.bot.guilds),
+                'users': sum(guild.member_count or 0
+                             for guild in self.bot.guilds),
+                'channels': sum(len(guild.channels)
+                                for guild in self.bot.guilds),
+                'latency': self.bot.latency
+            }]
+        latency = sum(c['latency'] for c in clusters) / len(clusters)
 
         return {
-            'servers': len(self.bot.guilds),
-            'users': total_members,
-            'channels': total_channels,
+            'servers': sum(c['servers'] for c in clusters),
+            'users': sum(c['users'] for c in clusters),
+            'channels': sum(c['channels'] for c in clusters),
             'commands': len(self.bot.commands),
-            'latency': f"{round(self.bot.latency * 1000)}ms"
+            'latency': f"{round(latency * 1000)}ms"
         }
 
     @commands.hybrid_command()
@@ -986,7 +997,7 @@ class Moderation(commands.Cog):
             embed.set_thumbnail(url=bot_avatar)
 
             if show_stats:
-                stats = self.get_bot_stats()
+                stats = await self.get_bot_stats()
                 stats_text = (f"**Servers:** {stats['servers']}\n"
                               f"**Users:** {stats['users']}\n"
                               f"**Channels:** {stats['channels']}\n"
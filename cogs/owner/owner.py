@@ -2,10 +2,12 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 from typing import Optional, List, Literal
-import aiohttp
 import io
+import psutil
 
 from helpers.database import db
+from helpers.member_cache import active_members
+from helpers.metrics import BUCKETS, PHASES, cache_stats
 
 
 class TableSelect(discord.ui.Select):
@@ -178,7 +180,6 @@ class Owner(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.db = db
-        self.session = aiohttp.ClientSession()
 
     async def cog_load(self) -> None:
         await self.db.initialize()
@@ -186,7 +187,6 @@ class Owner(commands.Cog):
 
     async def cog_unload(self):
         await self.db.close()
-        await self.session.close()
 
     async def create_tables(self) -> None:
         query = """
@@ -370,6 +370,164 @@ class Owner(commands.Cog):
         except Exception as e:
             await ctx.send(f"An error occurred: {str(e)}")
 
+    @staticmethod
+    def format_ms(seconds: float) -> str:
+        if seconds == float('inf'):
+            return "inf"
+        return f"{seconds * 1000:.0f}ms"
+
+    def format_stats_table(self, metrics, limit: int = 15) -> str:
+        rows = [(name, kind, stats)
+                for (name, kind), stats in metrics.stats.items()
+                if stats.histograms['total'].count()]
+        rows.sort(key=lambda row: row[2].histograms['total'].percentile(0.95),
+                  reverse=True)
+
+        lines = [
+            f"{'Command':<20} {'Kind':<6} {'Calls':>5} {'p50':>7} {'p95':>7} {'1st p95':>7} {'DB':>6} {'HTTP':>6} {'Render':>6}"
+        ]
+        for name, kind, stats in rows[:limit]:
+            hist = stats.histograms
+            first = self.format_ms(hist['first_response'].percentile(
+                0.95)) if hist['first_response'].count() else "-"
+            lines.append(
+                f"{name[:20]:<20} {kind:<6} {hist['total'].count():>5} "
+                f"{self.format_ms(hist['total'].percentile(0.5)):>7} "
+                f"{self.format_ms(hist['total'].percentile(0.95)):>7} "
+                f"{first:>7} "
+                f"{self.format_ms(hist['db'].mean()):>6} "
+                f"{self.format_ms(hist['http'].mean()):>6} "
+                f"{self.format_ms(hist['render'].mean()):>6}")
+        return "\n".join(lines)
+
+    def format_command_detail(self, name: str, kind: str, stats) -> str:
+        hist = stats.histograms
+        lines = [
+            f"{name} ({kind}): {stats.calls} calls, {stats.failures} failed since start",
+            "",
+            f"{'Series':<15} {'Count':>5} {'Mean':>7} {'p50':>7} {'p95':>7} {'p99':>7}"
+        ]
+        for series in ('total', 'first_response') + PHASES:
+            h = hist[series]
+            lines.append(f"{series:<15} {h.count():>5} "
+                         f"{self.format_ms(h.mean()):>7} "
+                         f"{self.format_ms(h.percentile(0.5)):>7} "
+                         f"{self.format_ms(h.percentile(0.95)):>7} "
+                         f"{self.format_ms(h.percentile(0.99)):>7}")
+
+        counts = hist['total'].counts()
+        peak = max(counts) or 1
+        lines.append("")
+        lines.append("Total time distribution:")
+        for bound, count in zip(BUCKETS, counts):
+            bar = "#" * round(20 * count / peak)
+            lines.append(f"<= {self.format_ms(bound):>7} {count:>5} {bar}")
+        return "\n".join(lines)
+
+    async def format_clusters(self) -> str:
+        cluster_stats = getattr(self.bot, 'cluster_stats', None)
+        if cluster_stats is None:
+            return ""
+        clusters = await cluster_stats()
+        if len(clusters) < 2:
+            return ""
+
+        lines = ["", "", "Clusters:"]
+        for c in clusters:
+            shards = f"{c['shards'][0]}-{c['shards'][-1]}" if c['shards'] else "-"
+            lines.append(
+                f"#{c['cluster']:<2} shards {shards:<7} {c['servers']:>6} servers "
+                f"{c['users']:>8} users  {self.format_ms(c['latency']):>6}")
+        lines.append(f"Total: {sum(c['servers'] for c in clusters)} servers, "
+                     f"{sum(c['users'] for c in clusters)} users")
+        return "\n".join(lines)
+
+    @staticmethod
+    async def send_code_blocks(ctx: commands.Context,
+                               body: str,
+                               title: Optional[str] = None) -> None:
+        """Send ``body`` in code blocks, split between whole lines over as
+        many messages as it needs."""
+        max_size = 2000 - (len(title) + 1 if title else 0)
+        paginator = commands.Paginator(max_size=max_size)
+        for line in body.split("\n"):
+            paginator.add_line(line[:max_size - 8])
+        for index, page in enumerate(paginator.pages):
+            await ctx.send(f"{title}\n{page}" if title and index == 0 else page)
+
+    @commands.hybrid_command(name="stats")
+    @commands.is_owner()
+    async def stats(self,
+                    ctx: commands.Context,
+                    command: Optional[str] = None) -> None:
+        """Show command latency over the last hour (Owner only)"""
+        metrics = getattr(self.bot, 'metrics', None)
+        if metrics is None:
+            await ctx.send("Command metrics are not enabled.")
+            return
+
+        if command is None:
+            body = self.format_stats_table(metrics)
+            body += (
+                f"\n\nDB pool: {db.size - db.idle_size}/{db.max_size} in use, "
+                f"avg acquire wait {self.format_ms(db.stats.average_wait)}")
+            watchdog = getattr(self.bot, 'loop_watchdog', None)
+            if watchdog is not None:
+                body += (
+                    f"\nEvent loop: {watchdog.stalls} stalls "
+                    f"({self.format_ms(watchdog.stall_time)} total), "
+                    f"max lag {self.format_ms(watchdog.max_lag)}")
+            for name, info in cache_stats().items():
+                lookups = info['hits'] + info['misses']
+                hit_rate = info['hits'] / lookups if lookups else 0.0
+                body += (f"\nCache {name}: {info['size']} entries, "
+                         f"{info['hits']} hits, {info['misses']} misses "
+                         f"({hit_rate:.0%} hit rate)")
+            body += await self.format_clusters()
+            await self.send_code_blocks(
+                ctx, body, "**Command latency (last hour, slowest p95 first)**")
+            return
+
+        matches = [(name, kind, stats)
+                   for (name, kind), stats in metrics.stats.items()
+                   if name == command.lower()]
+        if not matches:
+            await ctx.send(f"No metrics recorded for `{command}`.")
+            return
+
+        body = "\n\n".join(
+            self.format_command_detail(name, kind, stats)
+            for name, kind, stats in matches)
+        await self.send_code_blocks(ctx, body)
+
+    @commands.command(name="membercache")
+    @commands.is_owner()
+    async def member_cache(self, ctx: commands.Context, limit: int = 20) -> None:
+        """Show member cache size per guild (Owner only)"""
+        policy = getattr(self.bot, 'member_cache', None)
+        guilds = sorted(self.bot.guilds,
+                        key=lambda g: len(g.members),
+                        reverse=True)
+        cached = sum(len(g.members) for g in guilds)
+        total = sum(g.member_count or 0 for g in guilds)
+        rss = psutil.Process().memory_info().rss / (1024 * 1024)
+
+        lines = [
+            f"Policy: {policy.name if policy else 'full'} | RSS: {rss:.0f} MiB",
+            f"Cached members: {cached}/{total} | Cached users: {len(self.bot.users)}",
+            f"Recent message authors: {len(active_members)}",
+            "",
+            f"{'Guild':<24} {'Cached':>8} {'Members':>8} Chunked"
+        ]
+        for guild in guilds[:limit]:
+            lines.append(f"{guild.name[:24]:<24} {len(guild.members):>8} "
+                         f"{guild.member_count or 0:>8} "
+                         f"{'yes' if guild.chunked else 'no'}")
+        if len(guilds) > limit:
+            lines.append(f"... and {len(guilds) - limit} more guilds")
+
+        await self.send_code_blocks(ctx, "\n".join(lines))
+
     @app_commands.command()
     async def manage_database(self, interaction: discord.Interaction):
         """Manage database tables (Owner only)"""
@@ -4,7 +4,8 @@ import aiohttp
 from io import BytesIO
 from discord.ui import View, Modal, TextInput
 from colorthief import ColorThief
-from urllib.request import urlopen
+
+from helpers.metrics import track_phase
 
 
 class PokemonNumberInput(Modal, title="Go to Pokémon"):
@@ -24,18 +25,16 @@ class PokemonNumberInput(Modal, title="Go to Pokémon"):
             pokemon_name = self.number.value.lower()
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                        f"https://pokeapi.co/api/v2/pokemon/{pokemon_name}"
-                ) as resp:
-                    if resp.status == 404:
-                        await interaction.response.send_message(
-                            f"Pokémon '{pokemon_name}' not found!",
-                            ephemeral=True)
-                        return
-                    pokemon_data = await resp.json()
-
-            new_view = PokemonInfoView(pokemon_data)
+            async with self.pokemon_view.session.get(
+                    f"https://pokeapi.co/api/v2/pokemon/{pokemon_name}"
+            ) as resp:
+                if resp.status == 404:
+                    await interaction.response.send_message(
+                        f"Pokémon '{pokemon_name}' not found!", ephemeral=True)
+                    return
+                pokemon_data = await resp.json()
+
+            new_view = PokemonInfoView(pokemon_data, self.pokemon_view.session)
             embed = await new_view.create_main_embed()
             await interaction.response.edit_message(embed=embed, view=new_view)
         except Exception as e:
@@ -64,19 +63,17 @@ class PokemonNavigationButton(discord.ui.Button):
             await interaction.response.edit_message(embed=loading_embed,
                                                     view=view)
 
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                        f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}"
-                ) as resp:
-                    if resp.status == 404:
-                        error_embed = await view.create_error_embed(
-                            "No more Pokémon found!")
-                        await interaction.edit_original_response(
-                            embed=error_embed, view=view)
-                        return
-                    pokemon_data = await resp.json()
-
-            new_view = PokemonInfoView(pokemon_data)
+            async with view.session.get(
+                    f"https://pokeapi.co/api/v2/pokemon/{pokemon_id}") as resp:
+                if resp.status == 404:
+                    error_embed = await view.create_error_embed(
+                        "No more Pokémon found!")
+                    await interaction.edit_original_response(embed=error_embed,
+                                                             view=view)
+                    return
+                pokemon_data = await resp.json()
+
+            new_view = PokemonInfoView(pokemon_data, view.session)
             embed = await new_view.create_main_embed()
             await interaction.edit_original_response(embed=embed,
                                                      view=new_view)
@@ -136,10 +133,13 @@ class PokemonInfoSelect(discord.ui.Select):
 
 class PokemonInfoView(discord.ui.View):
 
-    def __init__(self, pokemon_data: Dict, timeout: float = 180.0):
+    def __init__(self,
+                 pokemon_data: Dict,
+                 session: aiohttp.ClientSession,
+                 timeout: float = 180.0):
         super().__init__(timeout=timeout)
         self.pokemon_data = pokemon_data
-        self.session = None
+        self.session = session
         self.add_item(PokemonInfoSelect(pokemon_data))
         self.add_item(
             PokemonNavigationButton(style=discord.ButtonStyle.primary,
@@ -193,25 +193,17 @@ class PokemonInfoView(discord.ui.View):
     async def get_pokemon_color(self) -> discord.Color:
         image_url = self.pokemon_data['sprites']['other']['official-artwork'][
             'front_default']
-        fd = urlopen(image_url)
-        color_thief = ColorThief(fd)
-        dominant_color = color_thief.get_color(quality=1)
-        fd.close()
+        async with self.session.get(image_url) as resp:
+            image_data = await resp.read()
+        with track_phase('render'):
+            color_thief = ColorThief(BytesIO(image_data))
+            dominant_color = color_thief.get_color(quality=1)
         return discord.Color.from_rgb(*dominant_color)
 
     async def interaction_check(self,
                                 interaction: discord.Interaction) -> bool:
         return True
 
-    def get_session(self):
-        if self.session is None or self.session.closed:
-            self.session = aiohttp.ClientSession()
-        return self.session
-
-    async def on_timeout(self) -> None:
-        if self.session and not self.session.closed:
-            await self.session.close()
-
     async def create_stats_embed(self) -> discord.Embed:
         pokemon_color = await self.get_pokemon_color()
         embed = discord.Embed(
@@ -295,11 +287,10 @@ class PokemonInfoView(discord.ui.View):
             ['black-white']['animated']['front_default']
             or self.pokemon_data['sprites']['other']['official-artwork']
             ['front_default'])
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                    f"https://pokeapi.co/api/v2/pokemon/{self.pokemon_data['id']}/encounters"
-            ) as resp:
-                locations = await resp.json()
+        async with self.session.get(
+                f"https://pokeapi.co/api/v2/pokemon/{self.pokemon_data['id']}/encounters"
+        ) as resp:
+            locations = await resp.json()
         if locations:
             location_text = ""
             for location in locations[:15]:
@@ -317,12 +308,11 @@ class PokemonInfoView(discord.ui.View):
 
     async def create_main_embed(self) -> discord.Embed:
         species_url = self.pokemon_data['species']['url']
-        async with aiohttp.ClientSession() as session:
-            async with session.get(species_url) as resp:
-                species_data = await resp.json()
-            async with session.get(
-                    species_data['evolution_chain']['url']) as resp:
-                evo_data = await resp.json()
+        async with self.session.get(species_url) as resp:
+            species_data = await resp.json()
+        async with self.session.get(
+                species_data['evolution_chain']['url']) as resp:
+            evo_data = await resp.json()
         gen_num = species_data['generation']['name'].upper().replace(
             'GENERATION-', 'Gen ')
         pokemon_color = await self.get_pokemon_color()
@@ -438,22 +428,21 @@ class PokemonInfoView(discord.ui.View):
             self, types: List[Dict]) -> Dict[str, float]:
         effectiveness = {}
         pokemon_types = [t['type']['name'] for t in types]
-        async with aiohttp.ClientSession() as session:
-            for type_name in pokemon_types:
-                async with session.get(
-                        f"https://pokeapi.co/api/v2/type/{type_name}") as resp:
-                    type_data = await resp.json()
-                    for relation in type_data['damage_relations'][
-                            'double_damage_from']:
-                        effectiveness[relation['name']] = effectiveness.get(
-                            relation['name'], 1) * 2
-                    for relation in type_data['damage_relations'][
-                            'half_damage_from']:
-                        effectiveness[relation['name']] = effectiveness.get(
-                            relation['name'], 1) * 0.5
-                    for relation in type_data['damage_relations'][
-                            'no_damage_from']:
-                        effectiveness[relation['name']] = 0
+        for type_name in pokemon_types:
+            async with self.session.get(
+                    f"https://pokeapi.co/api/v2/type/{type_name}") as resp:
+                type_data = await resp.json()
+                for relation in type_data['damage_relations'][
+                        'double_damage_from']:
+                    effectiveness[relation['name']] = effectiveness.get(
+                        relation['name'], 1) * 2
+                for relation in type_data['damage_relations'][
+                        'half_damage_from']:
+                    effectiveness[relation['name']] = effectiveness.get(
+                        relation['name'], 1) * 0.5
+                for relation in type_data['damage_relations'][
+                        'no_damage_from']:
+                    effectiveness[relation['name']] = 0
         return {
             k: v
             for k, v in sorted(effectiveness.items(),
@@ -501,7 +490,7 @@ class SeePokedexButton(discord.ui.Button):
                                                     ephemeral=True)
             return
 
-        view = PokemonInfoView(self.pokemon_data)
+        view = PokemonInfoView(self.pokemon_data, interaction.client.session)
         embed = await view.create_main_embed()
 
         self.disabled = True
@@ -605,9 +594,9 @@ class PokemonGuessView(discord.ui.View):
                 description=
                 f"You gave up... The Pokémon was: `{self.pokemon_name.title()}`!",
                 color=discord.Color.red())
-            async with aiohttp.ClientSession() as session:
-                async with session.get(self.pokemon_image) as resp:
-                    actual_image = BytesIO(await resp.read())
+            async with interaction.client.session.get(
+                    self.pokemon_image) as resp:
+                actual_image = BytesIO(await resp.read())
             view = View()
             view.add_item(
                 SeePokedexButton(self.pokemon_data, self.original_author))
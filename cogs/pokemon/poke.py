@@ -10,6 +10,8 @@ from difflib import get_close_matches
 from discord import app_commands
 from colorthief import ColorThief
 
+from helpers.metrics import track_phase
+
 from .modules.pokemod import *
 
 
@@ -38,14 +40,7 @@ class Pokemon(commands.Cog):
     def __init__(self, bot: commands.Bot) -> None:
         self.bot: commands.Bot = bot
         self.pokeapi_url: str = "https://pokeapi.co/api/v2"
-        self.session: Optional[aiohttp.ClientSession] = None
-
-    async def cog_load(self) -> None:
-        self.session = aiohttp.ClientSession()
-
-    async def cog_unload(self) -> None:
-        if self.session:
-            await self.session.close()
+        self.session: aiohttp.ClientSession = bot.session
 
     async def find_closest_match(self, name: str,
                                  category: str) -> Optional[str]:
@@ -188,13 +183,13 @@ class Pokemon(commands.Cog):
         Fetches the dominant color from an image URL to set the embed color.
         """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
+            async with self.session.get(url) as response:
+                if response.status == 200:
+                    image_data = await response.read()
+                    with track_phase('render'):
                         color_thief = ColorThief(BytesIO(image_data))
                         dominant_color = color_thief.get_color(quality=1)
-                        return discord.Color.from_rgb(*dominant_color)
+                    return discord.Color.from_rgb(*dominant_color)
         except Exception as e:
             print(f"Failed to fetch color: {e}")
             return discord.Color.default()
@@ -260,7 +255,7 @@ class Pokemon(commands.Cog):
                     pokemon_data: Dict[str, Union[Dict[str, Union[str,
                                                                   List[Dict]]],
                                                   str]] = await resp.json()
-                    view = PokemonInfoView(pokemon_data)
+                    view = PokemonInfoView(pokemon_data, self.session)
                     embed: discord.Embed = await view.create_main_embed()
                     embed.set_thumbnail(
                         url=pokemon_data['sprites']['versions']['generation-v']
@@ -531,7 +526,7 @@ class Pokemon(commands.Cog):
         async with self.session.get(image_url) as resp:
             image_data: bytes = await resp.read()
 
-        with Image.open(BytesIO(image_data)) as img:
+        with track_phase('render'), Image.open(BytesIO(image_data)) as img:
             img = img.convert('RGBA')
             pixels = img.load()
             width, height = img.size
@@ -6,13 +6,12 @@ import string
 import asyncio
 from typing import Dict, Any, Set, List, Optional, Tuple
 from abc import ABC, abstractmethod
-import aiohttp
 
+from helpers.cooldowns import CooldownStore
 from helpers.database import db
 
 # Rate limits
 RATE_LIMIT_INTERVAL = 2
-RATE_LIMIT_CLEANUP_INTERVAL = 60
 
 
 class RolesyncCooldown:
@@ -20,19 +19,16 @@ class RolesyncCooldown:
     def __init__(self, rate: int, per: int) -> None:
         self.rate = rate
         self.per = per
-        self.last_used: Dict[int, float] = {}
+        self.last_used = CooldownStore('rolesync')
 
     def __call__(self, ctx: commands.Context) -> bool:
-        now = ctx.message.created_at.timestamp()
         bucket = ctx.guild.id if ctx.guild else ctx.author.id
-        if bucket in self.last_used:
-            last = self.last_used[bucket]
-            if now - last < self.per:
-                raise commands.CommandOnCooldown(
-                    cooldown=commands.Cooldown(self.rate, self.per),
-                    retry_after=self.per - (now - last),
-                    type=commands.BucketType.guild)
-        self.last_used[bucket] = now
+        retry_after = self.last_used.hit(bucket, self.per)
+        if retry_after:
+            raise commands.CommandOnCooldown(
+                cooldown=commands.Cooldown(self.rate, self.per),
+                retry_after=retry_after,
+                type=commands.BucketType.guild)
         return True
 
 
@@ -246,37 +242,19 @@ class ReactionRoles(commands.Cog):
         self.reaction_roles: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
         self.tracked_messages: Set[str] = set()
         self.bot.loop.create_task(self.setup_reaction_roles())
-        self.rate_limit_dict: Dict[int, float] = {}
-        self.bot.loop.create_task(self.cleanup_rate_limit_dict())
-        self.bot.loop.create_task(
-            db.initialize())  # Initialize the database pool
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
+        self.rate_limits = CooldownStore('reaction_roles')
+
+    async def cog_load(self) -> None:
+        """Take a reference to the shared database pool."""
+        await db.initialize()
 
     async def cog_unload(self) -> None:
         """Cleanup resources when the cog is unloaded."""
-        await self.session.close()
         await db.close()
 
     def check_rate_limit(self, user_id: int) -> bool:
         """Check if a user has exceeded the rate limit for button clicks."""
-        current_time = asyncio.get_event_loop().time()
-        if user_id in self.rate_limit_dict:
-            last_time = self.rate_limit_dict[user_id]
-            if current_time - last_time < RATE_LIMIT_INTERVAL:
-                return False
-        self.rate_limit_dict[user_id] = current_time
-        return True
-
-    async def cleanup_rate_limit_dict(self) -> None:
-        """Periodically clean up the rate limit dictionary to prevent memory leaks."""
-        while not self.bot.is_closed():
-            current_time = asyncio.get_event_loop().time()
-            self.rate_limit_dict = {
-                user_id: last_time
-                for user_id, last_time in self.rate_limit_dict.items()
-                if current_time - last_time < RATE_LIMIT_INTERVAL
-            }
-            await asyncio.sleep(RATE_LIMIT_CLEANUP_INTERVAL)
+        return not self.rate_limits.hit(user_id, RATE_LIMIT_INTERVAL)
 
     async def save_reaction_roles(self) -> None:
         """Save the current reaction roles data to the database."""
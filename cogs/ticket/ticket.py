@@ -1,11 +1,18 @@
 import asyncio
-from io import BytesIO
+import re
+from typing import Dict, Optional, Tuple
 
 import discord
 from discord import app_commands
 from discord.ext import commands
 
+from helpers.database import db
+from helpers.member_cache import get_or_fetch_member
+
 from .utils.ticket_manager import TicketManager as DataManager
+from .utils.transcript import (TRANSCRIPT_FORMATS, build_transcript,
+                               message_record)
+from .utils.transcript_log import TranscriptLog, ticket_records
 
 
 class send_transcript_dropdown(discord.ui.ChannelSelect):
@@ -25,56 +32,49 @@ class send_transcript_dropdown(discord.ui.ChannelSelect):
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
 
-        messages = [
-            message
-            async for message in interaction.channel.history(limit=None)
-        ]
-        transcript = ""
-
-        for message in reversed(messages):
-            if message.embeds:
-                transcript += (
-                    f"\n\n{message.author}#{message.author.discriminator} EMBED\n\n"
-                )
-                if message.embeds[0].title:
-                    transcript += f"Title - {message.embeds[0].title}\n"
-                if message.embeds[0].description:
-                    transcript += f"Description - {message.embeds[0].description}\n"
-                if message.embeds[0].fields:
-                    for field in message.embeds[0].fields:
-                        transcript += f"{field.name} - {field.value}\n"
-                if message.embeds[0].footer:
-                    transcript += f"Footer - {message.embeds[0].footer.text}\n"
-                if message.embeds[0].image:
-                    transcript += f"Image - {message.embeds[0].image.url}\n"
-                if message.embeds[0].thumbnail:
-                    transcript += f"Thumbnail - {message.embeds[0].thumbnail.url}\n"
-                if message.embeds[0].author:
-                    transcript += f"Author - {message.embeds[0].author.name}\n"
-                if message.embeds[0].url:
-                    transcript += f"URL - {message.embeds[0].url}\n"
-                transcript += f"Message Link - {message.jump_url}\n\n"
-                continue
-            if message.attachments:
-                transcript += f"\n\n{message.author}#{message.author.discriminator} ATTACHMENT(S)\n\n"
-                for attachment in message.attachments:
-                    transcript += f"{attachment.url}\n"
-                transcript += f"Message Link - {message.jump_url}\n\n"
-                continue
-            if message.content:
-                transcript += f"\n{message.author}#{message.author.discriminator} ({message.author.id}): {message.content}"
-                continue
-
-        buffer = BytesIO(transcript.encode("utf8"))
         channel = self.interaction.guild.get_channel(
             int(interaction.data["values"][0]))
+        transcript = await build_transcript(
+            ticket_records(interaction.channel),
+            interaction.channel.name,
+            self.view.transcript_format,
+            channel.guild.filesize_limit,
+        )
+        if transcript is None:
+            return await interaction.followup.send(
+                embed=discord.Embed(
+                    description=
+                    "<a:cross:1306989166491471903> This transcript is too large to upload, even compressed",
+                    colour=discord.Colour.red(),
+                ),
+                ephemeral=True,
+            )
+
         await channel.send(
             content=f"Transcript for {interaction.channel.name}",
-            file=discord.File(
-                fp=buffer,
-                filename=f"transcript-{interaction.channel.name}.txt"),
+            file=transcript,
+        )
+
+
+class transcript_format_dropdown(discord.ui.Select):
+
+    def __init__(self):
+        super().__init__(
+            placeholder="Transcript format",
+            min_values=1,
+            max_values=1,
+            options=[
+                discord.SelectOption(label=label,
+                                     value=value,
+                                     default=value == "txt")
+                for value, label in TRANSCRIPT_FORMATS.items()
+            ],
         )
 
+    async def callback(self, interaction: discord.Interaction):
+        self.view.transcript_format = self.values[0]
+        await interaction.response.defer()
+
 
 class send_transcript_dropdown_view(discord.ui.View):
 
@@ -88,6 +88,8 @@ class send_transcript_dropdown_view(discord.ui.View):
 
         super().__init__()
 
+        self.transcript_format = "txt"
+        self.add_item(transcript_format_dropdown())
         self.add_item(
             send_transcript_dropdown(bot=self.bot,
                                      interaction=self.interaction))
@@ -431,49 +433,156 @@ class create_ticket_modal(discord.ui.Modal, title="Create a Ticket"):
         panel_data = await DataManager.get_panel_data(self.panel_id)
         ticket = await interaction.channel.create_thread(
             name=f"ticket-{interaction.user.name}", )
-        await ticket.add_user(interaction.user)
-
-        await interaction.response.send_message(
-            f"Your ticket has been created in {ticket.mention}",
-            ephemeral=True)
-        ticket_moderators = [
-            f"<@&{role_id}>" for role_id in panel_data["panel_moderators"]
-        ]
-        message = await ticket.send(
-            content=
-            f"{','.join(ticket_moderators)}, {interaction.user.mention}",
-            embed=discord.Embed(
-                title=self.ticketReason.value,
-                description=self.detailedReason.value,
-                colour=discord.Colour.blurple(),
-            ),
-            view=ticket_views(self.bot, self.panel_id, interaction.user.id),
-        )
+        # Registered before anything is sent, so the log has every message
         await DataManager.create_ticket(self.panel_id, ticket.id,
                                         interaction.user.id)
+        try:
+            await ticket.add_user(interaction.user)
+
+            await interaction.response.send_message(
+                f"Your ticket has been created in {ticket.mention}",
+                ephemeral=True)
+            ticket_moderators = [
+                f"<@&{role_id}>" for role_id in panel_data["panel_moderators"]
+            ]
+            message = await ticket.send(
+                content=
+                f"{','.join(ticket_moderators)}, {interaction.user.mention}",
+                embed=discord.Embed(
+                    title=self.ticketReason.value,
+                    description=self.detailedReason.value,
+                    colour=discord.Colour.blurple(),
+                ),
+                view=ticket_views(self.bot, self.panel_id, interaction.user.id,
+                                  ticket.id),
+            )
+        except Exception:
+            # The user never got this ticket, so it must not count against
+            # their limit
+            await DataManager.close_ticket(self.panel_id, ticket.id)
+            raise
         await message.pin()
 
 
-class closed_ticket_views(discord.ui.View):
+async def resolve_ticket_ids(
+    interaction: discord.Interaction, match: re.Match[str]
+) -> Tuple[Optional[int], int, Optional[int]]:
+    """(panel_id, ticket_id, creator_id) from a ticket button's custom_id.
+
+    Buttons sent before the IDs were encoded in the custom_id only carry the
+    action, so their ticket is looked up from the thread they are in."""
+    if match["panel_id"] is not None:
+        return int(match["panel_id"]), int(match["ticket_id"]), int(
+            match["user_id"])
+
+    ticket_id = interaction.channel_id
+    ticket = await DataManager.get_ticket(ticket_id)
+    if ticket is None:
+        return None, ticket_id, None
+    return ticket["panel_id"], ticket_id, ticket["ticket_creator"]
+
+
+async def send_unknown_ticket(interaction: discord.Interaction):
+    await interaction.followup.send(
+        embed=discord.Embed(
+            description=
+            "<a:cross:1306989166491471903> This ticket is no longer in the database",
+            colour=discord.Colour.red(),
+        ),
+        ephemeral=True,
+    )
 
-    def __init__(self, bot, panel_id: int, user_id: int, ticket_id: int):
-        super().__init__(timeout=None)
-        self.bot = bot
+
+class close_ticket_button(
+        discord.ui.DynamicItem[discord.ui.Button],
+        template=
+        r"ticket:close(?:_ticket|:(?P<panel_id>\d+):(?P<ticket_id>\d+):(?P<user_id>\d+))",
+):
+
+    def __init__(self, panel_id: Optional[int], ticket_id: int,
+                 user_id: Optional[int]):
+        super().__init__(
+            discord.ui.Button(
+                label="Close Ticket",
+                style=discord.ButtonStyle.red,
+                custom_id=f"ticket:close:{panel_id}:{ticket_id}:{user_id}",
+                emoji="🔒",
+            ))
         self.panel_id = panel_id
+        self.ticket_id = ticket_id
         self.user_id = user_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction,
+                             item: discord.ui.Button, match: re.Match[str]):
+        return cls(*await resolve_ticket_ids(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+        if self.panel_id is None:
+            return await send_unknown_ticket(interaction)
+
+        await DataManager.close_ticket(self.panel_id, interaction.channel.id)
+        panel_data = await DataManager.get_panel_data(self.panel_id)
+
+        for user in await interaction.channel.fetch_members():
+            member = await get_or_fetch_member(interaction.guild, user.id)
+            if member:
+                if any(role.id in panel_data["panel_moderators"]
+                       for role in member.roles):
+                    continue
+                else:
+                    await interaction.channel.remove_user(member)
+            else:
+                continue
+
+        try:
+            user = discord.Object(id=self.user_id)
+            await interaction.channel.remove_user(user)
+        except AttributeError:
+            pass
+
+        await interaction.channel.send(
+            embed=discord.Embed(
+                title="Ticket Closed",
+                description=f"Ticket closed by {interaction.user.mention}",
+                colour=discord.Colour.red(),
+            ),
+            view=closed_ticket_views(interaction.client, self.panel_id,
+                                     self.user_id, interaction.channel.id))
+
+
+class reopen_ticket_button(
+        discord.ui.DynamicItem[discord.ui.Button],
+        template=
+        r"ticket:reopen(?:_ticket|:(?P<panel_id>\d+):(?P<ticket_id>\d+):(?P<user_id>\d+))",
+):
+
+    def __init__(self, panel_id: Optional[int], ticket_id: int,
+                 user_id: Optional[int]):
+        super().__init__(
+            discord.ui.Button(
+                label="Reopen Ticket",
+                style=discord.ButtonStyle.green,
+                custom_id=f"ticket:reopen:{panel_id}:{ticket_id}:{user_id}",
+                emoji="🔓",
+            ))
+        self.panel_id = panel_id
         self.ticket_id = ticket_id
+        self.user_id = user_id
 
-    @discord.ui.button(
-        label="Reopen Ticket",
-        style=discord.ButtonStyle.green,
-        custom_id="ticket:reopen_ticket",
-        emoji="🔓",
-    )
-    async def reopen_ticket(self, interaction: discord.Interaction,
-                            button: discord.ui.Button):
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction,
+                             item: discord.ui.Button, match: re.Match[str]):
+        return cls(*await resolve_ticket_ids(interaction, match))
+
+    async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
-        await DataManager.close_ticket(self.panel_id, interaction.channel.id)
-        user = self.bot.get_user(self.user_id)
+        if self.panel_id is None:
+            return await send_unknown_ticket(interaction)
+
+        await DataManager.open_ticket(self.panel_id, interaction.channel.id)
+        user = discord.Object(id=self.user_id)
         await interaction.delete_original_response()
         await interaction.channel.add_user(user)
         await interaction.channel.send(embed=discord.Embed(
@@ -482,87 +591,106 @@ class closed_ticket_views(discord.ui.View):
             colour=discord.Colour.green(),
         ))
 
-    @discord.ui.button(
-        label="Delete Ticket",
-        style=discord.ButtonStyle.red,
-        custom_id="ticket:delete_ticket",
-        emoji="🗑️",
-    )
-    async def delete_ticket(self, interaction: discord.Interaction,
-                            button: discord.ui.Button):
+
+class delete_ticket_button(discord.ui.DynamicItem[discord.ui.Button],
+                           template=r"ticket:delete_ticket"):
+
+    def __init__(self):
+        super().__init__(
+            discord.ui.Button(
+                label="Delete Ticket",
+                style=discord.ButtonStyle.red,
+                custom_id="ticket:delete_ticket",
+                emoji="🗑️",
+            ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction,
+                             item: discord.ui.Button, match: re.Match[str]):
+        return cls()
+
+    async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         await interaction.channel.delete()
 
-    @discord.ui.button(
-        label="Transcript Ticket",
-        style=discord.ButtonStyle.blurple,
-        custom_id="ticket:transcript_ticket",
-        emoji="📜",
-    )
-    async def transcript_ticket(self, interaction: discord.Interaction,
-                                button: discord.ui.Button):
+
+class transcript_ticket_button(discord.ui.DynamicItem[discord.ui.Button],
+                               template=r"ticket:transcript_ticket"):
+
+    def __init__(self):
+        super().__init__(
+            discord.ui.Button(
+                label="Transcript Ticket",
+                style=discord.ButtonStyle.blurple,
+                custom_id="ticket:transcript_ticket",
+                emoji="📜",
+            ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction,
+                             item: discord.ui.Button, match: re.Match[str]):
+        return cls()
+
+    async def callback(self, interaction: discord.Interaction):
         await interaction.response.send_message(
             view=send_transcript_dropdown_view(
-                bot=self.bot,
+                bot=interaction.client,
                 interaction=interaction,
             ),
             ephemeral=True,
         )
 
 
-class ticket_views(discord.ui.View):
+# Registered once with bot.add_dynamic_items; the IDs in each custom_id
+# route every ticket's buttons without a view per ticket.
+ticket_dynamic_items = (
+    close_ticket_button,
+    reopen_ticket_button,
+    delete_ticket_button,
+    transcript_ticket_button,
+)
+
 
-    def __init__(self, bot, panel_id, user_id):
+class closed_ticket_views(discord.ui.View):
+
+    def __init__(self, bot, panel_id: int, user_id: int, ticket_id: int):
         super().__init__(timeout=None)
         self.bot = bot
-        self.panel_id = panel_id
-        self.user_id = user_id
+        self.add_item(reopen_ticket_button(panel_id, ticket_id, user_id))
+        self.add_item(delete_ticket_button())
+        self.add_item(transcript_ticket_button())
 
-    @discord.ui.button(
-        label="Close Ticket",
-        style=discord.ButtonStyle.red,
-        custom_id="ticket:close_ticket",
-        emoji="🔒",
-    )
-    async def close_ticket(self, interaction: discord.Interaction,
-                           button: discord.ui.Button):
-        await interaction.response.defer()
-        await DataManager.close_ticket(self.panel_id, interaction.channel.id)
-        panel_data = await DataManager.get_panel_data(self.panel_id)
 
-        for user in await interaction.channel.fetch_members():
-            member = interaction.guild.get_member(user.id)
-            if member:
-                if any(role.id in panel_data["panel_moderators"]
-                       for role in member.roles):
-                    continue
-                else:
-                    await interaction.channel.remove_user(member)
-            else:
-                continue
+class ticket_views(discord.ui.View):
 
-        try:
-            user = self.bot.get_user(self.user_id)
-            await interaction.channel.remove_user(user)
+    def __init__(self, bot, panel_id: int, user_id: int, ticket_id: int):
+        super().__init__(timeout=None)
+        self.bot = bot
+        self.add_item(close_ticket_button(panel_id, ticket_id, user_id))
 
-            await interaction.channel.send(
-                embed=discord.Embed(
-                    title="Ticket Closed",
-                    description=f"Ticket closed by {interaction.user.mention}",
-                    colour=discord.Colour.red(),
-                ),
-                view=closed_ticket_views(self.bot, self.panel_id, self.user_id,
-                                         interaction.message.id))
 
-        except AttributeError:
-            await interaction.channel.send(
-                embed=discord.Embed(
-                    title="Ticket Closed",
-                    description=f"Ticket closed by {interaction.user.mention}",
-                    colour=discord.Colour.red(),
-                ),
-                view=closed_ticket_views(self.bot, self.panel_id, self.user_id,
-                                         interaction.message.id))
+async def ticket_thread_exists(guild: discord.Guild, ticket_id: int) -> bool:
+    if guild.get_channel_or_thread(ticket_id) is not None:
+        return True
+    try:
+        # Archived threads are not cached
+        await guild.fetch_channel(ticket_id)
+    except discord.NotFound:
+        return False
+    except discord.HTTPException:
+        # Unknown, so it keeps counting
+        return True
+    return True
+
+
+async def close_deleted_tickets(guild: discord.Guild, panel_id: int,
+                                user_id: int) -> int:
+    """Close the user's open tickets on the panel whose thread is gone;
+    returns how many are still open."""
+    for ticket_id in await DataManager.open_ticket_ids(panel_id, user_id):
+        if not await ticket_thread_exists(guild, ticket_id):
+            await DataManager.ticket_deleted(ticket_id)
+    return await DataManager.open_ticket_count(panel_id, user_id)
 
 
 class panel_views(discord.ui.View):
@@ -592,17 +720,15 @@ class panel_views(discord.ui.View):
                 ephemeral=True,
             )
 
-        i = 0
-        for thread in interaction.channel.threads:
-            if thread.name == f"ticket-{interaction.user.name}":
-                try:
-                    await thread.fetch_member(interaction.user.id)
-                    i += 1
-                    await asyncio.sleep(0.1)
-                except discord.errors.NotFound:
-                    continue
-
-        if i >= panel_data["limit_per_user"]:
+        open_tickets = await DataManager.open_ticket_count(
+            interaction.message.id, interaction.user.id)
+        if open_tickets >= panel_data["limit_per_user"]:
+            # Threads deleted while the bot was offline still count as
+            # open; make sure the user is really at the limit
+            open_tickets = await close_deleted_tickets(
+                interaction.guild, interaction.message.id,
+                interaction.user.id)
+        if open_tickets >= panel_data["limit_per_user"]:
             return await interaction.response.send_message(
                 embed=discord.Embed(
                     title="Too Many Tickets Opened",
@@ -871,9 +997,77 @@ class ticket(commands.GroupCog):
         )
         self.bot.tree.add_command(self.ctx_menu)
 
+    async def cog_load(self) -> None:
+        await db.initialize()
+        # Taken before any message can be logged, so the catch-up starts
+        # where the log really ends
+        last_ids = await TranscriptLog.last_message_ids()
+        # Bots' messages too: the ticket's opening message is the bot's
+        self.bot.message_dispatcher.register('ticket_log',
+                                             self.log_message,
+                                             bots=True)
+        self.catch_up_task = asyncio.create_task(
+            self.catch_up_transcripts(last_ids))
+
     async def cog_unload(self) -> None:
+        self.bot.message_dispatcher.unregister('ticket_log')
+        self.catch_up_task.cancel()
         self.bot.tree.remove_command(self.ctx_menu.name,
                                      type=self.ctx_menu.type)
+        await db.close()
+
+    async def catch_up_transcripts(
+            self, last_ids: Dict[int, Optional[int]]) -> None:
+        await self.bot.wait_until_ready()
+        for ticket_id, last_id in last_ids.items():
+            thread = self.bot.get_channel(ticket_id)
+            # Archived, deleted, or in another cluster's guild
+            if not isinstance(thread, discord.Thread):
+                continue
+            try:
+                await TranscriptLog.catch_up(thread, last_id)
+            except discord.HTTPException:
+                continue
+
+    async def logged_ticket(self, channel_id: int) -> bool:
+        if not isinstance(self.bot.get_channel(channel_id), discord.Thread):
+            return False
+        ticket = await DataManager.get_ticket(channel_id)
+        return ticket is not None and bool(ticket.get("captured"))
+
+    async def log_message(self, message: discord.Message):
+        # Tickets are threads; nothing else needs a lookup
+        if not isinstance(message.channel, discord.Thread):
+            return
+        if await self.logged_ticket(message.channel.id):
+            await TranscriptLog.append(message.channel.id,
+                                       message_record(message))
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self,
+                                  payload: discord.RawMessageUpdateEvent):
+        if await self.logged_ticket(payload.channel_id):
+            await TranscriptLog.append(payload.channel_id,
+                                       message_record(payload.message))
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self,
+                                    payload: discord.RawMessageDeleteEvent):
+        if await self.logged_ticket(payload.channel_id):
+            await TranscriptLog.mark_deleted(payload.channel_id,
+                                             [payload.message_id])
+
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self,
+                                   payload: discord.RawThreadDeleteEvent):
+        await DataManager.ticket_deleted(payload.thread_id)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(
+            self, payload: discord.RawBulkMessageDeleteEvent):
+        if await self.logged_ticket(payload.channel_id):
+            await TranscriptLog.mark_deleted(payload.channel_id,
+                                             payload.message_ids)
 
     @app_commands.command(
         name="create_panel",
@@ -908,13 +1102,9 @@ class ticket(commands.GroupCog):
     @app_commands.guild_only()
     @app_commands.checks.cooldown(1, 30, key=lambda i: (i.guild.id))
     async def close_ticket(self, interaction: discord.Interaction):
-        all_tickets = await DataManager.get_all_tickets()
-        if any(ticket["ticket_id"] == str(interaction.channel.id)
-               for ticket in all_tickets):
-            panel_id = await DataManager.get_panel_id_by_ticket_id(
-                interaction.channel.id)
-            ticket = await DataManager.get_ticket_data(panel_id,
-                                                       interaction.channel.id)
+        ticket = await DataManager.get_ticket(interaction.channel.id)
+        if ticket is not None:
+            panel_id = ticket["panel_id"]
             if ticket["closed"]:
                 return await interaction.response.send_message(
                     embed=discord.Embed(
@@ -927,15 +1117,11 @@ class ticket(commands.GroupCog):
 
             elif not ticket["closed"]:
                 await interaction.response.defer()
-                panel_id = await DataManager.get_panel_id_by_ticket_id(
-                    interaction.channel.id)
                 await DataManager.close_ticket(panel_id,
                                                interaction.channel.id)
-                ticket = await DataManager.get_ticket_data(
-                    panel_id, interaction.channel.id)
                 panel_data = await DataManager.get_panel_data(panel_id)
                 for user in await interaction.channel.fetch_members():
-                    member = interaction.guild.get_member(user.id)
+                    member = await get_or_fetch_member(interaction.guild, user.id)
                     if member:
                         if any(role.id in panel_data["panel_moderators"]
                                for role in member.roles):
@@ -973,13 +1159,9 @@ class ticket(commands.GroupCog):
     @app_commands.guild_only()
     @app_commands.checks.cooldown(1, 30, key=lambda i: (i.guild.id))
     async def reopen_ticket(self, interaction: discord.Interaction):
-        all_tickets = await DataManager.get_all_tickets()
-        if any(ticket["ticket_id"] == str(interaction.channel.id)
-               for ticket in all_tickets):
-            panel_id = await DataManager.get_panel_id_by_ticket_id(
-                interaction.channel.id)
-            ticket = await DataManager.get_ticket_data(panel_id,
-                                                       interaction.channel.id)
+        ticket = await DataManager.get_ticket(interaction.channel.id)
+        if ticket is not None:
+            panel_id = ticket["panel_id"]
             if not ticket["closed"]:
                 return await interaction.response.send_message(
                     embed=discord.Embed(
@@ -993,7 +1175,7 @@ class ticket(commands.GroupCog):
             elif ticket["closed"]:
                 await interaction.response.defer()
                 await DataManager.open_ticket(panel_id, interaction.channel.id)
-                user = self.bot.get_user(ticket["ticket_creator"])
+                user = discord.Object(id=ticket["ticket_creator"])
                 await interaction.delete_original_response()
                 await interaction.channel.add_user(user)
                 await interaction.channel.send(embed=discord.Embed(
@@ -1018,9 +1200,8 @@ class ticket(commands.GroupCog):
     async def edit_panel(self, interaction: discord.Interaction,
                          message: discord.Message):
         await interaction.response.defer(ephemeral=True)
-        panels = await DataManager.get_all_panels()
-        if any(message.id == panel["id"] for panel in panels):
-            panel = await DataManager.get_panel_data(message.id)
+        panel = await DataManager.get_panel_data(message.id)
+        if panel is not None:
             await interaction.edit_original_response(
                 embed=discord.Embed(
                     title=panel["panel_title"],
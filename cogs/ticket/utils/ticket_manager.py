@@ -1,14 +1,37 @@
-from typing import Optional, Dict, List
+import asyncio
+from collections import OrderedDict
+from typing import Optional, Dict, List, Tuple
 
 from helpers.database import db
 
+# Channels remembered as not being tickets, so busy threads that are not
+# tickets don't query the table for every message
+MISSING_CACHE_SIZE: int = 1024
+
 
 class TicketManager:
+    # Rows are cached the first time they are looked up, and every write
+    # goes through here, so lookups after the first are dict hits. Ticket
+    # misses are remembered in a bounded LRU. A guild's tickets only live
+    # in the process that has the guild, so nothing else writes behind
+    # this cache.
 
-    @staticmethod
-    async def create_panel(panel_id: int, channel_id: int, guild_id: int,
-                           limit_per_user: int, panel_title: str,
-                           panel_description: str,
+    # panel_id -> ticket_panels row, or None for no (undeleted) panel
+    panels: Dict[int, Optional[Dict]] = {}
+    # ticket_id (the ticket thread's channel ID) -> tickets row
+    tickets: Dict[int, Dict] = {}
+    # Channel IDs with no tickets row, least recently looked up first
+    missing: OrderedDict[int, None] = OrderedDict()
+    # (panel_id, creator_id) -> tickets the creator has open on the panel
+    open_counts: Dict[Tuple[int, int], int] = {}
+    # Held while a count is loaded or a ticket opens or closes, so a count
+    # read from the table never misses a change made while it was read
+    open_locks: Dict[Tuple[int, int], asyncio.Lock] = {}
+
+    @classmethod
+    async def create_panel(cls, panel_id: int, channel_id: int,
+                           guild_id: int, limit_per_user: int,
+                           panel_title: str, panel_description: str,
                            panel_moderators: List[int]) -> None:
         query = """
         INSERT INTO ticket_panels (id, channel_id, guild_id, limit_per_user, panel_title, panel_description, panel_moderators)
@@ -16,47 +39,156 @@ class TicketManager:
         """
         await db.execute(query, panel_id, channel_id, guild_id, limit_per_user,
                          panel_title, panel_description, panel_moderators)
+        cls.panels[panel_id] = {
+            "id": panel_id,
+            "channel_id": channel_id,
+            "guild_id": guild_id,
+            "limit_per_user": limit_per_user,
+            "panel_title": panel_title,
+            "panel_description": panel_description,
+            "panel_moderators": list(panel_moderators),
+            "deleted": False,
+        }
 
-    @staticmethod
-    async def get_panel_data(panel_id: int) -> Optional[Dict]:
-        query = "SELECT * FROM ticket_panels WHERE id = $1 AND deleted = FALSE"
-        result = await db.fetch(query, panel_id)
-        return dict(result[0]) if result else None
+    @classmethod
+    async def get_panel_data(cls, panel_id: int) -> Optional[Dict]:
+        if panel_id not in cls.panels:
+            query = "SELECT * FROM ticket_panels WHERE id = $1 AND deleted = FALSE"
+            result = await db.fetch(query, panel_id)
+            # A write that landed while the query ran is newer
+            cls.panels.setdefault(panel_id,
+                                  dict(result[0]) if result else None)
+        panel = cls.panels[panel_id]
+        return dict(panel) if panel is not None else None
 
-    @staticmethod
-    async def edit_panel_data(panel_id: int, field: str, value: any) -> None:
+    @classmethod
+    async def edit_panel_data(cls, panel_id: int, field: str,
+                              value: any) -> None:
         if field == "delete":
             query = "UPDATE ticket_panels SET deleted = TRUE WHERE id = $1"
             await db.execute(query, panel_id)
+            cls.panels[panel_id] = None
             return
 
         query = f"UPDATE ticket_panels SET {field} = $1 WHERE id = $2"
         await db.execute(query, value, panel_id)
 
-    @staticmethod
-    async def create_ticket(panel_id: int, ticket_id: int,
+        panel = cls.panels.get(panel_id)
+        if field == "id":
+            # The panel moved to the message it was finally sent as
+            cls.panels[panel_id] = None
+            cls.panels.pop(value, None)
+            if panel is not None:
+                panel["id"] = value
+                cls.panels[value] = panel
+        elif panel is not None:
+            panel[field] = value
+
+    @classmethod
+    async def create_ticket(cls, panel_id: int, ticket_id: int,
                             creator_id: int) -> None:
         query = """
-        INSERT INTO tickets (panel_id, ticket_id, ticket_creator)
-        VALUES ($1, $2, $3)
+        INSERT INTO tickets (panel_id, ticket_id, ticket_creator, captured)
+        VALUES ($1, $2, $3, TRUE)
         """
-        await db.execute(query, panel_id, ticket_id, creator_id)
+        async with cls._open_lock(panel_id, creator_id):
+            await db.execute(query, panel_id, ticket_id, creator_id)
+            cls.missing.pop(ticket_id, None)
+            cls.tickets[ticket_id] = {
+                "panel_id": panel_id,
+                "ticket_id": ticket_id,
+                "ticket_creator": creator_id,
+                "closed": False,
+                # Its messages are logged from the start; see transcript_log
+                "captured": True,
+            }
+            cls._count_open(panel_id, creator_id, 1)
 
-    @staticmethod
-    async def get_ticket_data(panel_id: int, ticket_id: int) -> Optional[Dict]:
-        query = "SELECT * FROM tickets WHERE panel_id = $1 AND ticket_id = $2"
-        result = await db.fetch(query, panel_id, ticket_id)
-        return dict(result[0]) if result else None
+    @classmethod
+    async def get_ticket(cls, ticket_id: int) -> Optional[Dict]:
+        """The ticket whose thread is ``ticket_id``, if it is one."""
+        if ticket_id in cls.missing:
+            cls.missing.move_to_end(ticket_id)
+            return None
+        if ticket_id not in cls.tickets:
+            query = "SELECT * FROM tickets WHERE ticket_id = $1"
+            result = await db.fetch(query, ticket_id)
+            if result:
+                # A write that landed while the query ran is newer
+                cls.tickets.setdefault(ticket_id, dict(result[0]))
+            elif ticket_id not in cls.tickets:
+                cls.missing[ticket_id] = None
+                if len(cls.missing) > MISSING_CACHE_SIZE:
+                    cls.missing.popitem(last=False)
+                return None
+        return dict(cls.tickets[ticket_id])
 
-    @staticmethod
-    async def close_ticket(panel_id: int, ticket_id: int) -> None:
-        query = "UPDATE tickets SET closed = TRUE WHERE panel_id = $1 AND ticket_id = $2"
-        await db.execute(query, panel_id, ticket_id)
+    @classmethod
+    async def get_ticket_data(cls, panel_id: int,
+                              ticket_id: int) -> Optional[Dict]:
+        ticket = await cls.get_ticket(ticket_id)
+        if ticket is None or ticket["panel_id"] != panel_id:
+            return None
+        return ticket
+
+    @classmethod
+    async def close_ticket(cls, panel_id: int, ticket_id: int) -> None:
+        await cls._set_closed(panel_id, ticket_id, True)
+
+    @classmethod
+    async def open_ticket(cls, panel_id: int, ticket_id: int) -> None:
+        await cls._set_closed(panel_id, ticket_id, False)
+
+    @classmethod
+    async def ticket_deleted(cls, ticket_id: int) -> None:
+        """A deleted ticket thread no longer counts as open."""
+        ticket = await cls.get_ticket(ticket_id)
+        if ticket is not None and not ticket["closed"]:
+            await cls.close_ticket(ticket["panel_id"], ticket_id)
+
+    @classmethod
+    async def _set_closed(cls, panel_id: int, ticket_id: int,
+                          closed: bool) -> None:
+        query = "UPDATE tickets SET closed = $3 WHERE panel_id = $1 AND ticket_id = $2"
+        ticket = await cls.get_ticket_data(panel_id, ticket_id)
+        if ticket is None:
+            await db.execute(query, panel_id, ticket_id, closed)
+            return
+        async with cls._open_lock(panel_id, ticket["ticket_creator"]):
+            await db.execute(query, panel_id, ticket_id, closed)
+            cached = cls.tickets[ticket_id]
+            if cached["closed"] == closed:
+                return
+            cached["closed"] = closed
+            cls._count_open(panel_id, ticket["ticket_creator"],
+                            -1 if closed else 1)
+
+    @classmethod
+    async def open_ticket_count(cls, panel_id: int, user_id: int) -> int:
+        key = (panel_id, user_id)
+        async with cls._open_lock(panel_id, user_id):
+            if key not in cls.open_counts:
+                query = "SELECT COUNT(*) AS open FROM tickets WHERE panel_id = $1 AND ticket_creator = $2 AND NOT closed"
+                result = await db.fetch(query, panel_id, user_id)
+                cls.open_counts[key] = result[0]["open"]
+        return cls.open_counts[key]
 
     @staticmethod
-    async def open_ticket(panel_id: int, ticket_id: int) -> None:
-        query = "UPDATE tickets SET closed = FALSE WHERE panel_id = $1 AND ticket_id = $2"
-        await db.execute(query, panel_id, ticket_id)
+    async def open_ticket_ids(panel_id: int, user_id: int) -> List[int]:
+        query = "SELECT ticket_id FROM tickets WHERE panel_id = $1 AND ticket_creator = $2 AND NOT closed"
+        results = await db.fetch(query, panel_id, user_id)
+        return [row["ticket_id"] for row in results]
+
+    @classmethod
+    def _open_lock(cls, panel_id: int, user_id: int) -> asyncio.Lock:
+        return cls.open_locks.setdefault((panel_id, user_id), asyncio.Lock())
+
+    @classmethod
+    def _count_open(cls, panel_id: int, user_id: int, change: int) -> None:
+        # Counts not loaded yet are read from the table when first needed
+        key = (panel_id, user_id)
+        if key in cls.open_counts:
+            cls.open_counts[key] = max(cls.open_counts[key] + change, 0)
 
     @staticmethod
     async def get_all_tickets() -> List[Dict]:
@@ -70,8 +202,8 @@ class TicketManager:
         results = await db.fetch(query)
         return [dict(row) for row in results]
 
-    @staticmethod
-    async def get_panel_id_by_ticket_id(ticket_id: int) -> Optional[int]:
-        query = "SELECT panel_id FROM tickets WHERE ticket_id = $1"
-        result = await db.fetch(query, ticket_id)
-        return result[0]['panel_id'] if result else None
+    @classmethod
+    async def get_panel_id_by_ticket_id(cls,
+                                        ticket_id: int) -> Optional[int]:
+        ticket = await cls.get_ticket(ticket_id)
+        return ticket["panel_id"] if ticket is not None else None
@@ -0,0 +1,274 @@
+"""
+Ticket transcripts, written as they are read.
+
+The ticket thread's history is walked oldest-first (discord.py fetches it
+a page of 100 messages at a time) and each message is written out as soon
+as it arrives, into a temporary file that stays in memory while it is
+small and moves to disk once it is not. Nothing holds the whole history,
+and building the file is linear in the number of messages.
+
+Transcripts come as plain text, JSON Lines (one message per line) or a
+single HTML page with its styles inline. A transcript larger than the
+destination's upload limit is gzipped; if it is still too large, there is
+no file.
+"""
+
+import asyncio
+import gzip
+import html
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import IO, Any, AsyncIterator, Dict, List, Optional, Type
+
+import discord
+
+from helpers.codec import dumps_bytes
+
+# Transcripts up to this size never touch the disk
+SPOOL_MAX_SIZE: int = 1024 * 1024
+
+TRANSCRIPT_FORMATS: Dict[str, str] = {
+    "txt": "Plain text",
+    "jsonl": "JSON Lines",
+    "html": "Web page",
+}
+
+
+def message_record(message: discord.Message) -> Dict[str, Any]:
+    """The parts of a message a transcript needs, as plain JSON data."""
+    return {
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "discriminator": message.author.discriminator,
+        "created_at": message.created_at.isoformat(),
+        "edited_at": (message.edited_at.isoformat()
+                      if message.edited_at else None),
+        "content": message.content,
+        "embeds": [embed.to_dict() for embed in message.embeds],
+        "attachments": [{
+            "filename": attachment.filename,
+            "url": attachment.url
+        } for attachment in message.attachments],
+        "jump_url": message.jump_url,
+    }
+
+
+async def history_records(
+        channel: discord.abc.Messageable) -> AsyncIterator[Dict[str, Any]]:
+    async for message in channel.history(limit=None, oldest_first=True):
+        yield message_record(message)
+
+
+class TranscriptWriter(ABC):
+    extension: str = "txt"
+
+    def __init__(self, channel_name: str) -> None:
+        self.channel_name = channel_name
+
+    def header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def message(self, record: Dict[str, Any]) -> str:
+        pass
+
+    def footer(self) -> str:
+        return ""
+
+
+class TextTranscript(TranscriptWriter):
+    extension = "txt"
+
+    def message(self, record: Dict[str, Any]) -> str:
+        author = f"{record['author']}#{record['discriminator']}"
+        if record["embeds"]:
+            embed = record["embeds"][0]
+            lines = [f"\n\n{author} EMBED{self.flags(record)}\n\n"]
+            if embed.get("title"):
+                lines.append(f"Title - {embed['title']}\n")
+            if embed.get("description"):
+                lines.append(f"Description - {embed['description']}\n")
+            for field in embed.get("fields", []):
+                lines.append(f"{field['name']} - {field['value']}\n")
+            if embed.get("footer"):
+                lines.append(f"Footer - {embed['footer'].get('text')}\n")
+            if embed.get("image"):
+                lines.append(f"Image - {embed['image'].get('url')}\n")
+            if embed.get("thumbnail"):
+                lines.append(f"Thumbnail - {embed['thumbnail'].get('url')}\n")
+            if embed.get("author"):
+                lines.append(f"Author - {embed['author'].get('name')}\n")
+            if embed.get("url"):
+                lines.append(f"URL - {embed['url']}\n")
+            lines.append(f"Message Link - {record['jump_url']}\n\n")
+            return "".join(lines)
+        if record["attachments"]:
+            urls = "".join(f"{attachment['url']}\n"
+                           for attachment in record["attachments"])
+            return (f"\n\n{author} ATTACHMENT(S){self.flags(record)}\n\n{urls}"
+                    f"Message Link - {record['jump_url']}\n\n")
+        if record["content"]:
+            return (f"\n{author} ({record['author_id']}): {record['content']}"
+                    f"{self.flags(record)}")
+        return ""
+
+    @staticmethod
+    def flags(record: Dict[str, Any]) -> str:
+        if record.get("deleted"):
+            return " (deleted)"
+        if record.get("edited_at"):
+            return " (edited)"
+        return ""
+
+
+class JSONLTranscript(TranscriptWriter):
+    extension = "jsonl"
+
+    def message(self, record: Dict[str, Any]) -> str:
+        return dumps_bytes(record).decode("utf-8") + "\n"
+
+
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Transcript of {title}</title>
+<style>
+body {{ background: #313338; color: #dbdee1; font: 15px/1.4 sans-serif; margin: 0 auto; max-width: 960px; padding: 16px; }}
+h1 {{ font-size: 20px; }}
+.message {{ border-bottom: 1px solid #3f4147; padding: 8px 0; }}
+.author {{ color: #f2f3f5; font-weight: 600; }}
+.meta {{ color: #949ba4; font-size: 12px; }}
+.meta a {{ color: #949ba4; }}
+.content {{ white-space: pre-wrap; word-wrap: break-word; }}
+.embed {{ background: #2b2d31; border-left: 4px solid #5865f2; border-radius: 4px; margin-top: 4px; padding: 8px 12px; white-space: pre-wrap; }}
+.embed .title {{ font-weight: 600; }}
+.embed .field-name {{ font-weight: 600; margin-top: 4px; }}
+a {{ color: #00a8fc; }}
+</style>
+</head>
+<body>
+<h1>Transcript of {title}</h1>
+<p class="meta">Exported {exported}</p>
+"""
+
+
+class HTMLTranscript(TranscriptWriter):
+    extension = "html"
+
+    def header(self) -> str:
+        return HTML_HEAD.format(
+            title=html.escape(self.channel_name),
+            exported=datetime.now(timezone.utc).strftime(
+                "%Y-%m-%d %H:%M UTC"))
+
+    def message(self, record: Dict[str, Any]) -> str:
+        escape = html.escape
+        created = record["created_at"][:19].replace("T", " ")
+        flags = ""
+        if record.get("deleted"):
+            flags = " &middot; deleted"
+        elif record.get("edited_at"):
+            flags = " &middot; edited"
+        parts = [
+            '<div class="message">',
+            f'<div><span class="author">{escape(record["author"])}</span> '
+            f'<span class="meta">{record["author_id"]} &middot; {created} UTC{flags} '
+            f'&middot; <a href="{escape(record["jump_url"])}">link</a></span></div>',
+        ]
+        if record["content"]:
+            parts.append(
+                f'<div class="content">{escape(record["content"])}</div>')
+        for embed in record["embeds"]:
+            parts.append(self.embed(embed))
+        for attachment in record["attachments"]:
+            parts.append(f'<div><a href="{escape(attachment["url"])}">'
+                         f'{escape(attachment["filename"])}</a></div>')
+        parts.append("</div>\n")
+        return "".join(parts)
+
+    @staticmethod
+    def embed(embed: Dict[str, Any]) -> str:
+        escape = html.escape
+        parts: List[str] = ['<div class="embed">']
+        if embed.get("author", {}).get("name"):
+            parts.append(f'<div>{escape(embed["author"]["name"])}</div>')
+        if embed.get("title"):
+            title = escape(embed["title"])
+            if embed.get("url"):
+                title = f'<a href="{escape(embed["url"])}">{title}</a>'
+            parts.append(f'<div class="title">{title}</div>')
+        if embed.get("description"):
+            parts.append(f'<div>{escape(embed["description"])}</div>')
+        for field in embed.get("fields", []):
+            parts.append(
+                f'<div class="field-name">{escape(field["name"])}</div>'
+                f'<div>{escape(field["value"])}</div>')
+        for key in ("image", "thumbnail"):
+            url = embed.get(key, {}).get("url")
+            if url:
+                parts.append(f'<div><a href="{escape(url)}">{key}</a></div>')
+        if embed.get("footer", {}).get("text"):
+            parts.append(
+                f'<div class="meta">{escape(embed["footer"]["text"])}</div>')
+        parts.append("</div>")
+        return "".join(parts)
+
+    def footer(self) -> str:
+        return "</body>\n</html>\n"
+
+
+WRITERS: Dict[str, Type[TranscriptWriter]] = {
+    "txt": TextTranscript,
+    "jsonl": JSONLTranscript,
+    "html": HTMLTranscript,
+}
+
+
+async def write_transcript(records: AsyncIterator[Dict[str, Any]],
+                           writer: TranscriptWriter, fp: IO[bytes]) -> int:
+    """Write every record to ``fp`` as it arrives; returns the bytes
+    written."""
+    size = fp.write(writer.header().encode("utf-8"))
+    async for record in records:
+        size += fp.write(writer.message(record).encode("utf-8"))
+    size += fp.write(writer.footer().encode("utf-8"))
+    return size
+
+
+def gzip_file(source: IO[bytes]) -> IO[bytes]:
+    source.seek(0)
+    compressed = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    with gzip.GzipFile(fileobj=compressed, mode="wb") as output:
+        shutil.copyfileobj(source, output)
+    return compressed
+
+
+async def build_transcript(
+        records: AsyncIterator[Dict[str, Any]], channel_name: str,
+        transcript_format: str,
+        size_limit: int) -> Optional[discord.File]:
+    """A transcript of ``records`` as a file no larger than
+    ``size_limit``, gzipped if it has to be, or None if it cannot fit."""
+    writer = WRITERS[transcript_format](channel_name)
+    filename = f"transcript-{channel_name}.{writer.extension}"
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        size = await write_transcript(records, writer, spooled)
+        if size > size_limit:
+            compressed = await asyncio.to_thread(gzip_file, spooled)
+            spooled.close()
+            spooled = compressed
+            filename += ".gz"
+            if spooled.tell() > size_limit:
+                spooled.close()
+                return None
+    except BaseException:
+        spooled.close()
+        raise
+
+    spooled.seek(0)
+    return discord.File(fp=spooled, filename=filename)
@@ -0,0 +1,138 @@
+"""
+Ticket message log, so exporting a transcript is a local read.
+
+Every message sent in a ticket thread is stored in ticket_messages as the
+record a transcript is written from (see transcript.message_record). An
+edit replaces the record and a delete only marks it, so the transcript
+keeps what was said. Exports read the log a page at a time and only ask
+Discord for messages newer than the last one logged.
+
+Messages sent while the bot was offline are fetched when the cog loads,
+for every open ticket, from the history after each ticket's last logged
+message. Edits and deletes made while offline are not seen.
+
+Tickets created before the log existed are not ``captured`` and are
+exported from the history API as before.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+import discord
+
+from helpers.codec import dumps, loads
+from helpers.database import db
+
+from .ticket_manager import TicketManager
+from .transcript import history_records, message_record
+
+# Log rows read per query while exporting
+PAGE_SIZE: int = 500
+
+
+class TranscriptLog:
+
+    @staticmethod
+    async def append(ticket_id: int, record: Dict[str, Any]) -> None:
+        """Store a message, or replace it after an edit."""
+        query = """
+        INSERT INTO ticket_messages (ticket_id, message_id, record)
+        VALUES ($1, $2, $3)
+        ON CONFLICT (ticket_id, message_id)
+        DO UPDATE SET record = EXCLUDED.record
+        """
+        await db.execute(query, ticket_id, record["id"], dumps(record))
+
+    @staticmethod
+    async def append_many(ticket_id: int,
+                          records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        query = """
+        INSERT INTO ticket_messages (ticket_id, message_id, record)
+        SELECT $1, message_id, record
+        FROM UNNEST($2::BIGINT[], $3::TEXT[]) AS batch(message_id, record)
+        ON CONFLICT (ticket_id, message_id)
+        DO UPDATE SET record = EXCLUDED.record
+        """
+        await db.execute(query, ticket_id,
+                         [record["id"] for record in records],
+                         [dumps(record) for record in records])
+
+    @staticmethod
+    async def mark_deleted(ticket_id: int, message_ids: Iterable[int]) -> None:
+        query = """
+        UPDATE ticket_messages SET deleted = TRUE
+        WHERE ticket_id = $1 AND message_id = ANY($2::BIGINT[])
+        """
+        await db.execute(query, ticket_id, list(message_ids))
+
+    @staticmethod
+    async def last_message_ids() -> Dict[int, Optional[int]]:
+        """Open logged tickets -> the newest message logged for each."""
+        query = """
+        SELECT t.ticket_id, MAX(m.message_id) AS last_id
+        FROM tickets t
+        LEFT JOIN ticket_messages m ON m.ticket_id = t.ticket_id
+        WHERE t.captured AND NOT t.closed
+        GROUP BY t.ticket_id
+        """
+        return {
+            row["ticket_id"]: row["last_id"]
+            for row in await db.fetch(query)
+        }
+
+    @staticmethod
+    async def records(ticket_id: int) -> AsyncIterator[Dict[str, Any]]:
+        """Logged messages, oldest first, with ``deleted`` set on those
+        that were deleted."""
+        query = """
+        SELECT message_id, record, deleted FROM ticket_messages
+        WHERE ticket_id = $1 AND message_id > $2
+        ORDER BY message_id
+        LIMIT $3
+        """
+        last_id = 0
+        while rows := await db.fetch(query, ticket_id, last_id, PAGE_SIZE):
+            for row in rows:
+                record = loads(row["record"])
+                if row["deleted"]:
+                    record["deleted"] = True
+                yield record
+            last_id = rows[-1]["message_id"]
+
+    @classmethod
+    async def catch_up(cls, thread: discord.Thread,
+                       last_id: Optional[int]) -> None:
+        """Log what was sent in ``thread`` after ``last_id``."""
+        after = discord.Object(last_id) if last_id else None
+        records: List[Dict[str, Any]] = []
+        async for message in thread.history(limit=None,
+                                            after=after,
+                                            oldest_first=True):
+            records.append(message_record(message))
+            if len(records) >= PAGE_SIZE:
+                await cls.append_many(thread.id, records)
+                records = []
+        await cls.append_many(thread.id, records)
+
+
+async def ticket_records(
+        channel: discord.Thread) -> AsyncIterator[Dict[str, Any]]:
+    """A ticket's messages for its transcript: from the log where there
+    is one, otherwise from the history API."""
+    ticket = await TicketManager.get_ticket(channel.id)
+    if ticket is None or not ticket.get("captured"):
+        async for record in history_records(channel):
+            yield record
+        return
+
+    last_id = 0
+    async for record in TranscriptLog.records(channel.id):
+        last_id = record["id"]
+        yield record
+    # Anything the log has not seen yet
+    after = discord.Object(last_id) if last_id else None
+    async for message in channel.history(limit=None,
+                                         after=after,
+                                         oldest_first=True):
+        yield message_record(message)
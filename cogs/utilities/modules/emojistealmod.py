@@ -1,5 +1,4 @@
 import discord
-import aiohttp
 import re
 
 
@@ -29,13 +28,12 @@ async def steal_emoji(interaction: discord.Interaction,
 
     await interaction.response.defer(ephemeral=True)
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(emoji_url) as resp:
-            if resp.status != 200:
-                return await interaction.followup.send(
-                    "Failed to fetch the emoji. Make sure it's still available.",
-                    ephemeral=True)
-            emoji_bytes = await resp.read()
+    async with interaction.client.session.get(emoji_url) as resp:
+        if resp.status != 200:
+            return await interaction.followup.send(
+                "Failed to fetch the emoji. Make sure it's still available.",
+                ephemeral=True)
+        emoji_bytes = await resp.read()
 
     try:
 
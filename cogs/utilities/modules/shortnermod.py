@@ -6,20 +6,11 @@ from urllib.parse import urlparse
 from typing import Optional, Dict, Tuple
 
 class URLShortenerCore:
-    def __init__(self, bitly_token: str, rate_limit: int, reset_interval: int) -> None:
+    def __init__(self, session: aiohttp.ClientSession, bitly_token: str, rate_limit: int, reset_interval: int) -> None:
+        self.session = session
         self.bitly_token = bitly_token
         self.rate_limit = rate_limit
         self.reset_interval = reset_interval
-        self.session: Optional[aiohttp.ClientSession] = None
-
-    async def initialize_session(self) -> None:
-        """Initialize the aiohttp session."""
-        self.session = aiohttp.ClientSession()
-
-    async def close_session(self) -> None:
-        """Clean up the aiohttp session."""
-        if self.session:
-            await self.session.close()
 
     @staticmethod
     def is_already_shortened(url: str) -> bool:
@@ -29,9 +20,6 @@ class URLShortenerCore:
 
     async def shorten_url(self, url: str, expire_days: Optional[int] = None) -> Optional[str]:
         """Shortens the provided URL using the Bitly API with an optional expiration time."""
-        if not self.session:
-            await self.initialize_session()
-
         headers = {
             "Authorization": f"Bearer {self.bitly_token}",
             "Content-Type": "application/json",
@@ -3,7 +3,6 @@ from discord import ui
 from discord import app_commands
 from urllib.parse import quote
 import re
-import aiohttp
 
 
 class UrbanDictionarySelect(ui.Select):
@@ -105,13 +104,12 @@ async def search_urban_dictionary(
     if not current:
         return []
 
-    async with aiohttp.ClientSession() as session:
-        url = f"https://api.urbandictionary.com/v0/autocomplete?term={quote(current)}"
-        async with session.get(url) as response:
-            if response.status == 200:
-                data = await response.json()
-                return [
-                    app_commands.Choice(name=result, value=result)
-                    for result in data[:25]  # Discord allows up to 25 choices
-                ]
+    url = f"https://api.urbandictionary.com/v0/autocomplete?term={quote(current)}"
+    async with interaction.client.session.get(url) as response:
+        if response.status == 200:
+            data = await response.json()
+            return [
+                app_commands.Choice(name=result, value=result)
+                for result in data[:25]  # Discord allows up to 25 choices
+            ]
     return []
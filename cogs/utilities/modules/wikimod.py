@@ -8,21 +8,21 @@ from typing import Any, Tuple, List
 class CustomWikipediaAPI:
     BASE_URL = "https://en.wikipedia.org/w/api.php"
 
-    @staticmethod
-    async def search(query: str) -> Tuple[str, str]:
+    def __init__(self, session: aiohttp.ClientSession):
+        self.session = session
+
+    async def search(self, query: str) -> Tuple[str, str]:
         params = {
             "action": "opensearch",
             "search": query,
             "limit": 1,
             "format": "json"
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(CustomWikipediaAPI.BASE_URL, params=params) as response:
-                data = await response.json()
-                return data[1][0] if data[1] else None, data[3][0] if data[3] else None
+        async with self.session.get(CustomWikipediaAPI.BASE_URL, params=params) as response:
+            data = await response.json()
+            return data[1][0] if data[1] else None, data[3][0] if data[3] else None
 
-    @staticmethod
-    async def get_page_info(title: str):
+    async def get_page_info(self, title: str):
         params = {
             "action": "query",
             "prop": "extracts|info|pageimages",
@@ -32,62 +32,56 @@ class CustomWikipediaAPI:
             "titles": title,
             "format": "json"
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(CustomWikipediaAPI.BASE_URL, params=params) as response:
-                data = await response.json()
-                page = next(iter(data['query']['pages'].values()))
+        async with self.session.get(CustomWikipediaAPI.BASE_URL, params=params) as response:
+            data = await response.json()
+            page = next(iter(data['query']['pages'].values()))
 
-                soup = BeautifulSoup(page.get('extract', ''), 'html.parser')
-                summary = soup.get_text()
+            soup = BeautifulSoup(page.get('extract', ''), 'html.parser')
+            summary = soup.get_text()
 
-                return {
-                    'title': page['title'],
-                    'url': page['fullurl'],
-                    'summary': summary,
-                    'image_url': page.get('thumbnail', {}).get('source')
-                }
+            return {
+                'title': page['title'],
+                'url': page['fullurl'],
+                'summary': summary,
+                'image_url': page.get('thumbnail', {}).get('source')
+            }
 
-    @staticmethod
-    async def autocomplete(query: str) -> List[str]:
+    async def autocomplete(self, query: str) -> List[str]:
         params = {
             "action": "opensearch",
             "search": query,
             "limit": 25,
             "format": "json"
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.get(CustomWikipediaAPI.BASE_URL, params=params) as response:
-                data = await response.json()
-                return data[1] if data[1] else []
+        async with self.session.get(CustomWikipediaAPI.BASE_URL, params=params) as response:
+            data = await response.json()
+            return data[1] if data[1] else []
 
 class WikiSearcher(ABC):
-    @staticmethod
     @abstractmethod
-    async def search(query: str) -> Tuple[str, str]:
+    async def search(self, query: str) -> Tuple[str, str]:
         pass
 
-    @staticmethod
     @abstractmethod
-    async def get_page_info(title: str) -> dict[str, Any]:
+    async def get_page_info(self, title: str) -> dict[str, Any]:
         pass
 
-    @staticmethod
     @abstractmethod
-    async def autocomplete(query: str) -> List[str]:
+    async def autocomplete(self, query: str) -> List[str]:
         pass
 
 class WikipediaSearcher(WikiSearcher):
-    @staticmethod
-    async def search(query: str) -> Tuple[str, str]:
-        return await CustomWikipediaAPI.search(query)
+    def __init__(self, session: aiohttp.ClientSession):
+        self.api = CustomWikipediaAPI(session)
 
-    @staticmethod
-    async def get_page_info(title: str) -> dict[str, Any]:
-        return await CustomWikipediaAPI.get_page_info(title)
+    async def search(self, query: str) -> Tuple[str, str]:
+        return await self.api.search(query)
 
-    @staticmethod
-    async def autocomplete(query: str) -> List[str]:
-        return await CustomWikipediaAPI.autocomplete(query)
+    async def get_page_info(self, title: str) -> dict[str, Any]:
+        return await self.api.get_page_info(title)
+
+    async def autocomplete(self, query: str) -> List[str]:
+        return await self.api.autocomplete(query)
 
 class WikiEmbedCreator:
     @staticmethod
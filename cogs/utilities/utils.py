@@ -5,7 +5,7 @@ import discord
 import aiohttp
 import os
 
-from typing import Optional, List
+from typing import Optional, List, Dict
 import typing
 
 from abc import ABC, abstractmethod
@@ -24,12 +24,14 @@ from .modules.shortnermod import URLShortenerCore
 from .modules.emojistealmod import steal_emoji
 
 from helpers.database import db
+from helpers.metrics import register_cache
 
 BITLY_TOKEN = os.getenv("BITLY_API")
 
 user_rate_limits = {}
 RATE_LIMIT = 5
 RESET_INTERVAL = 60 * 60
+DEFAULT_PREFIX = '.'
 
 
 class DatabaseManager(ABC):
@@ -44,14 +46,40 @@ class DatabaseManager(ABC):
 
 
 class PostgreSQLManager(DatabaseManager):
+    """
+    Guild prefixes backed by Postgres with a write-through memory cache.
+
+    Every stored prefix is loaded in one query at startup and kept in sync
+    by set_prefix, so get_prefix never touches the database while messages
+    are being dispatched. Guilds without a row use DEFAULT_PREFIX.
+    """
+
+    def __init__(self) -> None:
+        self.prefixes: Dict[int, str] = {}
+        self.hits: int = 0
+        self.misses: int = 0
+        register_cache('prefixes', self)
 
     async def initialize(self):
         await db.initialize()
+        await self.load_prefixes()
+
+    async def load_prefixes(self) -> None:
+        results = await db.fetch('SELECT guild_id, prefix FROM guild_prefixes')
+        self.prefixes = {
+            record['guild_id']: record['prefix']
+            for record in results
+        }
 
     async def get_prefix(self, guild_id: int) -> str:
-        query = 'SELECT prefix FROM guild_prefixes WHERE guild_id = $1'
-        result = await db.fetch(query, guild_id)
-        return result[0]['prefix'] if result else '.'
+        prefix = self.prefixes.get(guild_id)
+        if prefix is None:
+            # The cache holds every stored prefix, so a miss means the
+            # guild never set one.
+            self.misses += 1
+            return DEFAULT_PREFIX
+        self.hits += 1
+        return prefix
 
     async def set_prefix(self, guild_id: int, prefix: str) -> None:
         query = '''
@@ -60,32 +88,36 @@ class PostgreSQLManager(DatabaseManager):
         ON CONFLICT (guild_id) DO UPDATE SET prefix = $2
         '''
         await db.execute(query, guild_id, prefix)
+        self.prefixes[guild_id] = prefix
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            'size': len(self.prefixes),
+            'hits': self.hits,
+            'misses': self.misses
+        }
 
 
 class Utilities(commands.Cog):
 
     def __init__(self, bot: commands.Bot) -> None:
         self.bot = bot
-        self.session: aiohttp.ClientSession = aiohttp.ClientSession()
-        self.searcher = WikipediaSearcher()
+        self.session: aiohttp.ClientSession = bot.session
+        self.searcher = WikipediaSearcher(self.session)
         self.embed_creator = WikiEmbedCreator()
-        self.url_shortener_core = URLShortenerCore(BITLY_TOKEN or "",
-                                                   RATE_LIMIT, RESET_INTERVAL)
+        self.url_shortener_core = URLShortenerCore(self.session, BITLY_TOKEN
+                                                   or "", RATE_LIMIT,
+                                                   RESET_INTERVAL)
         self.translation_core = TranslationCore()
 
         self.db_manager = PostgreSQLManager()
 
     async def cog_load(self):
         """Initialize resources when the cog is loaded."""
-        await self.url_shortener_core.initialize_session()
-
         await self.db_manager.initialize()
 
     async def cog_unload(self):
         """Cleanup resources when the cog is unloaded."""
-        await self.session.close()
-        await self.url_shortener_core.close_session()
-
         await db.close()
 
     async def wiki_autocomplete(
@@ -364,7 +396,7 @@ class Utilities(commands.Cog):
     async def get_prefix(self, message: discord.Message) -> str:
         if message.guild:
             return await self.db_manager.get_prefix(message.guild.id)
-        return '.'  # Default prefix for DMs
+        return DEFAULT_PREFIX  # Default prefix for DMs
 
     @app_commands.command()
     @app_commands.describe(style="The style to format the datetime with.")
@@ -461,7 +493,7 @@ class Utilities(commands.Cog):
             avatar_url = member.avatar.url if member.avatar else member.default_avatar.url
 
             # Fetch and resize the profile picture
-            async with self.bot.session.get(avatar_url) as response:
+            async with self.session.get(avatar_url) as response:
                 if response.status != 200:
                     await ctx.send("Could not fetch user profile picture.")
                     return
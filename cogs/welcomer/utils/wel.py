@@ -4,7 +4,8 @@ import io
 import aiohttp
 from urllib.parse import urlparse
 
-async def get_welcome_card(member: discord.Member):
+async def get_welcome_card(member: discord.Member,
+                           session: aiohttp.ClientSession):
     # Create a new image with a size of 1045x450 pixels
     card = Image.new('RGB', (1045, 450), color='#2f3136')
     draw = ImageDraw.Draw(card)
@@ -20,7 +21,7 @@ async def get_welcome_card(member: discord.Member):
     # Download and paste avatar
     avatar_size = 210
     avatar_position = ((1045 - avatar_size) // 2, 45)
-    avatar_image = await download_avatar(str(member.display_avatar.url), avatar_size)
+    avatar_image = await download_avatar(session, str(member.display_avatar.url), avatar_size)
     card.paste(avatar_image, avatar_position, avatar_image)
 
     # Add member name
@@ -50,24 +51,23 @@ async def get_welcome_card(member: discord.Member):
 
     return img_byte_arr
 
-async def download_avatar(url: str, size: int):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as resp:
-            if resp.status == 200:
-                data = await resp.read()
-                avatar = Image.open(io.BytesIO(data))
-                avatar = avatar.convert("RGBA")
-                avatar = avatar.resize((size, size), Image.LANCZOS)
+async def download_avatar(session: aiohttp.ClientSession, url: str, size: int):
+    async with session.get(url) as resp:
+        if resp.status == 200:
+            data = await resp.read()
+            avatar = Image.open(io.BytesIO(data))
+            avatar = avatar.convert("RGBA")
+            avatar = avatar.resize((size, size), Image.LANCZOS)
 
-                # Create a circular mask
-                mask = Image.new('L', (size, size), 0)
-                draw = ImageDraw.Draw(mask)
-                draw.ellipse((0, 0, size, size), fill=255)
+            # Create a circular mask
+            mask = Image.new('L', (size, size), 0)
+            draw = ImageDraw.Draw(mask)
+            draw.ellipse((0, 0, size, size), fill=255)
 
-                # Apply the mask to the avatar
-                output = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-                output.paste(avatar, (0, 0), mask)
-                return output
-            else:
-                # Return a default avatar or placeholder if download fails
-                return Image.new('RGBA', (size, size), (128, 128, 128, 255))
\ No newline at end of file
+            # Apply the mask to the avatar
+            output = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+            output.paste(avatar, (0, 0), mask)
+            return output
+        else:
+            # Return a default avatar or placeholder if download fails
+            return Image.new('RGBA', (size, size), (128, 128, 128, 255))
\ No newline at end of file
@@ -4,7 +4,7 @@ from discord import app_commands
 
 from .utils.wel import get_welcome_card
 
-from helpers.database import Database
+from helpers.database import db
 
 
 class WelcomeModal(discord.ui.Modal, title="Set Welcome Message"):
@@ -114,7 +114,7 @@ class Welcome(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = Database()
+        self.db = db
         self.valid_placeholders = {
             "user", "username", "userid", "server", "membercount", "joindate",
             "servercreation"
@@ -372,7 +372,7 @@ class Welcome(commands.Cog):
             return False
 
         try:
-            welcome_card = await get_welcome_card(member)
+            welcome_card = await get_welcome_card(member, self.bot.session)
         except Exception:
             welcome_card = None
 
@@ -382,7 +382,8 @@ class Welcome(commands.Cog):
             "userid": member.id,
             "server": member.guild.name,
             "membercount": member.guild.member_count,
-            "joindate": member.joined_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "joindate": (member.joined_at or discord.utils.utcnow()).strftime(
+                "%Y-%m-%d %H:%M:%S"),
             "servercreation":
             member.guild.created_at.strftime("%Y-%m-%d %H:%M:%S")
         }
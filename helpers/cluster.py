@@ -0,0 +1,468 @@
+"""
+Shard Clusters for Discord.py Bot
+---------------------------------
+
+Runs the bot as several worker processes ("clusters"), each owning a
+contiguous range of shard IDs, so gateway traffic and CPU-bound work are
+spread over cores instead of one event loop.
+
+Launching ``main.py`` with ``CLUSTER_COUNT`` > 1 starts the launcher. It
+works out the shard count, starts one worker per cluster (``main.py``
+again, with ``CLUSTER_ID``/``CLUSTER_SHARDS``/``SHARD_COUNT`` set),
+restarts workers that crash, and hosts a unix-socket IPC hub. A worker
+that exits cleanly is not restarted; one that keeps crashing soon after
+starting is restarted with a growing delay, and given up on after
+MAX_FAST_FAILURES crashes in a row.
+
+Workers connect to the hub and can ask every cluster for data. The hub
+forwards the query to every worker, waits for the replies and sends
+them back together:
+
+   worker  -> hub     {"op": "request", "id": 1, "type": "stats"}
+   hub     -> each    {"op": "query", "id": 7, "type": "stats"}
+   each    -> hub     {"op": "reply", "id": 7, "data": {...}}
+   hub     -> worker  {"op": "response", "id": 1, "data": [{...}, ...]}
+
+Shards also ask the hub before they identify, so clusters starting
+together stay within Discord's identify limit: one identify per rate
+limit bucket (shard ID modulo max_concurrency) every IDENTIFY_INTERVAL
+seconds, over all clusters:
+
+   worker  -> hub     {"op": "identify", "id": 2, "shard": 5}
+   hub     -> worker  {"op": "response", "id": 2, "data": null}
+
+Messages are newline-delimited JSON. A worker that loses the hub keeps
+trying to reconnect, and identifies on its own timing meanwhile.
+
+Environment:
+   CLUSTER_COUNT   number of worker processes (default 1: no clusters)
+   SHARD_COUNT     total shards (default: Discord's recommendation; when
+                   set, identifies are also spaced as if max_concurrency
+                   were 1)
+   IPC_SOCKET      unix socket path for the hub
+
+How to Use:
+1. In main(), run the launcher or a worker:
+   cluster = ClusterConfig.from_env()
+   if cluster.is_launcher:
+       await ClusterLauncher(token, cluster).run()
+
+2. In a worker, answer queries and ask other clusters:
+   self.ipc = ClusterIPCClient(cluster.cluster_id, cluster.ipc_path)
+   self.ipc.handlers['stats'] = self.local_stats
+   await self.ipc.connect()
+   results = await self.ipc.request('stats')
+
+3. In a worker, wait for the hub before each identify:
+   async def before_identify_hook(self, shard_id, *, initial=False):
+       await self.ipc.identify(shard_id)
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+from loguru import logger
+
+from helpers.codec import dumps_bytes, loads
+
+DEFAULT_IPC_SOCKET: str = '/tmp/nira-cluster.sock'
+# Seconds to wait for every cluster to answer a query
+IPC_TIMEOUT: float = 5.0
+# Seconds before a crashed worker is started again; doubled after every
+# crash that follows a short run, up to RESTART_MAX_DELAY
+RESTART_DELAY: float = 5.0
+RESTART_MAX_DELAY: float = 300.0
+# A worker that crashes within this many seconds of starting failed fast
+STABLE_RUN_TIME: float = 60.0
+# Fast failures in a row after which a cluster is not restarted again
+MAX_FAST_FAILURES: int = 5
+# Seconds between identifies in one rate limit bucket
+IDENTIFY_INTERVAL: float = 5.0
+# Seconds before a worker retries the hub; doubled up to the max
+RECONNECT_DELAY: float = 1.0
+RECONNECT_MAX_DELAY: float = 30.0
+_READ_LIMIT: int = 2**20
+
+
+@dataclass
+class ClusterConfig:
+    cluster_count: int = 1
+    cluster_id: Optional[int] = None
+    shard_ids: Optional[List[int]] = None
+    shard_count: Optional[int] = None
+    ipc_path: str = DEFAULT_IPC_SOCKET
+
+    @classmethod
+    def from_env(cls) -> 'ClusterConfig':
+        cluster_id = os.getenv('CLUSTER_ID')
+        shards = os.getenv('CLUSTER_SHARDS')
+        shard_count = os.getenv('SHARD_COUNT')
+        return cls(
+            cluster_count=int(os.getenv('CLUSTER_COUNT', '1')),
+            cluster_id=int(cluster_id) if cluster_id is not None else None,
+            shard_ids=[int(shard) for shard in shards.split(',')]
+            if shards else None,
+            shard_count=int(shard_count) if shard_count else None,
+            ipc_path=os.getenv('IPC_SOCKET', DEFAULT_IPC_SOCKET))
+
+    @property
+    def is_launcher(self) -> bool:
+        return self.cluster_id is None and self.cluster_count > 1
+
+    @property
+    def is_worker(self) -> bool:
+        return self.cluster_id is not None
+
+
+def shard_ranges(shard_count: int, cluster_count: int) -> List[List[int]]:
+    """Split shard IDs into contiguous, near-equal ranges, one per cluster."""
+    per_cluster, extra = divmod(shard_count, cluster_count)
+    ranges: List[List[int]] = []
+    start = 0
+    for index in range(cluster_count):
+        size = per_cluster + (1 if index < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return [shards for shards in ranges if shards]
+
+
+async def fetch_recommended_shards(token: str) -> Tuple[int, int]:
+    """Discord's recommended shard count and identify max_concurrency."""
+    async with aiohttp.ClientSession() as session:
+        async with session.get(
+                'https://discord.com/api/v10/gateway/bot',
+                headers={'Authorization': f'Bot {token}'}) as response:
+            response.raise_for_status()
+            data = await response.json()
+    return int(data['shards']), int(
+        data['session_start_limit']['max_concurrency'])
+
+
+async def _send(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+    writer.write(dumps_bytes(message) + b'\n')
+    await writer.drain()
+
+
+class IdentifyGate:
+    """Spaces identifies IDENTIFY_INTERVAL apart in each rate limit bucket,
+    one shard at a time per bucket."""
+
+    def __init__(self, max_concurrency: int = 1) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._last: Dict[int, float] = {}
+
+    async def wait(self, shard_id: int) -> None:
+        bucket = shard_id % self.max_concurrency
+        loop = asyncio.get_running_loop()
+        async with self._locks.setdefault(bucket, asyncio.Lock()):
+            last = self._last.get(bucket)
+            if last is not None:
+                await asyncio.sleep(last + IDENTIFY_INTERVAL - loop.time())
+            self._last[bucket] = loop.time()
+
+
+class ClusterIPCServer:
+    """The hub: relays queries between workers and gates identifies."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.clients: Dict[int, asyncio.StreamWriter] = {}
+        self.identify_gate = IdentifyGate()
+        self._ids = itertools.count(1)
+        # Query id -> cluster id -> future for that cluster's reply
+        self._pending: Dict[int, Dict[int, asyncio.Future]] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle,
+                                                       self.path,
+                                                       limit=_READ_LIMIT)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for writer in self.clients.values():
+            writer.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        cluster_id: Optional[int] = None
+        try:
+            while line := await reader.readline():
+                message = loads(line)
+                op = message.get('op')
+                if op == 'register':
+                    cluster_id = int(message['cluster'])
+                    self.clients[cluster_id] = writer
+                    logger.info(f"Cluster {cluster_id} connected to IPC")
+                elif op == 'request':
+                    asyncio.create_task(self._relay(writer, message))
+                elif op == 'identify':
+                    asyncio.create_task(self._grant_identify(writer, message))
+                elif op == 'reply' and cluster_id is not None:
+                    future = self._pending.get(message['id'],
+                                               {}).get(cluster_id)
+                    if future is not None and not future.done():
+                        future.set_result(message.get('data'))
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"IPC connection of cluster {cluster_id} failed: {e}")
+        finally:
+            if cluster_id is not None and self.clients.get(
+                    cluster_id) is writer:
+                del self.clients[cluster_id]
+            writer.close()
+
+    async def _relay(self, origin: asyncio.StreamWriter,
+                     request: Dict[str, Any]) -> None:
+        query_id = next(self._ids)
+        loop = asyncio.get_running_loop()
+        futures = {cluster: loop.create_future() for cluster in self.clients}
+        self._pending[query_id] = futures
+
+        for cluster, writer in list(self.clients.items()):
+            try:
+                await _send(writer, {
+                    'op': 'query',
+                    'id': query_id,
+                    'type': request['type']
+                })
+            except ConnectionError:
+                futures[cluster].cancel()
+
+        if futures:
+            await asyncio.wait(futures.values(), timeout=IPC_TIMEOUT)
+        del self._pending[query_id]
+
+        # Clusters that did not answer in time are left out
+        results = [{
+            'cluster': cluster,
+            'data': future.result()
+        } for cluster, future in sorted(futures.items())
+                   if future.done() and not future.cancelled()]
+        try:
+            await _send(origin, {
+                'op': 'response',
+                'id': request['id'],
+                'data': results
+            })
+        except ConnectionError:
+            pass
+
+    async def _grant_identify(self, origin: asyncio.StreamWriter,
+                              request: Dict[str, Any]) -> None:
+        await self.identify_gate.wait(int(request['shard']))
+        try:
+            await _send(origin, {
+                'op': 'response',
+                'id': request['id'],
+                'data': None
+            })
+        except ConnectionError:
+            pass
+
+
+class ClusterIPCClient:
+    """A worker's connection to the hub, reconnected whenever it drops."""
+
+    def __init__(self, cluster_id: int, path: str) -> None:
+        self.cluster_id = cluster_id
+        self.path = path
+        # Query type -> coroutine returning this cluster's JSON-able answer
+        self.handlers: Dict[str, Callable[[], Awaitable[Any]]] = {}
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        """Connect to the hub; from then on, a lost connection is retried
+        in the background until close()."""
+        reader = await self._open()
+        self._reader_task = asyncio.create_task(self._run(reader))
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def request(self,
+                      kind: str,
+                      timeout: float = IPC_TIMEOUT * 2
+                      ) -> List[Dict[str, Any]]:
+        """Ask every cluster; returns ``[{'cluster': id, 'data': ...}]``."""
+        return await self._call({'op': 'request', 'type': kind}, timeout) or []
+
+    async def identify(self, shard_id: int) -> None:
+        """Wait until the hub lets ``shard_id`` identify."""
+        # Shards of every cluster may be queued ahead, so no timeout; a
+        # lost hub fails the wait with ConnectionError
+        await self._call({'op': 'identify', 'shard': shard_id}, None)
+
+    async def _call(self, message: Dict[str, Any],
+                    timeout: Optional[float]) -> Any:
+        if not self.connected:
+            raise ConnectionError("Not connected to the cluster IPC hub")
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await _send(self._writer, dict(message, id=request_id))
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _open(self) -> asyncio.StreamReader:
+        reader, self._writer = await asyncio.open_unix_connection(
+            self.path, limit=_READ_LIMIT)
+        await _send(self._writer, {
+            'op': 'register',
+            'cluster': self.cluster_id
+        })
+        return reader
+
+    async def _run(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            await self._read(reader)
+            logger.warning(
+                "Lost connection to the cluster IPC hub; reconnecting")
+            delay = RECONNECT_DELAY
+            while True:
+                await asyncio.sleep(delay)
+                try:
+                    reader = await self._open()
+                    break
+                except OSError:
+                    delay = min(delay * 2, RECONNECT_MAX_DELAY)
+            logger.info("Reconnected to the cluster IPC hub")
+
+    async def _answer(self, query: Dict[str, Any]) -> None:
+        handler = self.handlers.get(query['type'])
+        data = None
+        if handler is not None:
+            try:
+                data = await handler()
+            except Exception:
+                logger.exception(f"IPC handler {query['type']} failed")
+        if self.connected:
+            await _send(self._writer, {
+                'op': 'reply',
+                'id': query['id'],
+                'data': data
+            })
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                message = loads(line)
+                if message.get('op') == 'query':
+                    asyncio.create_task(self._answer(message))
+                elif message.get('op') == 'response':
+                    future = self._pending.get(message['id'])
+                    if future is not None and not future.done():
+                        future.set_result(message.get('data'))
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Cluster IPC connection failed: {e}")
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(
+                        ConnectionError("Cluster IPC hub disconnected"))
+
+
+class ClusterLauncher:
+    """Starts and supervises one worker process per cluster."""
+
+    def __init__(self, token: str, config: ClusterConfig) -> None:
+        self.token = token
+        self.config = config
+        self.server = ClusterIPCServer(config.ipc_path)
+        self.processes: Dict[int, asyncio.subprocess.Process] = {}
+        self._stopping = False
+
+    async def run(self) -> None:
+        shard_count, max_concurrency = self.config.shard_count, 1
+        if shard_count is None:
+            shard_count, max_concurrency = await fetch_recommended_shards(
+                self.token)
+        ranges = shard_ranges(shard_count, self.config.cluster_count)
+        logger.info(
+            f"Launching {len(ranges)} clusters for {shard_count} shards")
+
+        self.server.identify_gate = IdentifyGate(max_concurrency)
+        await self.server.start()
+        try:
+            await asyncio.gather(*(self._supervise(cluster_id, shards,
+                                                   shard_count)
+                                   for cluster_id, shards in enumerate(ranges)))
+        finally:
+            self._stopping = True
+            for process in self.processes.values():
+                if process.returncode is None:
+                    process.terminate()
+            await asyncio.gather(*(process.wait()
+                                   for process in self.processes.values()),
+                                 return_exceptions=True)
+            await self.server.close()
+
+    async def _supervise(self, cluster_id: int, shards: List[int],
+                         shard_count: int) -> None:
+        env = dict(os.environ,
+                   CLUSTER_ID=str(cluster_id),
+                   CLUSTER_SHARDS=','.join(map(str, shards)),
+                   SHARD_COUNT=str(shard_count),
+                   IPC_SOCKET=self.config.ipc_path)
+        loop = asyncio.get_running_loop()
+        delay = RESTART_DELAY
+        fast_failures = 0
+        while not self._stopping:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, os.path.abspath(sys.argv[0]), env=env)
+            self.processes[cluster_id] = process
+            started = loop.time()
+            logger.info(
+                f"Cluster {cluster_id} started (pid {process.pid}, shards {shards[0]}-{shards[-1]})"
+            )
+
+            returncode = await process.wait()
+            if self._stopping:
+                break
+            if returncode == 0:
+                logger.info(f"Cluster {cluster_id} stopped")
+                break
+
+            if loop.time() - started < STABLE_RUN_TIME:
+                fast_failures += 1
+            else:
+                fast_failures, delay = 0, RESTART_DELAY
+            if fast_failures >= MAX_FAST_FAILURES:
+                logger.critical(
+                    f"Cluster {cluster_id} crashed {fast_failures} times in a row within {STABLE_RUN_TIME:.0f}s of starting (last exit code {returncode}); giving up"
+                )
+                break
+            logger.error(
+                f"Cluster {cluster_id} exited with code {returncode}; restarting in {delay:.0f}s"
+            )
+            await asyncio.sleep(delay)
+            if fast_failures:
+                delay = min(delay * 2, RESTART_MAX_DELAY)
@@ -0,0 +1,82 @@
+"""
+JSON Codec for Discord.py Bot
+-----------------------------
+
+orjson-backed replacements for ``json.loads``/``json.dumps``, used by the
+shared HTTP client for every request body and API response, and by any
+cog that handles JSON itself.
+
+The shared session is created with ``json_serialize=dumps`` and
+``response_class=JSONResponse``, so ``session.post(url, json=...)`` and
+``await response.json()`` in cogs already go through orjson without any
+change at the call site.
+
+How to Use:
+1. Decode and encode directly:
+   from helpers.codec import loads, dumps, JSONDecodeError
+   data = loads(text_or_bytes)
+   text = dumps(data, pretty=True)
+
+2. API responses from bot.session decode with orjson automatically:
+   async with bot.session.get(url) as response:
+       data = await response.json()
+"""
+
+from typing import Any, Callable, Optional
+
+import aiohttp
+import orjson
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so existing
+# ``except json.JSONDecodeError`` handlers keep working.
+JSONDecodeError = orjson.JSONDecodeError
+
+
+def loads(data: str | bytes | bytearray | memoryview) -> Any:
+    return orjson.loads(data)
+
+
+def dumps(obj: Any, *, pretty: bool = False) -> str:
+    """Encode to a str, as ``json.dumps`` does. Non-ASCII characters are
+    kept as-is and ``pretty`` indents by two spaces."""
+    return dumps_bytes(obj, pretty=pretty).decode('utf-8')
+
+
+def dumps_bytes(obj: Any, *, pretty: bool = False) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, option=option)
+
+
+class JSONResponse(aiohttp.ClientResponse):
+    """ClientResponse whose json() decodes with orjson."""
+
+    async def json(self,
+                   *,
+                   loads: Optional[Callable[[str], Any]] = None,
+                   content_type: Optional[str] = 'application/json',
+                   encoding: Optional[str] = None) -> Any:
+        # Decode the raw bytes directly instead of aiohttp's text round
+        # trip, unless the caller asked for a specific decoder or charset.
+        if loads is not None or encoding is not None:
+            return await super().json(loads=loads or orjson.loads,
+                                      content_type=content_type,
+                                      encoding=encoding)
+
+        body = await self.read()
+        if not body.strip():
+            return None
+        if content_type:
+            response_type = self.headers.get(aiohttp.hdrs.CONTENT_TYPE,
+                                             '').lower()
+            if not (content_type in response_type
+                    or 'json' in response_type):
+                raise aiohttp.ContentTypeError(
+                    self.request_info,
+                    self.history,
+                    status=self.status,
+                    message=
+                    f"Attempt to decode JSON with unexpected mimetype: {response_type}",
+                    headers=self.headers)
+        return orjson.loads(body)
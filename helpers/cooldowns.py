@@ -0,0 +1,112 @@
+"""
+Cooldown Store for Discord.py Bot
+---------------------------------
+
+A per-key cooldown tracker for hot paths (every message, every button
+click) that cleans up after itself.
+
+Entries live in two generations. New hits go into the current one; once
+the longest cooldown seen has passed, the current generation becomes the
+previous one and the old previous generation is dropped whole. Every
+dropped entry is older than any cooldown it could still be enforcing, so
+checks stay exact, memory is bounded by the keys active in the last two
+cooldown periods, and no cleanup task or scan is needed.
+
+Every store is registered by name so the health server can report sizes.
+
+How to Use:
+1. Create one per feature:
+   self.cooldowns = CooldownStore('leveling')
+
+2. Check and start a cooldown in one step:
+   if self.cooldowns.hit((guild_id, user_id), 60):
+       return  # still cooling down
+
+3. Or check first and start it only once the action succeeded:
+   if self.cooldowns.retry_after(key, 5):
+       return
+   ...
+   self.cooldowns.set(key, 5)
+"""
+
+import time
+import weakref
+from typing import Dict, Hashable, Optional
+
+_stores: 'weakref.WeakSet[CooldownStore]' = weakref.WeakSet()
+
+
+def cooldown_sizes() -> Dict[str, int]:
+    """Entries held by each live store, by name."""
+    sizes: Dict[str, int] = {}
+    for store in list(_stores):
+        sizes[store.name] = sizes.get(store.name, 0) + len(store)
+    return sizes
+
+
+class CooldownStore:
+
+    def __init__(self, name: str, horizon: float = 0.0) -> None:
+        self.name = name
+        # Longest cooldown seen; a generation is retired after this long
+        self.horizon = horizon
+        # key -> time (time.monotonic()) the cooldown ends
+        self._current: Dict[Hashable, float] = {}
+        self._previous: Dict[Hashable, float] = {}
+        self._rotated_at: float = time.monotonic()
+        _stores.add(self)
+
+    def __len__(self) -> int:
+        return len(self._current) + len(self._previous)
+
+    def _rotate(self, now: float) -> None:
+        if now - self._rotated_at < self.horizon:
+            return
+        # Everything in the previous generation was set before the last
+        # rotation, at least one horizon ago, so it has expired.
+        self._previous = self._current
+        self._current = {}
+        self._rotated_at = now
+
+    def retry_after(self,
+                    key: Hashable,
+                    cooldown: float,
+                    now: Optional[float] = None) -> float:
+        """Seconds left on ``key``'s cooldown, or 0.0 if it is ready."""
+        now = time.monotonic() if now is None else now
+        self.horizon = max(self.horizon, cooldown)
+        self._rotate(now)
+        ends = self._current.get(key)
+        if ends is None:
+            ends = self._previous.get(key)
+        return max(ends - now, 0.0) if ends is not None else 0.0
+
+    def set(self,
+            key: Hashable,
+            cooldown: float,
+            now: Optional[float] = None) -> None:
+        """Start ``key``'s cooldown now."""
+        now = time.monotonic() if now is None else now
+        self.horizon = max(self.horizon, cooldown)
+        self._rotate(now)
+        self._previous.pop(key, None)
+        self._current[key] = now + cooldown
+
+    def hit(self,
+            key: Hashable,
+            cooldown: float,
+            now: Optional[float] = None) -> float:
+        """Start ``key``'s cooldown unless it is already running.
+
+        Returns the seconds left if it was (and leaves it alone), or 0.0
+        if the cooldown was started."""
+        now = time.monotonic() if now is None else now
+        remaining = self.retry_after(key, cooldown, now)
+        if remaining:
+            return remaining
+        self.set(key, cooldown, now)
+        return 0.0
+
+    def reset(self, key: Hashable) -> None:
+        self._current.pop(key, None)
+        self._previous.pop(key, None)
@@ -1,27 +1,102 @@
+import asyncio
 import asyncpg
 import os
-from typing import Optional, List, Any
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional, List, Any, AsyncIterator
+
+from helpers.metrics import add_phase_time
 
 DATABASE_URL: Optional[str] = os.getenv('DATABASE_URL')
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set.")
 
+# Pool configuration, overridable through the environment
+POOL_MIN_SIZE: int = int(os.getenv('DB_POOL_MIN_SIZE', '1'))
+POOL_MAX_SIZE: int = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+STATEMENT_CACHE_SIZE: int = int(os.getenv('DB_STATEMENT_CACHE_SIZE', '100'))
+
+
+@dataclass
+class PoolStats:
+    acquisitions: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.acquisitions if self.acquisitions else 0.0
+
+    def record_wait(self, wait: float) -> None:
+        self.acquisitions += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
 
 class Database:
+    """
+    Shared asyncpg pool with reference-counted lifecycle.
+
+    Every user (usually a cog) calls initialize() once when it starts and
+    close() once when it stops. The pool is created by the first
+    initialize() and only closed when the last reference is released, so
+    reloading one cog never breaks the queries of the others.
+    """
 
     def __init__(self) -> None:
         self.pool: Optional[asyncpg.Pool] = None
+        self.refs: int = 0
+        self.stats: PoolStats = PoolStats()
+        self._lock: asyncio.Lock = asyncio.Lock()
 
     async def initialize(self) -> None:
+        """Take a reference to the shared pool, creating it if needed."""
+        async with self._lock:
+            if self.pool is None:
+                try:
+                    # Initialize the connection pool
+                    self.pool = await asyncpg.create_pool(
+                        dsn=DATABASE_URL,
+                        min_size=POOL_MIN_SIZE,
+                        max_size=POOL_MAX_SIZE,
+                        statement_cache_size=STATEMENT_CACHE_SIZE)
+                    await self.create_tables()
+                except Exception as e:
+                    print(f"Error initializing database pool: {e}")
+                    if self.pool is not None:
+                        await self.pool.close()
+                        self.pool = None
+                    raise
+            self.refs += 1
+
+    @property
+    def size(self) -> int:
+        return self.pool.get_size() if self.pool else 0
+
+    @property
+    def idle_size(self) -> int:
+        return self.pool.get_idle_size() if self.pool else 0
+
+    @property
+    def max_size(self) -> int:
+        return self.pool.get_max_size() if self.pool else POOL_MAX_SIZE
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a pooled connection, recording how long the wait took.
+
+        The time until the connection is released counts as database time
+        for the command running in this task."""
+        if self.pool is None:
+            raise ValueError("Database pool is not initialized")
+        start = time.perf_counter()
         try:
-            # Initialize the connection pool
-            self.pool = await asyncpg.create_pool(dsn=DATABASE_URL,
-                                                  min_size=1,
-                                                  max_size=10)
-            await self.create_tables()
-        except Exception as e:
-            print(f"Error initializing database pool: {e}")
-            raise
+            async with self.pool.acquire() as conn:
+                self.stats.record_wait(time.perf_counter() - start)
+                yield conn
+        finally:
+            add_phase_time('db', time.perf_counter() - start)
 
     async def create_tables(self) -> None:
         create_guild_prefixes_table: str = """
@@ -84,11 +159,22 @@ class Database:
             ticket_creator BIGINT NOT NULL,
             closed BOOLEAN DEFAULT FALSE
         );
+        ALTER TABLE tickets ADD COLUMN IF NOT EXISTS captured BOOLEAN DEFAULT FALSE;
+        """
+
+        create_ticket_messages_table: str = """
+        CREATE TABLE IF NOT EXISTS ticket_messages(
+            ticket_id BIGINT REFERENCES tickets(ticket_id) ON DELETE CASCADE,
+            message_id BIGINT NOT NULL,
+            record TEXT NOT NULL,
+            deleted BOOLEAN DEFAULT FALSE,
+            PRIMARY KEY (ticket_id, message_id)
+        );
         """
         try:
             if self.pool is None:
                 raise ValueError("Database pool is not initialized")
-            async with self.pool.acquire() as conn:
+            async with self.acquire() as conn:
                 async with conn.transaction():
                     await conn.execute(create_guild_prefixes_table)
                     await conn.execute(create_reaction_roles_table)
@@ -97,6 +183,7 @@ class Database:
                     await conn.execute(create_player_stats_table)
                     await conn.execute(create_ticket_panels_table)
                     await conn.execute(create_tickets_table)
+                    await conn.execute(create_ticket_messages_table)
         except asyncpg.UniqueViolationError as e:
             print(f"Unique violation error while creating tables: {e}")
             raise
@@ -108,10 +195,8 @@ class Database:
             raise
 
     async def execute(self, query: str, *params: Any) -> None:
-        if self.pool is None:
-            raise ValueError("Database pool is not initialized")
         try:
-            async with self.pool.acquire() as conn:
+            async with self.acquire() as conn:
                 async with conn.transaction():
                     await conn.execute(query, *params)
         except asyncpg.UniqueViolationError as e:
@@ -122,18 +207,21 @@ class Database:
             raise
 
     async def fetch(self, query: str, *params: Any) -> List[asyncpg.Record]:
-        if self.pool is None:
-            raise ValueError("Database pool is not initialized")
         try:
-            async with self.pool.acquire() as conn:
+            async with self.acquire() as conn:
                 return await conn.fetch(query, *params)
         except Exception as e:
             print(f"Error fetching data: {e}")
             raise
 
     async def close(self) -> None:
-        if self.pool:
-            await self.pool.close()
+        """Release a reference; the pool closes with the last one."""
+        async with self._lock:
+            if self.refs > 0:
+                self.refs -= 1
+            if self.refs == 0 and self.pool is not None:
+                await self.pool.close()
+                self.pool = None
 
 
 # Instantiate a global database object
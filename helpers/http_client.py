@@ -0,0 +1,126 @@
+"""
+Shared HTTP Client for Discord.py Bot
+-------------------------------------
+
+One pooled aiohttp session for every cog, instead of a ClientSession per
+cog or per request. Connections are kept alive and reused, DNS lookups
+are cached, every request gets a default timeout, JSON bodies and
+responses go through orjson (see helpers.codec), and per-host request
+metrics are collected through aiohttp's tracing hooks.
+
+How to Use:
+1. Start it in setup_hook:
+   self.http_client = HTTPClient()
+   self.session = self.http_client.session
+
+2. Use the shared session in cogs (never close it there):
+   self.session = bot.session
+   async with self.session.get(url) as response:
+       ...
+
+3. Close it with the bot:
+   await self.http_client.close()
+"""
+
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+import aiohttp
+
+from helpers.codec import JSONResponse, dumps
+from helpers.metrics import add_phase_time
+
+# Pool and timeout defaults, tuned for a handful of third-party APIs
+TOTAL_CONNECTION_LIMIT: int = 100
+PER_HOST_CONNECTION_LIMIT: int = 10
+KEEPALIVE_TIMEOUT: float = 30.0
+DNS_CACHE_TTL: int = 300
+DEFAULT_TIMEOUT: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=30,
+                                                               connect=10)
+
+
+@dataclass
+class HostStats:
+    requests: int = 0
+    failures: int = 0
+    in_flight: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+    @property
+    def average_time(self) -> float:
+        completed = self.requests - self.in_flight
+        return self.total_time / completed if completed > 0 else 0.0
+
+
+class HTTPClient:
+
+    def __init__(self,
+                 *,
+                 limit: int = TOTAL_CONNECTION_LIMIT,
+                 limit_per_host: int = PER_HOST_CONNECTION_LIMIT,
+                 timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT) -> None:
+        self.stats: Dict[str, HostStats] = {}
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_end)
+        trace_config.on_request_exception.append(self._on_request_exception)
+
+        connector = aiohttp.TCPConnector(limit=limit,
+                                         limit_per_host=limit_per_host,
+                                         keepalive_timeout=KEEPALIVE_TIMEOUT,
+                                         ttl_dns_cache=DNS_CACHE_TTL)
+        self.session: aiohttp.ClientSession = aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            trace_configs=[trace_config],
+            json_serialize=dumps,
+            response_class=JSONResponse)
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    async def close(self) -> None:
+        if not self.session.closed:
+            await self.session.close()
+
+    def _host_stats(self, url: Optional[str]) -> HostStats:
+        host = url or "unknown"
+        stats = self.stats.get(host)
+        if stats is None:
+            stats = self.stats[host] = HostStats()
+        return stats
+
+    async def _on_request_start(self, session: aiohttp.ClientSession,
+                                ctx: SimpleNamespace,
+                                params: aiohttp.TraceRequestStartParams) -> None:
+        ctx.start = time.perf_counter()
+        stats = self._host_stats(params.url.host)
+        stats.requests += 1
+        stats.in_flight += 1
+
+    def _finish(self, ctx: SimpleNamespace, host: Optional[str],
+                failed: bool) -> None:
+        elapsed = time.perf_counter() - getattr(ctx, 'start',
+                                                time.perf_counter())
+        add_phase_time('http', elapsed)
+        stats = self._host_stats(host)
+        stats.in_flight = max(stats.in_flight - 1, 0)
+        stats.total_time += elapsed
+        stats.max_time = max(stats.max_time, elapsed)
+        if failed:
+            stats.failures += 1
+
+    async def _on_request_end(self, session: aiohttp.ClientSession,
+                              ctx: SimpleNamespace,
+                              params: aiohttp.TraceRequestEndParams) -> None:
+        self._finish(ctx, params.url.host, params.response.status >= 500)
+
+    async def _on_request_exception(
+            self, session: aiohttp.ClientSession, ctx: SimpleNamespace,
+            params: aiohttp.TraceRequestExceptionParams) -> None:
+        self._finish(ctx, params.url.host, True)
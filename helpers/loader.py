@@ -0,0 +1,324 @@
+"""
+Extension Loader for Discord.py Bot
+-----------------------------------
+
+Loads every cog extension exactly once and concurrently, then logs a
+per-extension timing report.
+
+Each extension is imported by ``load_extension`` (imports are synchronous,
+so they still run one after another), but the ``cog_load`` coroutines of
+independent cogs overlap instead of waiting on each other. An extension's
+import time runs from the start of its load to its first ``add_cog``:
+module execution and ``setup()`` up to that point are synchronous, so no
+other extension's work can land in between.
+
+Lazy extensions are not imported at startup. Stubs with the real names,
+help texts and parameters are registered for their commands instead,
+under a placeholder cog named like the real one, so help and the command
+tree list them as usual. The first prefix or slash invocation loads the
+real extension and re-dispatches to it; a tree sync loads them all first.
+
+How to Use:
+1. Initialize in Bot class:
+   self.extension_loader = ExtensionLoader(self)
+
+2. Route add_cog through the loader so cog_load is timed:
+   async def add_cog(self, cog, /, **kwargs):
+       async with self.extension_loader.track_cog_load():
+           await super().add_cog(cog, **kwargs)
+
+3. Call in setup_hook:
+   await self.extension_loader.load_all(get_extensions(),
+                                        lazy=get_lazy_extensions())
+
+4. Activate lazy extensions for slash commands in the command tree:
+   async def interaction_check(self, interaction):
+       return await self.client.extension_loader.activate_for_interaction(
+           interaction)
+"""
+
+import asyncio
+import inspect
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import (Any, AsyncIterator, Dict, Iterable, List, Optional,
+                    Tuple, Union)
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+from loguru import logger
+
+from cogs import get_command_names
+
+
+@dataclass
+class ExtensionTiming:
+    name: str
+    started: float = 0.0
+    total_time: float = 0.0
+    # Module execution and setup() until its first add_cog
+    import_time: Optional[float] = None
+    cog_load_time: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def failed(self) -> bool:
+        return self.error is not None
+
+
+_current_timing: ContextVar[Optional[ExtensionTiming]] = ContextVar(
+    "_current_timing", default=None)
+
+
+class LazyCog(commands.Cog):
+    """Placeholder holding the stub commands of a lazy extension."""
+
+    def __init__(self, loader: 'ExtensionLoader', extension: str):
+        self.loader = loader
+        self.extension = extension
+
+
+class LazyCommand(commands.Command):
+    """Stub prefix command; invoking it loads the real extension and
+    re-dispatches the message to the real command."""
+
+    async def invoke(self, ctx: commands.Context) -> None:
+        await self.cog.loader._invoke_stub(ctx)
+
+
+class LazyHybridCommand(LazyCommand, commands.HybridCommand):
+    pass
+
+
+def _stub_command(
+        name: str, info: Dict[str, Any]
+) -> Union[commands.Command, app_commands.Command]:
+    """Build a stub with the real command's name, texts and parameters,
+    so help and autocomplete show it exactly as the real one."""
+
+    async def stub(self: LazyCog, *args: Any, **kwargs: Any) -> None:
+        # Prefix invocations go through LazyCommand.invoke, and the tree's
+        # interaction_check swaps in the real command before any lookup.
+        raise commands.CommandError(f"{name} is not loaded yet")
+
+    def template() -> None:
+        pass
+
+    parameters = [
+        commands.Parameter(arg, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        for arg in ('self', 'ctx')
+    ] + [
+        commands.Parameter(
+            arg,
+            inspect.Parameter.KEYWORD_ONLY,
+            annotation=str,
+            default=inspect.Parameter.empty if required else None)
+        for arg, required in info['parameters']
+    ]
+    # inspect.signature follows __wrapped__, and HybridCommand deletes any
+    # __signature__ set on the callback itself.
+    template.__signature__ = inspect.Signature(parameters)
+    stub.__wrapped__ = template
+    stub.__qualname__ = f"{info['cog']}.{name}"
+    stub.__doc__ = info['help']
+
+    if info['kind'] == 'app':
+        kwargs = {'description': info['description']
+                  } if info['description'] else {}
+        return app_commands.Command(name=name, callback=stub, **kwargs)
+
+    command_class = LazyHybridCommand if info[
+        'kind'] == 'hybrid' else LazyCommand
+    return command_class(stub,
+                         name=name,
+                         aliases=list(info['aliases']),
+                         brief=info['brief'],
+                         description=info['description'] or '')
+
+
+class ExtensionLoader:
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.timings: Dict[str, ExtensionTiming] = {}
+        # Lazy extension name -> names of the placeholder cogs it owns
+        self.pending: Dict[str, List[str]] = {}
+        # Slash command name -> lazy extension providing it
+        self.lazy_app_commands: Dict[str, str] = {}
+        self._activation_lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def track_cog_load(self) -> AsyncIterator[None]:
+        """Attribute the time spent in add_cog (and so cog_load) to the
+        extension currently being loaded by this task."""
+        timing = _current_timing.get()
+        start = time.perf_counter()
+        if timing is not None and timing.import_time is None:
+            timing.import_time = start - timing.started
+        try:
+            yield
+        finally:
+            if timing is not None:
+                timing.cog_load_time += time.perf_counter() - start
+
+    async def load_extension(self, name: str) -> ExtensionTiming:
+        timing = ExtensionTiming(name)
+        self.timings[name] = timing
+        _current_timing.set(timing)
+
+        timing.started = time.perf_counter()
+        try:
+            await self.bot.load_extension(name)
+        except commands.ExtensionError as e:
+            timing.error = str(e.__cause__ or e)
+        except Exception as e:
+            timing.error = str(e)
+        finally:
+            timing.total_time = time.perf_counter() - timing.started
+            if timing.import_time is None:
+                # No cog was added (or the import failed): it was all setup
+                timing.import_time = timing.total_time
+
+        if timing.failed:
+            logger.error(
+                f"Failed to load extension {name}: {timing.error}")
+        else:
+            logger.success(f"Successfully loaded extension: {name}")
+        return timing
+
+    async def load_all(self,
+                       extensions: List[str],
+                       lazy: Iterable[str] = ()) -> List[ExtensionTiming]:
+        """Load the eager extensions concurrently, register stubs for the
+        lazy ones and log the timing report."""
+        lazy = set(lazy)
+        for name in extensions:
+            if name in lazy:
+                await self.register_lazy(name)
+
+        start = time.perf_counter()
+        # Each load runs in its own task, so the context variable set in
+        # load_extension never leaks between extensions.
+        timings = await asyncio.gather(*(self.load_extension(name)
+                                         for name in extensions
+                                         if name not in lazy))
+        elapsed = time.perf_counter() - start
+
+        loaded_count = sum(1 for t in timings if not t.failed)
+        failed_count = len(timings) - loaded_count
+
+        logger.info(self.format_report(timings))
+        logger.info(
+            f"Cog loading completed: {loaded_count} loaded, {failed_count} failed, {len(self.pending)} deferred in {elapsed * 1000:.0f}ms."
+        )
+        return list(timings)
+
+    async def register_lazy(self, name: str) -> None:
+        """Register stub commands for an extension without importing it."""
+        try:
+            found = get_command_names(name)
+        except (OSError, SyntaxError) as e:
+            logger.error(f"Failed to inspect lazy extension {name}: {e}")
+            return
+
+        # The stubs are grouped under a placeholder of each real cog, with
+        # the same names, so help lists them in the same categories.
+        cogs: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for command_name, info in found.items():
+            if info['kind'] != 'prefix':
+                self.lazy_app_commands[command_name] = name
+            cogs.setdefault((info['cog'], info['cog_name']),
+                            {})[command_name] = _stub_command(
+                                command_name, info)
+
+        stubs: List[str] = []
+        for (class_name, cog_name), attrs in cogs.items():
+            cog_class = type(class_name, (LazyCog, ), attrs, name=cog_name)
+            await self.bot.add_cog(cog_class(self, name))
+            stubs.append(cog_name)
+
+        self.pending[name] = stubs
+        logger.info(
+            f"Deferred extension {name} ({len(found)} commands) until first use")
+
+    async def activate(self, name: str) -> bool:
+        """Load a lazy extension, replacing its stubs with the real commands.
+
+        Returns whether the extension is loaded afterwards."""
+        async with self._activation_lock:
+            if name not in self.pending:
+                return name in self.bot.extensions
+
+            for cog_name in self.pending.pop(name):
+                await self.bot.remove_cog(cog_name)
+
+            timing = await self.load_extension(name)
+            if timing.failed:
+                # Put the stubs back so a later invocation can retry
+                await self.register_lazy(name)
+                return False
+
+            for command_name, extension in list(
+                    self.lazy_app_commands.items()):
+                if extension == name:
+                    del self.lazy_app_commands[command_name]
+            return True
+
+    async def activate_all(self) -> None:
+        """Load every pending lazy extension, e.g. before a tree sync."""
+        for name in list(self.pending):
+            await self.activate(name)
+
+    async def activate_for_interaction(
+            self, interaction: discord.Interaction) -> bool:
+        """Load the extension behind a lazy slash command before the tree
+        looks the command up."""
+        if interaction.type not in (
+                discord.InteractionType.application_command,
+                discord.InteractionType.autocomplete):
+            return True
+
+        name = self.lazy_app_commands.get(
+            (interaction.data or {}).get('name', ''))
+        if name is None or await self.activate(name):
+            return True
+
+        if interaction.type is discord.InteractionType.application_command:
+            await interaction.response.send_message(
+                "This command is unavailable right now. Please try again later.",
+                ephemeral=True)
+        return False
+
+    async def _invoke_stub(self, ctx: commands.Context) -> None:
+        name: str = ctx.cog.extension
+        if not await self.activate(name):
+            await ctx.send(
+                "This command is unavailable right now. Please try again later."
+            )
+            return
+
+        # Re-parse the message so the real command handles its own
+        # arguments, checks and cooldowns.
+        new_ctx = await self.bot.get_context(ctx.message)
+        if new_ctx.command is not None:
+            await self.bot.invoke(new_ctx)
+
+    @staticmethod
+    def format_report(timings: List[ExtensionTiming]) -> str:
+        rows = sorted(timings, key=lambda t: t.total_time, reverse=True)
+        name_width = max([len("Extension")] + [len(t.name) for t in rows])
+
+        lines = [
+            f"{'Extension':<{name_width}} | {'Import':>9} | {'cog_load':>9} | Status",
+            f"{'-' * name_width}-+-{'-' * 9}-+-{'-' * 9}-+-{'-' * 6}"
+        ]
+        for t in rows:
+            status = f"FAILED: {t.error}" if t.failed else "ok"
+            lines.append(
+                f"{t.name:<{name_width}} | {t.import_time * 1000:>7.1f}ms | "
+                f"{t.cog_load_time * 1000:>7.1f}ms | {status}")
+
+        return "Extension load report:\n" + "\n".join(lines)
@@ -0,0 +1,210 @@
+"""
+Member Cache Policies for Discord.py Bot
+----------------------------------------
+
+Chooses how much of each guild's member list the process keeps in memory.
+Selected with the MEMBER_CACHE_POLICY environment variable:
+
+   full    every intent, every guild chunked at startup and every member
+           cached (the original behaviour)
+   lazy    no presence cache; a guild is chunked the first time code needs
+           its full member list, and only voice members and members who
+           joined since startup are cached before that
+   active  no presence cache and no chunking at all; only voice members,
+           members who joined since startup and recent message authors
+           are cached, and full member lists are fetched over HTTP when
+           needed
+
+Recent message authors are kept by ActiveMembers, fed from the message
+dispatcher: at most ACTIVE_MEMBER_LIMIT members, each dropped after
+ACTIVE_MEMBER_IDLE seconds without a message. get_or_fetch_member checks
+it before the API.
+
+Code that needs members must not assume the cache is complete; use the
+helpers below, which fall back to chunking or the API.
+
+How to Use:
+1. Pick the policy in main():
+   policy = get_member_cache_policy()
+   bot = Bot(..., intents=policy.intents(), member_cache=policy)
+
+2. Feed recent message authors to the active cache:
+   if not policy.cache_all:
+       dispatcher.register('active_members', active_members.record)
+
+3. Look members up with fallbacks:
+   member = await get_or_fetch_member(guild, user_id)
+   members = await role_members(bot, role)
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from discord.ext import commands
+from loguru import logger
+
+from helpers.metrics import register_cache
+
+# Bounds of the recent message author cache used by the active policy
+ACTIVE_MEMBER_LIMIT = 10_000
+ACTIVE_MEMBER_IDLE = 30 * 60
+
+
+@dataclass(frozen=True)
+class MemberCachePolicy:
+    name: str
+    presences: bool
+    chunk_at_startup: bool
+    chunk_on_demand: bool
+    cache_all: bool
+
+    def intents(self) -> discord.Intents:
+        intents = discord.Intents.all()
+        intents.presences = self.presences
+        return intents
+
+    def member_cache_flags(self) -> discord.MemberCacheFlags:
+        if self.cache_all:
+            return discord.MemberCacheFlags.all()
+        return discord.MemberCacheFlags(voice=True, joined=True)
+
+
+POLICIES: Dict[str, MemberCachePolicy] = {
+    'full':
+    MemberCachePolicy('full',
+                      presences=True,
+                      chunk_at_startup=True,
+                      chunk_on_demand=False,
+                      cache_all=True),
+    'lazy':
+    MemberCachePolicy('lazy',
+                      presences=False,
+                      chunk_at_startup=False,
+                      chunk_on_demand=True,
+                      cache_all=True),
+    'active':
+    MemberCachePolicy('active',
+                      presences=False,
+                      chunk_at_startup=False,
+                      chunk_on_demand=False,
+                      cache_all=False),
+}
+
+_chunk_locks: Dict[int, asyncio.Lock] = {}
+
+
+class ActiveMembers:
+    """Recent message authors, least recently seen first."""
+
+    def __init__(self,
+                 limit: int = ACTIVE_MEMBER_LIMIT,
+                 idle: float = ACTIVE_MEMBER_IDLE) -> None:
+        self.limit = limit
+        self.idle = idle
+        self.members: OrderedDict[Tuple[int, int],
+                                  Tuple[discord.Member,
+                                        float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    async def record(self, message: discord.Message) -> None:
+        if isinstance(message.author, discord.Member):
+            self.add(message.author)
+
+    def add(self, member: discord.Member) -> None:
+        key = (member.guild.id, member.id)
+        self.members[key] = (member, time.monotonic())
+        self.members.move_to_end(key)
+        self.evict()
+
+    def get(self, guild_id: int, user_id: int) -> Optional[discord.Member]:
+        self.evict()
+        entry = self.members.get((guild_id, user_id))
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def evict(self) -> None:
+        """Drop members over the limit, then those idle for too long."""
+        while len(self.members) > self.limit:
+            self.members.popitem(last=False)
+        cutoff = time.monotonic() - self.idle
+        while self.members and next(iter(
+                self.members.values()))[1] < cutoff:
+            self.members.popitem(last=False)
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            'size': len(self.members),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+
+active_members = ActiveMembers()
+register_cache('active_members', active_members)
+
+
+def get_member_cache_policy() -> MemberCachePolicy:
+    name = os.getenv('MEMBER_CACHE_POLICY', 'full').lower()
+    policy = POLICIES.get(name)
+    if policy is None:
+        logger.warning(
+            f"Unknown MEMBER_CACHE_POLICY '{name}', using 'full' instead")
+        return POLICIES['full']
+    return policy
+
+
+def _policy(bot: commands.Bot) -> MemberCachePolicy:
+    return getattr(bot, 'member_cache', None) or POLICIES['full']
+
+
+async def ensure_chunked(bot: commands.Bot, guild: discord.Guild) -> bool:
+    """Chunk a guild on first need under the lazy policy.
+
+    Returns whether the guild's member cache is now complete."""
+    if guild.chunked:
+        return True
+    if not _policy(bot).chunk_on_demand:
+        return False
+
+    lock = _chunk_locks.setdefault(guild.id, asyncio.Lock())
+    async with lock:
+        if not guild.chunked:
+            await guild.chunk(cache=True)
+    return guild.chunked
+
+
+async def get_or_fetch_member(guild: discord.Guild,
+                              user_id: int) -> Optional[discord.Member]:
+    member = guild.get_member(user_id) or active_members.get(
+        guild.id, user_id)
+    if member is not None:
+        return member
+    try:
+        member = await guild.fetch_member(user_id)
+    except discord.NotFound:
+        return None
+    active_members.add(member)
+    return member
+
+
+async def role_members(bot: commands.Bot,
+                       role: discord.Role) -> List[discord.Member]:
+    """All members with a role, even when the member cache is partial."""
+    if await ensure_chunked(bot, role.guild):
+        return role.members
+    return [
+        member async for member in role.guild.fetch_members(limit=None)
+        if role in member.roles
+    ]
@@ -0,0 +1,318 @@
+"""
+Runtime Metrics for Discord.py Bot
+----------------------------------
+
+In-process counters that the health server and the owner ``stats``
+command report: how often each command ran, how long it took and how
+often it failed.
+
+Every command invocation gets a span, held in a context variable for the
+task running the command. While the span is active:
+- database time is added by ``Database.acquire``,
+- outbound HTTP time by the shared HTTP client and Discord CDN downloads,
+- image-rendering time by ``track_phase('render')`` blocks,
+- the first reply (send, defer or interaction response) is noticed by the
+  trace config passed to discord.py as ``http_trace``.
+
+Total time, time to first response and each phase go into rolling
+histograms per command.
+
+In-memory caches register here by name and are reported with their
+size, hits and misses.
+
+Prefix (and hybrid-as-prefix) commands are timed around ``Bot.invoke``.
+Slash commands are timed from the tree's ``interaction_check`` to the
+``app_command_completion`` event or the tree's ``on_error``.
+
+How to Use:
+1. Initialize in Bot class:
+   kwargs.setdefault('http_trace', discord_trace_config())
+   self.metrics = CommandMetrics(self)
+
+2. Time prefix commands:
+   async def invoke(self, ctx):
+       async with self.metrics.track_context(ctx):
+           await super().invoke(ctx)
+
+3. Mark CPU-heavy work inside commands:
+   with track_phase('render'):
+       card = draw_card(...)
+
+4. Report a cache with a cache_info() -> {'size', 'hits', 'misses'}:
+   register_cache('prefixes', self)
+"""
+
+import asyncio
+import bisect
+import math
+import re
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import aiohttp
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+# Key under which a slash command's span is kept in interaction.extras
+_SPAN = 'metrics_span'
+
+# Phases a command's time is split into, besides its total
+PHASES: Tuple[str, ...] = ('db', 'http', 'render')
+
+# Histogram bucket upper bounds in seconds
+BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                              2.5, 5.0, 10.0, math.inf)
+
+# Discord API calls that answer the user: messages, interaction callbacks
+# and interaction followups/edits.
+_RESPONSE_ROUTE = re.compile(
+    r'/(channels/\d+/messages|interactions/\d+/[^/]+/callback|webhooks/\d+/[^/]+)'
+)
+_CDN_HOSTS = frozenset({'cdn.discordapp.com', 'media.discordapp.net'})
+
+# Cache name -> object with cache_info(); a reloaded cog's new cache
+# replaces the old one, and a dropped cache disappears on its own
+_caches: 'weakref.WeakValueDictionary[str, Any]' = (
+    weakref.WeakValueDictionary())
+
+
+def register_cache(name: str, cache: Any) -> None:
+    _caches[name] = cache
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """``cache_info()`` of every registered cache, by name."""
+    return {name: cache.cache_info() for name, cache in sorted(_caches.items())}
+
+
+@dataclass
+class CommandSpan:
+    command: Optional[str] = None
+    started_at: float = field(default_factory=time.perf_counter)
+    first_response: Optional[float] = None
+    phases: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def mark_response(self) -> None:
+        if self.first_response is None:
+            self.first_response = time.perf_counter() - self.started_at
+
+
+_current_span: ContextVar[Optional[CommandSpan]] = ContextVar(
+    "_current_span", default=None)
+
+
+def span_for_task(task: asyncio.Task) -> Optional[CommandSpan]:
+    """The span of the command a task is running, if any. Safe to call
+    from another thread while the task is blocked."""
+    get_context = getattr(task, 'get_context', None)  # Python 3.12+
+    if get_context is None:
+        return None
+    return get_context().get(_current_span)
+
+
+def add_phase_time(phase: str, seconds: float) -> None:
+    """Attribute time to a phase of the command running in this task."""
+    span = _current_span.get()
+    if span is not None:
+        span.add(phase, seconds)
+
+
+@contextmanager
+def track_phase(phase: str) -> Iterator[None]:
+    """Attribute the time spent in the block to ``phase``.
+
+    Time the block spends in other phases (a DB query or download in the
+    middle of rendering) is not counted twice."""
+    span = _current_span.get()
+    if span is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    accounted = sum(span.phases.values())
+    try:
+        yield
+    finally:
+        nested = sum(span.phases.values()) - accounted
+        span.add(phase, max(time.perf_counter() - start - nested, 0.0))
+
+
+def discord_trace_config() -> aiohttp.TraceConfig:
+    """Trace config for discord.py's own session, noticing replies and CDN
+    downloads made while a command span is active."""
+
+    async def on_request_start(session: aiohttp.ClientSession,
+                               ctx: SimpleNamespace,
+                               params: aiohttp.TraceRequestStartParams
+                               ) -> None:
+        ctx.start = time.perf_counter()
+
+    async def on_request_end(session: aiohttp.ClientSession,
+                             ctx: SimpleNamespace,
+                             params: aiohttp.TraceRequestEndParams) -> None:
+        span = _current_span.get()
+        if span is None:
+            return
+        if params.url.host in _CDN_HOSTS:
+            span.add('http', time.perf_counter() - ctx.start)
+        elif params.method in ('POST', 'PATCH') and _RESPONSE_ROUTE.search(
+                params.url.path) and params.response.status < 400:
+            span.mark_response()
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    return trace_config
+
+
+class RollingHistogram:
+    """Bucketed histogram over a sliding time window.
+
+    The window is split into slots; observations land in the current slot
+    and slots older than the window are dropped as time moves on."""
+
+    def __init__(self, window: float = 3600.0, slots: int = 12) -> None:
+        self.slot_width = window / slots
+        self._epochs: List[int] = [-1] * slots
+        self._counts: List[List[int]] = [[0] * len(BUCKETS)
+                                         for _ in range(slots)]
+        self._sums: List[float] = [0.0] * slots
+
+    def _live_slots(self, now: float) -> Iterator[int]:
+        current = int(now // self.slot_width)
+        for index, epoch in enumerate(self._epochs):
+            if current - epoch < len(self._epochs):
+                yield index
+
+    def observe(self, value: float, now: Optional[float] = None) -> None:
+        epoch = int((time.monotonic() if now is None else now) //
+                    self.slot_width)
+        index = epoch % len(self._epochs)
+        if self._epochs[index] != epoch:
+            self._epochs[index] = epoch
+            self._counts[index] = [0] * len(BUCKETS)
+            self._sums[index] = 0.0
+        self._counts[index][bisect.bisect_left(BUCKETS, value)] += 1
+        self._sums[index] += value
+
+    def counts(self, now: Optional[float] = None) -> List[int]:
+        now = time.monotonic() if now is None else now
+        totals = [0] * len(BUCKETS)
+        for index in self._live_slots(now):
+            for bucket, count in enumerate(self._counts[index]):
+                totals[bucket] += count
+        return totals
+
+    def count(self, now: Optional[float] = None) -> int:
+        return sum(self.counts(now))
+
+    def total(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        return sum(self._sums[index] for index in self._live_slots(now))
+
+    def mean(self, now: Optional[float] = None) -> float:
+        count = self.count(now)
+        return self.total(now) / count if count else 0.0
+
+    def percentile(self, q: float, now: Optional[float] = None) -> float:
+        """Upper bound of the bucket holding the q-th quantile (0 < q <= 1)."""
+        counts = self.counts(now)
+        rank = q * sum(counts)
+        seen = 0
+        for bound, count in zip(BUCKETS, counts):
+            seen += count
+            if count and seen >= rank:
+                return bound
+        return 0.0
+
+
+@dataclass
+class CommandStats:
+    calls: int = 0
+    failures: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    # 'total', 'first_response' and one per phase
+    histograms: Dict[str, RollingHistogram] = field(
+        default_factory=lambda: {
+            name: RollingHistogram()
+            for name in ('total', 'first_response') + PHASES
+        })
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.calls if self.calls else 0.0
+
+
+class CommandMetrics:
+
+    def __init__(self, bot: commands.Bot) -> None:
+        self.bot = bot
+        # (qualified command name, 'prefix' or 'slash') -> stats
+        self.stats: Dict[Tuple[str, str], CommandStats] = {}
+        bot.add_listener(self._on_app_command_completion,
+                         'on_app_command_completion')
+
+    def record(self, name: str, kind: str, span: CommandSpan,
+               failed: bool) -> None:
+        duration = time.perf_counter() - span.started_at
+        stats = self.stats.setdefault((name, kind), CommandStats())
+        stats.calls += 1
+        stats.total_time += duration
+        stats.max_time = max(stats.max_time, duration)
+        if failed:
+            stats.failures += 1
+
+        stats.histograms['total'].observe(duration)
+        if span.first_response is not None:
+            stats.histograms['first_response'].observe(span.first_response)
+        for phase in PHASES:
+            stats.histograms[phase].observe(span.phases.get(phase, 0.0))
+
+    @asynccontextmanager
+    async def track_context(self,
+                            ctx: commands.Context) -> AsyncIterator[None]:
+        span = CommandSpan(
+            ctx.command.qualified_name if ctx.command else None)
+        token = _current_span.set(span)
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+            # Unknown commands are not worth a series of their own
+            if ctx.command is not None:
+                self.record(ctx.command.qualified_name, 'prefix', span,
+                            ctx.command_failed)
+
+    def start_interaction(self, interaction: discord.Interaction) -> None:
+        if interaction.type is discord.InteractionType.application_command:
+            # The tree runs the check and the command in the same task, so
+            # the span stays current for the whole invocation.
+            # Only the root name: resolving interaction.command here would
+            # fail for lazy commands that are not loaded yet.
+            span = CommandSpan((interaction.data or {}).get('name'))
+            interaction.extras[_SPAN] = span
+            _current_span.set(span)
+
+    def finish_interaction(self, interaction: discord.Interaction,
+                           failed: bool) -> None:
+        span: Optional[CommandSpan] = interaction.extras.pop(_SPAN, None)
+        command = interaction.command
+        if span is None or command is None:
+            return
+        self.record(command.qualified_name, 'slash', span, failed)
+
+    async def _on_app_command_completion(
+            self, interaction: discord.Interaction,
+            command: app_commands.Command | app_commands.ContextMenu) -> None:
+        self.finish_interaction(interaction, failed=False)
+
@@ -34,9 +34,6 @@ Example:
 from discord.ext import commands
 from loguru import logger
 
-from cogs.ticket.ticket import panel_views, closed_ticket_views, ticket_views
-from cogs.ticket.utils.ticket_manager import TicketManager as DataManager
-
 
 class PersistentViewManager:
 
@@ -46,19 +43,14 @@ class PersistentViewManager:
     async def setup_ticket_views(self) -> None:
         """Set up persistent views for the ticket system."""
         try:
-            self.bot.add_view(panel_views(self.bot))
-
-            tickets = await DataManager.get_all_tickets()
-            panels = await DataManager.get_all_panels()
+            # Imported here so the ticket extension is only executed once,
+            # by load_extension, instead of also at bot import time.
+            from cogs.ticket.ticket import panel_views, ticket_dynamic_items
 
-            for panel in panels:
-                for ticket in tickets:
-                    self.bot.add_view(view=closed_ticket_views(
-                        self.bot, panel["id"], ticket["ticket_creator"],
-                        ticket["ticket_id"]))
-
-                    self.bot.add_view(view=ticket_views(
-                        self.bot, panel["id"], ticket["ticket_creator"]))
+            self.bot.add_view(panel_views(self.bot))
+            # Ticket buttons carry their panel, ticket and creator IDs in
+            # the custom_id, so one registration covers every ticket.
+            self.bot.add_dynamic_items(*ticket_dynamic_items)
 
         except Exception as e:
             logger.error(f"Error adding persistent ticket views: {e}")
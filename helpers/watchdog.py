@@ -0,0 +1,145 @@
+"""
+Event Loop Watchdog for Discord.py Bot
+--------------------------------------
+
+Measures event-loop lag continuously and catches the code that causes it.
+
+A heartbeat task on the loop sleeps for a fixed interval and records how
+late it wakes up. A daemon thread watches the heartbeat: when it is
+overdue by more than the stall threshold, the loop is stuck inside a
+single callback, and the thread snapshots the loop thread's stack while
+it is still blocked, together with the running task and the command it
+belongs to. When the heartbeat finally runs, the stall is counted and
+logged with that snapshot.
+
+How to Use:
+1. Initialize in Bot class:
+   self.loop_watchdog = LoopWatchdog()
+
+2. Start it in setup_hook and stop it in close:
+   self.loop_watchdog.start()
+   self.loop_watchdog.stop()
+
+3. Read the counters:
+   self.loop_watchdog.lag, .max_lag, .stalls, .stall_time
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass
+from typing import Optional
+
+from loguru import logger
+
+from helpers.metrics import span_for_task
+
+# A single callback holding the loop longer than this counts as a stall
+STALL_THRESHOLD: float = float(os.getenv('LOOP_STALL_THRESHOLD', '0.25'))
+# Deepest frames kept from a stalled stack
+STACK_LIMIT: int = 15
+
+
+@dataclass
+class StallSnapshot:
+    task: Optional[str]
+    command: Optional[str]
+    stack: str
+
+
+class LoopWatchdog:
+
+    def __init__(self,
+                 interval: float = 0.5,
+                 threshold: float = STALL_THRESHOLD) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.lag: float = 0.0
+        self.max_lag: float = 0.0
+        self.stalls: int = 0
+        self.stall_time: float = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # When the heartbeat is due to wake up (time.monotonic()), and the
+        # stack captured for the current beat if it ran late
+        self._deadline: float = 0.0
+        self._beat: int = 0
+        self._captured_beat: int = -1
+        self._snapshot: Optional[StallSnapshot] = None
+
+    def start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = time.monotonic() + self.interval
+        self._stop.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch,
+                                        name='loop-watchdog',
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _heartbeat(self) -> None:
+        # The default loop clock is time.monotonic(), shared with the thread
+        while True:
+            self._deadline = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(time.monotonic() - self._deadline, 0.0)
+            self.max_lag = max(self.max_lag, self.lag)
+
+            snapshot, self._snapshot = self._snapshot, None
+            self._beat += 1
+            if self.lag >= self.threshold:
+                self._report(snapshot)
+
+    def _report(self, snapshot: Optional[StallSnapshot]) -> None:
+        self.stalls += 1
+        self.stall_time += self.lag
+        if snapshot is None:
+            logger.warning(
+                f"Event loop stalled for {self.lag * 1000:.0f}ms (no stack captured)"
+            )
+            return
+        logger.warning(
+            f"Event loop stalled for {self.lag * 1000:.0f}ms in task "
+            f"{snapshot.task or 'unknown'} (command: {snapshot.command or 'none'})\n"
+            f"{snapshot.stack}")
+
+    def _watch(self) -> None:
+        poll = min(self.threshold / 4, 0.05)
+        while not self._stop.wait(poll):
+            beat = self._beat
+            overdue = time.monotonic() - self._deadline
+            if overdue >= self.threshold and self._captured_beat != beat:
+                self._captured_beat = beat
+                self._snapshot = self._capture()
+
+    def _capture(self) -> Optional[StallSnapshot]:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return None
+        stack = ''.join(traceback.format_stack(frame)[-STACK_LIMIT:])
+
+        task = None
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            pass
+        span = span_for_task(task) if task is not None else None
+        return StallSnapshot(task.get_name() if task is not None else None,
+                             span.command if span is not None else None,
+                             stack)
@@ -1,24 +1,236 @@
-from flask import Flask
-from threading import Thread
-import logging
+"""
+Health and Metrics Server for Discord.py Bot
+--------------------------------------------
 
-app = Flask('')
+A small aiohttp web app served from the bot's own event loop, replacing
+the old Flask keep-alive thread.
 
+Routes:
+   /         plain "I'm alive", kept for existing uptime pingers
+   /health   liveness: the process and its event loop are responding
+   /ready    readiness: gateway connected and the database answers
+   /metrics  Prometheus text format: gateway latency, command counts and
+             durations, database pool usage, HTTP client stats,
+             event-loop lag, cooldown store sizes and cache hit counts
 
-@app.route('/')
-def home():
-  return "I'm alive"
+How to Use:
+1. Start it in setup_hook, after the HTTP client and metrics exist:
+   self.web_server = WebServer(self)
+   await self.web_server.start()
 
+2. Stop it when the bot closes:
+   await self.web_server.stop()
+"""
 
-def run():
-  # Suppress Flask/Werkzeug logging
-  log = logging.getLogger('werkzeug')
-  log.setLevel(
-      logging.ERROR)  # Only log errors, suppressing info and warning logs
+import asyncio
+import math
+import os
+from typing import Dict, List, Optional
 
-  app.run(host='0.0.0.0', port=8080)
+from aiohttp import web
+from discord.ext import commands
+from loguru import logger
 
+from helpers.cooldowns import cooldown_sizes
+from helpers.database import db
+from helpers.metrics import cache_stats
 
-def keep_alive():
-  t = Thread(target=run)
-  t.start()
+HOST: str = os.getenv('WEB_HOST', '0.0.0.0')
+PORT: int = int(os.getenv('PORT', '8080'))
+# How long /ready waits for a pooled connection before reporting failure
+READY_DB_TIMEOUT: float = 2.0
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _MetricWriter:
+    """Accumulates Prometheus text exposition lines."""
+
+    def __init__(self) -> None:
+        self.lines: List[str] = []
+
+    def metric(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self,
+               name: str,
+               value: float,
+               labels: Optional[Dict[str, str]] = None) -> None:
+        if labels:
+            label_text = ','.join(f'{key}="{_escape(str(val))}"'
+                                  for key, val in labels.items())
+            name = f"{name}{{{label_text}}}"
+        self.lines.append(f"{name} {value}")
+
+    def render(self) -> str:
+        return '\n'.join(self.lines) + '\n'
+
+
+class WebServer:
+
+    def __init__(self,
+                 bot: commands.Bot,
+                 host: str = HOST,
+                 port: int = PORT) -> None:
+        self.bot = bot
+        self.host = host
+        self.port = port
+        self.app = web.Application()
+        self.app.add_routes([
+            web.get('/', self.home),
+            web.get('/health', self.health),
+            web.get('/ready', self.ready),
+            web.get('/metrics', self.metrics),
+        ])
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        logger.info(f"Health server listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def home(self, request: web.Request) -> web.Response:
+        return web.Response(text="I'm alive")
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({'status': 'ok'})
+
+    async def _database_ready(self) -> bool:
+        if db.pool is None:
+            return False
+        try:
+            async with asyncio.timeout(READY_DB_TIMEOUT):
+                async with db.acquire() as conn:
+                    await conn.fetchval('SELECT 1')
+        except Exception:
+            return False
+        return True
+
+    async def ready(self, request: web.Request) -> web.Response:
+        checks = {
+            'gateway':
+            self.bot.is_ready() and not self.bot.is_closed()
+            and math.isfinite(self.bot.latency),
+            'database':
+            await self._database_ready(),
+        }
+        ready = all(checks.values())
+        return web.json_response(
+            {
+                'status': 'ready' if ready else 'unavailable',
+                'checks': checks
+            },
+            status=200 if ready else 503)
+
+    async def metrics(self, request: web.Request) -> web.Response:
+        out = _MetricWriter()
+        bot = self.bot
+
+        out.metric('discord_gateway_latency_seconds', 'gauge',
+                   'Heartbeat latency to the Discord gateway.')
+        if math.isfinite(bot.latency):
+            out.sample('discord_gateway_latency_seconds', bot.latency)
+        out.metric('discord_guilds', 'gauge', 'Guilds the bot is in.')
+        out.sample('discord_guilds', len(bot.guilds))
+
+        command_metrics = getattr(bot, 'metrics', None)
+        if command_metrics is not None:
+            out.metric('bot_command_duration_seconds', 'summary',
+                       'Time spent running commands.')
+            for (name, kind), stats in command_metrics.stats.items():
+                labels = {'command': name, 'kind': kind}
+                out.sample('bot_command_duration_seconds_count', stats.calls,
+                           labels)
+                out.sample('bot_command_duration_seconds_sum',
+                           stats.total_time, labels)
+            out.metric('bot_command_failures_total', 'counter',
+                       'Commands that raised an error.')
+            for (name, kind), stats in command_metrics.stats.items():
+                out.sample('bot_command_failures_total', stats.failures, {
+                    'command': name,
+                    'kind': kind
+                })
+
+        out.metric('db_pool_connections', 'gauge',
+                   'Database pool connections by state.')
+        out.sample('db_pool_connections', db.size - db.idle_size,
+                   {'state': 'in_use'})
+        out.sample('db_pool_connections', db.idle_size, {'state': 'idle'})
+        out.metric('db_pool_max_connections', 'gauge',
+                   'Configured maximum pool size.')
+        out.sample('db_pool_max_connections', db.max_size)
+        out.metric('db_pool_acquire_wait_seconds', 'summary',
+                   'Time spent waiting for a pooled connection.')
+        out.sample('db_pool_acquire_wait_seconds_count',
+                   db.stats.acquisitions)
+        out.sample('db_pool_acquire_wait_seconds_sum', db.stats.total_wait)
+
+        http_client = getattr(bot, 'http_client', None)
+        if http_client is not None:
+            out.metric('http_client_requests_total', 'counter',
+                       'Outgoing HTTP requests by host.')
+            for host, stats in http_client.stats.items():
+                out.sample('http_client_requests_total', stats.requests,
+                           {'host': host})
+            out.metric('http_client_failures_total', 'counter',
+                       'Outgoing HTTP requests that raised.')
+            for host, stats in http_client.stats.items():
+                out.sample('http_client_failures_total', stats.failures,
+                           {'host': host})
+            out.metric('http_client_in_flight', 'gauge',
+                       'Outgoing HTTP requests in progress.')
+            for host, stats in http_client.stats.items():
+                out.sample('http_client_in_flight', stats.in_flight,
+                           {'host': host})
+            out.metric('http_client_request_seconds_total', 'counter',
+                       'Total time spent on completed HTTP requests.')
+            for host, stats in http_client.stats.items():
+                out.sample('http_client_request_seconds_total',
+                           stats.total_time, {'host': host})
+
+        watchdog = getattr(bot, 'loop_watchdog', None)
+        if watchdog is not None:
+            out.metric('event_loop_lag_seconds', 'gauge',
+                       'Latest event-loop scheduling delay.')
+            out.sample('event_loop_lag_seconds', watchdog.lag)
+            out.metric('event_loop_lag_max_seconds', 'gauge',
+                       'Largest event-loop scheduling delay seen.')
+            out.sample('event_loop_lag_max_seconds', watchdog.max_lag)
+            out.metric('event_loop_stalls_total', 'counter',
+                       'Callbacks that blocked the loop past the threshold.')
+            out.sample('event_loop_stalls_total', watchdog.stalls)
+            out.metric('event_loop_stall_seconds_total', 'counter',
+                       'Total time the loop spent stalled.')
+            out.sample('event_loop_stall_seconds_total', watchdog.stall_time)
+
+        out.metric('cooldown_entries', 'gauge',
+                   'Keys held by each cooldown store.')
+        for store, size in sorted(cooldown_sizes().items()):
+            out.sample('cooldown_entries', size, {'store': store})
+
+        caches = cache_stats()
+        out.metric('cache_entries', 'gauge', 'Entries held by each cache.')
+        for name, info in caches.items():
+            out.sample('cache_entries', info['size'], {'cache': name})
+        out.metric('cache_hits_total', 'counter',
+                   'Lookups answered from each cache.')
+        for name, info in caches.items():
+            out.sample('cache_hits_total', info['hits'], {'cache': name})
+        out.metric('cache_misses_total', 'counter',
+                   'Lookups each cache could not answer.')
+        for name, info in caches.items():
+            out.sample('cache_misses_total', info['misses'], {'cache': name})
+
+        return web.Response(text=out.render(),
+                            content_type='text/plain',
+                            charset='utf-8')
@@ -1,19 +1,25 @@
 import os
-from typing import List, Union, Any, Callable, Protocol, runtime_checkable, Optional, TypeVar
+import sys
+from typing import List, Union, Any, Callable, Protocol, runtime_checkable, Optional, TypeVar, Dict
 import asyncio
 import discord
 from discord.ext import commands, tasks
 from aiohttp import ClientSession
 from abc import ABC, abstractmethod
-from glob import glob
 from loguru import logger
 import itertools
-import importlib.util
-import sys
 
+from cogs import get_extensions, get_lazy_extensions
 from cogs.help.utils.mentionable_tree import MentionableTree
+from helpers.cluster import ClusterConfig, ClusterIPCClient, ClusterLauncher
+from helpers.dispatch import MessageDispatcher
+from helpers.http_client import HTTPClient
+from helpers.loader import ExtensionLoader
+from helpers.member_cache import MemberCachePolicy, active_members, get_member_cache_policy
+from helpers.metrics import CommandMetrics, discord_trace_config
 from helpers.persistent import PersistentViewManager
-from helpers.webserver import keep_alive
+from helpers.watchdog import LoopWatchdog
+from helpers.webserver import PORT, WebServer
 
 T = TypeVar('T')
 
@@ -39,12 +45,23 @@ class BotBase(ABC):
     async def on_error(self, event_method: str, *args: Any, **kwargs: Any) -> None:
         pass
 
-class Bot(commands.Bot, BotBase):
+class Bot(commands.AutoShardedBot, BotBase):
     def __init__(self, command_prefix: Union[str, Callable[[commands.Bot, discord.Message], Union[List[str], str]]], 
-                 intents: discord.Intents, **kwargs: Any) -> None:
+                 intents: discord.Intents, cluster: Optional[ClusterConfig] = None,
+                 member_cache: Optional[MemberCachePolicy] = None, **kwargs: Any) -> None:
+        self.cluster: ClusterConfig = cluster or ClusterConfig()
+        self.member_cache: Optional[MemberCachePolicy] = member_cache
+        if member_cache is not None:
+            kwargs.setdefault('member_cache_flags', member_cache.member_cache_flags())
+            kwargs.setdefault('chunk_guilds_at_startup', member_cache.chunk_at_startup)
+        if self.cluster.is_worker:
+            kwargs.setdefault('shard_ids', self.cluster.shard_ids)
+            kwargs.setdefault('shard_count', self.cluster.shard_count)
+        # Lets command metrics see replies and CDN downloads
+        kwargs.setdefault('http_trace', discord_trace_config())
         super().__init__(command_prefix=command_prefix, intents=intents, **kwargs)
         self.session: Optional[ClientSession] = None
-        self.http_session: Optional[ClientSession] = None
+        self.http_client: Optional[HTTPClient] = None
         self.default_prefix: str = command_prefix if isinstance(command_prefix, str) else "."
         self.status_list: itertools.cycle = itertools.cycle([
             discord.Activity(type=discord.ActivityType.streaming, name="Anime 🎥", 
@@ -55,44 +72,75 @@ class Bot(commands.Bot, BotBase):
                            url="https://www.youtube.com/watch?v=dQw4w9WgXcQ")
         ])
         self._persistent_views = PersistentViewManager(self)
+        self.extension_loader = ExtensionLoader(self)
+        self.message_dispatcher = MessageDispatcher()
+        if member_cache is not None and not member_cache.cache_all:
+            # Message authors are not cached by discord.py; keep recent ones
+            self.message_dispatcher.register('active_members', active_members.record)
+        self.metrics = CommandMetrics(self)
+        self.loop_watchdog = LoopWatchdog()
+        # Each cluster serves health and metrics on its own port
+        self.web_server = WebServer(self, port=PORT + (self.cluster.cluster_id or 0))
+        self.ipc: Optional[ClusterIPCClient] = None
+        if self.cluster.is_worker:
+            self.ipc = ClusterIPCClient(self.cluster.cluster_id, self.cluster.ipc_path)
+            self.ipc.handlers['stats'] = self.local_stats
 
     async def setup_hook(self) -> None:
-        self.session = ClientSession()
+        self.http_client = HTTPClient()
+        self.session = self.http_client.session
+        self.loop_watchdog.start()
+        await self.web_server.start()
+        if self.ipc:
+            try:
+                await self.ipc.connect()
+            except OSError:
+                logger.exception("Could not connect to the cluster IPC hub")
         await self.load_extension("jishaku")
         await self.load_all_cogs()
         self.change_status.start()
         await self._persistent_views.setup_all_views()
 
     async def load_all_cogs(self) -> None:
-        cog_path: str = os.path.join(os.path.dirname(__file__), 'cogs')
-        cog_files: List[str] = glob(os.path.join(cog_path, '**', '[!_]*.py'), recursive=True)
-
-        loaded_count: int = 0
-        failed_count: int = 0
-
-        for file in cog_files:
+        await self.extension_loader.load_all(get_extensions(),
+                                             lazy=get_lazy_extensions())
+
+    async def add_cog(self, cog: commands.Cog, /, **kwargs: Any) -> None:
+        async with self.extension_loader.track_cog_load():
+            await super().add_cog(cog, **kwargs)
+
+    async def invoke(self, ctx: commands.Context) -> None:
+        async with self.metrics.track_context(ctx):
+            await super().invoke(ctx)
+
+    async def local_stats(self) -> Dict[str, Any]:
+        return {
+            'shards': sorted(self.shards),
+            'servers': len(self.guilds),
+            'users': sum(guild.member_count or 0 for guild in self.guilds),
+            'channels': sum(len(guild.channels) for guild in self.guilds),
+            'latency': self.latency,
+        }
+
+    async def cluster_stats(self) -> List[Dict[str, Any]]:
+        """Stats of every cluster, or just this process outside cluster mode."""
+        if self.ipc and self.ipc.connected:
             try:
-                module_path: str = os.path.relpath(file, os.path.dirname(__file__))
-                module_name: str = os.path.splitext(module_path)[0].replace(os.path.sep, '.')
-
-                spec = importlib.util.spec_from_file_location(module_name, file)
-                if spec is None or spec.loader is None:
-                    continue
-
-                module = importlib.util.module_from_spec(spec)
-                sys.modules[module_name] = module
-                spec.loader.exec_module(module)
-
-                if hasattr(module, 'setup'):
-                    await self.load_extension(module_name)
-                    logger.success(f"Successfully loaded extension: {module_name}")
-                    loaded_count += 1
-
-            except Exception as e:
-                logger.error(f"Failed to load extension {module_name}: {e}")
-                failed_count += 1
-
-        logger.info(f"Cog loading completed: {loaded_count} loaded, {failed_count} failed.")
+                results = await self.ipc.request('stats')
+                return [result['data'] | {'cluster': result['cluster']}
+                        for result in results if result['data']]
+            except (ConnectionError, asyncio.TimeoutError):
+                logger.warning("Cluster stats unavailable, using local stats only")
+        return [await self.local_stats() | {'cluster': self.cluster.cluster_id or 0}]
+
+    async def before_identify_hook(self, shard_id: Optional[int], *, initial: bool = False) -> None:
+        # The hub spaces identifies across every cluster
+        if self.ipc and self.ipc.connected and shard_id is not None:
+            try:
+                return await self.ipc.identify(shard_id)
+            except ConnectionError:
+                logger.warning(f"Cluster IPC hub lost; shard {shard_id} identifies on its own")
+        await super().before_identify_hook(shard_id, initial=initial)
 
     async def on_ready(self) -> None:
         if self.user:
@@ -100,6 +148,12 @@ class Bot(commands.Bot, BotBase):
         else:
             logger.error("Bot user is not set. This should not happen.")
 
+    async def on_message(self, message: discord.Message) -> None:
+        # Consumers and command processing run side by side, as separate
+        # listeners did, so a slow consumer never delays a command.
+        await asyncio.gather(self.message_dispatcher.dispatch(message),
+                             self.process_commands(message))
+
     async def on_error(self, event_method: str, *args: Any, **kwargs: Any) -> None:
         logger.exception(f'Unhandled exception in {event_method}')
 
@@ -113,9 +167,13 @@ class Bot(commands.Bot, BotBase):
 
     async def close(self) -> None:
         logger.info("Closing bot and cleaning up resources...")
-        if self.session:
-            await self.session.close()
         await super().close()
+        if self.ipc:
+            await self.ipc.close()
+        self.loop_watchdog.stop()
+        await self.web_server.stop()
+        if self.http_client:
+            await self.http_client.close()
 
 async def get_prefix(bot: Bot, message: discord.Message) -> Union[List[str], str]:
     if not message.guild:
@@ -126,33 +184,48 @@ async def get_prefix(bot: Bot, message: discord.Message) -> Union[List[str], str
         return await prefix_cog.get_prefix(message)
     return bot.default_prefix
 
-async def main() -> None:
-    intents: discord.Intents = discord.Intents.all()
+async def main() -> int:
+    """Run the bot (or the cluster launcher); returns the exit status.
+
+    Only a requested shutdown exits 0: the cluster launcher restarts
+    workers that exit with anything else."""
+    member_cache: MemberCachePolicy = get_member_cache_policy()
+    intents: discord.Intents = member_cache.intents()
     token: Optional[str] = os.getenv('DISCORD_BOT_TOKEN')
 
     if not token:
         logger.error("DISCORD_BOT_TOKEN environment variable not set.")
-        return
+        return 1
+
+    cluster = ClusterConfig.from_env()
+    if cluster.is_launcher:
+        await ClusterLauncher(token, cluster).run()
+        return 0
 
     bot = Bot(command_prefix=get_prefix, 
              case_insensitive=True, 
              intents=intents, 
+             cluster=cluster,
+             member_cache=member_cache,
              tree_cls=MentionableTree)
 
     try:
         await bot.start(token)
     except discord.LoginFailure:
         logger.error("Invalid bot token provided.")
+        return 1
     except Exception:
         logger.exception("An error occurred during bot startup")
+        return 1
     finally:
         await bot.close()
+    return 0
 
 if __name__ == "__main__":
-    keep_alive()
     try:
-        asyncio.run(main())
+        sys.exit(asyncio.run(main()))
     except KeyboardInterrupt:
         logger.info("Bot shutdown initiated by user.")
     except Exception:
-        logger.exception("Critical error occurred")
\ No newline at end of file
+        logger.exception("Critical error occurred")
+        sys.exit(1)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# helpers.database needs a URL at import time but never connects until a
+# cog initializes it
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
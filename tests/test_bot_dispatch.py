@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from main import Bot  # noqa: E402
+
+
+def fake_message() -> SimpleNamespace:
+    return SimpleNamespace(id=1,
+                           author=SimpleNamespace(id=2, bot=False),
+                           guild=SimpleNamespace(id=3),
+                           content="hello")
+
+
+def test_on_message_reaches_registered_consumer() -> None:
+
+    async def run() -> None:
+        bot = Bot(command_prefix=".", intents=discord.Intents.none())
+        received = []
+        processed = []
+
+        async def consumer(message) -> None:
+            received.append(message)
+
+        async def process_commands(message) -> None:
+            processed.append(message)
+
+        bot.message_dispatcher.register("test", consumer)
+        bot.process_commands = process_commands
+        message = fake_message()
+        await bot.on_message(message)
+
+        assert received == [message]
+        assert processed == [message]
+
+    asyncio.run(run())
+
+
+def test_bot_messages_only_reach_consumers_that_ask_for_them() -> None:
+
+    async def run() -> None:
+        bot = Bot(command_prefix=".", intents=discord.Intents.none())
+        received = {"humans": [], "everyone": []}
+
+        async def humans(message) -> None:
+            received["humans"].append(message)
+
+        async def everyone(message) -> None:
+            received["everyone"].append(message)
+
+        bot.message_dispatcher.register("humans", humans)
+        bot.message_dispatcher.register("everyone", everyone, bots=True)
+        message = fake_message()
+        message.author.bot = True
+        await bot.message_dispatcher.dispatch(message)
+
+        assert received == {"humans": [], "everyone": [message]}
+
+    asyncio.run(run())
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from helpers import cooldowns  # noqa: E402
+from helpers.cooldowns import CooldownStore, cooldown_sizes  # noqa: E402
+from main import Bot  # noqa: E402
+
+STORE = "test-cooldowns"
+SAMPLE = f'cooldown_entries{{store="{STORE}"}}'
+
+
+def scrape(bot: Bot) -> str:
+    response = asyncio.run(bot.web_server.metrics(None))
+    return response.text
+
+
+def test_cooldowns_rotate_and_expire_on_a_fake_clock(monkeypatch) -> None:
+    now = [0.0]
+    monkeypatch.setattr(cooldowns, "time",
+                        SimpleNamespace(monotonic=lambda: now[0]))
+    bot = Bot(command_prefix=".", intents=discord.Intents.none())
+    store = CooldownStore(STORE)
+
+    # The first hit starts the cooldown, a second one reports what is left
+    assert store.hit("a", 10) == 0.0
+    now[0] = 4
+    assert store.hit("a", 10) == 6.0
+    assert store.retry_after("a", 10) == 6.0
+    store.set("b", 10)
+    assert len(store) == 2
+    assert f"{SAMPLE} 2" in scrape(bot)
+
+    # One horizon in, the entries move to the previous generation and
+    # are still enforced from there
+    now[0] = 10
+    assert store.retry_after("a", 10) == 0.0
+    assert store.hit("b", 10) == 4.0
+    assert (store._current, store._previous) == ({}, {"a": 10, "b": 14})
+
+    now[0] = 12
+    assert store.hit("c", 10) == 0.0
+    assert cooldown_sizes()[STORE] == 3
+
+    # The next rotation drops the old generation whole
+    now[0] = 20
+    assert store.retry_after("b", 10) == 0.0
+    assert (store._current, store._previous) == ({}, {"c": 22})
+    assert store.retry_after("c", 10) == 2.0
+    assert f"{SAMPLE} 1" in scrape(bot)
+
+    now[0] = 40
+    assert store.retry_after("c", 10) == 0.0
+    assert len(store) == 0
+    assert f"{SAMPLE} 0" in scrape(bot)
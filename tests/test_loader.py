@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from cogs.help.help import HelpCog  # noqa: E402
+from cogs.help.utils.mentionable_tree import MentionableTree  # noqa: E402
+from helpers.loader import ExtensionTiming  # noqa: E402
+from main import Bot  # noqa: E402
+
+EXTENSION = "cogs.pokemon.poke"
+
+
+def make_bot() -> Bot:
+    return Bot(command_prefix=".",
+               intents=discord.Intents.none(),
+               tree_cls=MentionableTree)
+
+
+def test_lazy_stubs_show_up_like_the_real_commands() -> None:
+
+    async def run() -> None:
+        bot = make_bot()
+        await bot.extension_loader.register_lazy(EXTENSION)
+
+        pokedex = bot.get_command("dex")
+        assert pokedex is not None and not pokedex.hidden
+        assert pokedex.cog.qualified_name == "Pokemon"
+        assert pokedex.brief == "Search the Pokédex"
+        assert HelpCog.generate_usage(
+            pokedex) == "[/pokedex | .pokedex] <pokemon_name>"
+
+        slash = bot.tree.get_command("wtp")
+        assert slash is not None
+        assert slash.binding.__class__.__name__ == "Pokemon"
+        assert slash.description == "Play a game of Who's That Pokémon?"
+
+    asyncio.run(run())
+
+
+def test_activation_replaces_the_stubs() -> None:
+
+    async def run() -> None:
+        bot = make_bot()
+        loader = bot.extension_loader
+        await loader.register_lazy(EXTENSION)
+        loaded = []
+
+        async def load_extension(name: str) -> ExtensionTiming:
+            loaded.append(name)
+            return ExtensionTiming(name)
+
+        loader.load_extension = load_extension
+        assert await loader.activate(EXTENSION)
+
+        assert loaded == [EXTENSION]
+        assert bot.get_cog("Pokemon") is None
+        assert bot.get_command("pokedex") is None
+        assert bot.tree.get_command("wtp") is None
+        assert "wtp" not in loader.lazy_app_commands
+        assert EXTENSION not in loader.pending
+
+    asyncio.run(run())
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pytest
+
+discord = pytest.importorskip("discord")
+
+from helpers import member_cache  # noqa: E402
+from helpers.member_cache import POLICIES, ActiveMembers  # noqa: E402
+from main import Bot  # noqa: E402
+
+
+def fake_member(guild_id: int, user_id: int) -> SimpleNamespace:
+    return SimpleNamespace(id=user_id, guild=SimpleNamespace(id=guild_id))
+
+
+def test_active_members_are_bounded_and_dropped_when_idle(
+        monkeypatch) -> None:
+    now = [0.0]
+    monkeypatch.setattr(member_cache.time, "monotonic", lambda: now[0])
+    cache = ActiveMembers(limit=2, idle=60)
+
+    first, second, third = (fake_member(1, user_id) for user_id in (1, 2, 3))
+    cache.add(first)
+    now[0] = 30
+    cache.add(second)
+    assert cache.get(1, 1) is first
+    assert cache.get(2, 1) is None
+
+    # Over the limit the least recently seen member goes first
+    now[0] = 40
+    cache.add(third)
+    assert cache.get(1, 1) is None
+    assert cache.get(1, 3) is third
+
+    now[0] = 95
+    assert cache.get(1, 2) is None
+    assert cache.get(1, 3) is third
+    assert cache.cache_info() == {'size': 1, 'hits': 3, 'misses': 3}
+
+
+def test_only_the_active_policy_records_message_authors() -> None:
+    active = Bot(command_prefix=".",
+                 intents=POLICIES['active'].intents(),
+                 member_cache=POLICIES['active'])
+    full = Bot(command_prefix=".",
+               intents=POLICIES['full'].intents(),
+               member_cache=POLICIES['full'])
+
+    assert "active_members" in active.message_dispatcher.consumers
+    assert "active_members" not in full.message_dispatcher.consumers
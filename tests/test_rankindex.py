@@ -0,0 +1,26 @@
+import pytest
+
+pytest.importorskip("asyncpg")
+pytest.importorskip("loguru")
+
+from cogs.levelling.modules.rankindex import GuildRankIndex  # noqa: E402
+
+
+def test_tied_members_get_unique_ranks_by_user_id() -> None:
+    index = GuildRankIndex([(30, 100, 1), (10, 100, 1), (20, 100, 1),
+                            (40, 500, 2)])
+
+    assert [index.rank(user_id) for user_id in (40, 10, 20, 30)] == [1, 2, 3, 4]
+    assert [user_id for user_id, _, _ in index.top(4)] == [40, 10, 20, 30]
+
+
+def test_ranks_follow_xp_changes() -> None:
+    index = GuildRankIndex([(1, 100, 1), (2, 100, 1), (3, 50, 0)])
+
+    index.set(3, 100, 1)
+    assert [index.rank(user_id) for user_id in (1, 2, 3)] == [1, 2, 3]
+    index.set(3, 150, 1)
+    assert [index.rank(user_id) for user_id in (3, 1, 2)] == [1, 2, 3]
+    assert index.next_above(1) == (3, 150)
+    assert index.next_above(3) is None
+    assert index.rank(4) is None
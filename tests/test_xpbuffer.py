@@ -0,0 +1,92 @@
+import asyncio
+from typing import Dict, Tuple
+
+import pytest
+
+pytest.importorskip("asyncpg")
+pytest.importorskip("loguru")
+
+from cogs.levelling.modules import xpbuffer  # noqa: E402
+from cogs.levelling.modules.xpbuffer import XPAccumulator  # noqa: E402
+
+GUILD, USER = 1, 2
+RESET = "UPDATE user_levels SET xp = 0, level = 0"
+
+
+class FakeDB:
+    """user_levels in a dict. Reads see the table as it was when they
+    started and writes land when they finish, as with a real round trip."""
+
+    def __init__(self, delay: float = 0.01) -> None:
+        self.delay = delay
+        self.rows: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    async def fetch(self, query: str, user_id: int, guild_id: int):
+        row = self.rows.get((guild_id, user_id))
+        await asyncio.sleep(self.delay)
+        return [{'xp': row[0], 'level': row[1]}] if row else []
+
+    async def execute(self, query: str, *args) -> None:
+        await asyncio.sleep(self.delay)
+        if query == xpbuffer._UPSERT:
+            for user_id, guild_id, xp, level in zip(*args):
+                self.rows[(guild_id, user_id)] = (xp, level)
+        elif query == RESET:
+            self.rows[(args[1], args[0])] = (0, 0)
+
+
+@pytest.fixture
+def fake_db(monkeypatch) -> FakeDB:
+    fake = FakeDB()
+    monkeypatch.setattr(xpbuffer, "db", fake)
+    return fake
+
+
+def level_for(xp: int) -> int:
+    return int((xp // 100)**0.5)
+
+
+def test_flush_during_direct_write_keeps_the_write(fake_db) -> None:
+
+    async def run() -> None:
+        buffer = XPAccumulator(level_for)
+        await buffer.add(GUILD, USER, 500)
+
+        async def reset() -> None:
+            async with buffer.writing(GUILD, USER):
+                await fake_db.execute(RESET, USER, GUILD)
+
+        async def message_then_flush() -> None:
+            # Arrives while the reset is being written, so the row it
+            # reads is the one from before the reset
+            await asyncio.sleep(fake_db.delay * 1.5)
+            await buffer.add(GUILD, USER, 10)
+            await buffer.flush()
+
+        await asyncio.gather(reset(), message_then_flush())
+        await buffer.flush()
+        # Not (510, 2): the message's XP counts from the reset row
+        assert fake_db.rows[(GUILD, USER)] == (10, 0)
+
+    asyncio.run(run())
+
+
+def test_row_read_across_an_evict_is_read_again(fake_db) -> None:
+
+    async def run() -> None:
+        buffer = XPAccumulator(level_for)
+        fake_db.rows[(GUILD, USER)] = (500, 2)
+
+        async def reset() -> None:
+            # Starts after the message's read and ends before it returns
+            await asyncio.sleep(fake_db.delay * 0.25)
+            fake_db.delay *= 0.25
+            async with buffer.writing(GUILD, USER):
+                await fake_db.execute(RESET, USER, GUILD)
+            fake_db.delay *= 4
+
+        await asyncio.gather(buffer.add(GUILD, USER, 10), reset())
+        await buffer.flush()
+        assert fake_db.rows[(GUILD, USER)] == (10, 0)
+
+    asyncio.run(run())
@@ -13,6 +13,14 @@ class StreakSystem(commands.Cog):
         self.messages_required = 2
         self.bot.loop.create_task(self.setup_database())
 
+    async def cog_load(self):
+        self.bot.message_dispatcher.register('streaks',
+                                             self.handle_message,
+                                             guild_only=False)
+
+    async def cog_unload(self):
+        self.bot.message_dispatcher.unregister('streaks')
+
     async def setup_database(self):
         create_streaks_table = """
         CREATE TABLE IF NOT EXISTS user_streaks(
@@ -57,11 +65,7 @@ class StreakSystem(commands.Cog):
         await db.execute(query, user_id, streak_count, messages_today,
                          streak_updated)
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
-
+    async def handle_message(self, message: discord.Message):
         user_id = message.author.id
         streak_count, last_streak_date, messages_today, streak_updated_today = await self.get_user_streak(
             user_id)